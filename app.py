@@ -1,11 +1,15 @@
 import streamlit as st
 from app.data.schema import create_tables
+from app.utils.auth import start_metrics
 
 st.set_page_config(page_title="Multi-Domain Intelligence Platform", layout="wide")
 
 # Initialize DB tables
 create_tables()
 
+# Serve Prometheus metrics of this process (see app/data/metrics.py)
+start_metrics()
+
 st.title("📊 Multi-Domain Intelligence Platform")
 st.write("Use the left sidebar to navigate between modules.")
 
@@ -0,0 +1,445 @@
+"""
+Headless JSON API over the app/data layer (optional, needs starlette and uvicorn).
+
+Endpoints (all JSON; HTTP Basic auth with platform credentials):
+    GET    /api/health                     no auth
+    GET    /api/<resource>                 paginated list, see below
+    GET    /api/<resource>/<id>
+    GET    /api/<resource>/summary         incidents and tickets: chart aggregations
+    POST   /api/<resource>                 admin
+    PUT    /api/<resource>/<id>            admin; fields not given keep their value
+    DELETE /api/<resource>/<id>            admin
+    GET    /metrics                        Prometheus metrics of the server
+
+Resources are incidents, tickets, datasets and users (users: admin only,
+without password hashes, license keys or recovery codes).
+
+List parameters: limit, offset, after (keyset: key of the last row of the
+previous page, see next_after), sort (column, "-column" for descending), q
+(substring search), since/until (date range), count=1 (include the total),
+and any filterable column, e.g. ?status=Open&severity=High&severity=Critical.
+
+The event loop only parses requests and serialises responses; every data
+call runs on the async_api database thread pool, sized like the connection
+pool, so a slow query never blocks other requests and each worker reuses a
+pooled connection.
+
+Usage (from the repository root):
+    python -m app.api.server --port 8600 --workers 8
+"""
+import argparse
+import base64
+import contextlib
+import functools
+import hashlib
+import sqlite3
+import threading
+import time
+import traceback
+
+from app.data import async_api, db, metrics
+from app.data.pagination import LISTINGS, get_row, list_rows
+
+API_HOST = "127.0.0.1"
+API_PORT = 8600
+WORKERS = 8
+# Verified credentials are remembered this long, so bcrypt runs once per
+# client rather than on every request; any write to the users table (a
+# deletion, lock, role or password change) invalidates them at once
+AUTH_CACHE_SECONDS = 300
+
+REQUESTS = metrics.counter("platform_api_requests_total", "API requests by route and status", ["route", "status"])
+REQUEST_SECONDS = metrics.histogram(
+    "platform_api_request_seconds", "API request latency by route", ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+)
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _required(body, field):
+    if body.get(field) in (None, ""):
+        raise ApiError(400, f"Missing field {field!r}")
+    return body[field]
+
+
+def _new_key(table, body):
+    # The key columns have no UNIQUE constraint (CSV imports may repeat ids)
+    key_value = _required(body, LISTINGS[table]["key"])
+    if get_row(table, key_value) is not None:
+        raise ApiError(409, f"{LISTINGS[table]['key']} {key_value} already exists")
+    return key_value
+
+
+def _merged(table, key_value, body):
+    row = get_row(table, key_value)
+    if row is None:
+        raise ApiError(404, "Not found")
+    key = LISTINGS[table]["key"]
+    return {**row, **{k: v for k, v in body.items() if k in row and k != key}}
+
+
+# --- resources: (table, create, update, delete), all run in the executor ---------
+
+def _create_incident(body, actor):
+    from app.data.cyber_incidents import create_incident
+    incident_id = _new_key("cyber_incidents", body)
+    create_incident(incident_id, _required(body, "timestamp"), _required(body, "severity"),
+                    _required(body, "category"), _required(body, "status"), body.get("description"))
+    return get_row("cyber_incidents", incident_id)
+
+
+def _update_incident(incident_id, body, actor):
+    from app.data.cyber_incidents import update_incident
+    row = _merged("cyber_incidents", incident_id, body)
+    update_incident(incident_id, row["timestamp"], row["severity"], row["category"], row["status"],
+                    row["description"])
+    return get_row("cyber_incidents", incident_id)
+
+
+def _delete_incident(incident_id, actor):
+    from app.data.cyber_incidents import delete_incident
+    delete_incident(incident_id)
+
+
+def _create_ticket(body, actor):
+    from app.data.it_tickets import create_ticket
+    ticket_id = _new_key("it_tickets", body)
+    create_ticket(ticket_id, _required(body, "created"), _required(body, "priority"), body.get("issue_type"),
+                  body.get("assigned_to"), _required(body, "status"), body.get("description"))
+    return get_row("it_tickets", ticket_id)
+
+
+def _update_ticket(ticket_id, body, actor):
+    from app.data.it_tickets import update_ticket
+    row = _merged("it_tickets", ticket_id, body)
+    update_ticket(ticket_id, row["created"], row["priority"], row["issue_type"], row["assigned_to"],
+                  row["status"], row["description"])
+    return get_row("it_tickets", ticket_id)
+
+
+def _delete_ticket(ticket_id, actor):
+    from app.data.it_tickets import delete_ticket
+    delete_ticket(ticket_id)
+
+
+def _create_dataset(body, actor):
+    from app.data.datasets import create_dataset
+    dataset_id = _new_key("datasets_metadata", body)
+    create_dataset(dataset_id, _required(body, "name"), body.get("rows"), body.get("columns"),
+                   body.get("uploaded_by", actor), body.get("upload_date", time.strftime("%Y-%m-%d")))
+    return get_row("datasets_metadata", dataset_id)
+
+
+def _update_dataset(dataset_id, body, actor):
+    from app.data.datasets import update_dataset
+    row = _merged("datasets_metadata", dataset_id, body)
+    update_dataset(dataset_id, row["name"], row["rows"], row["columns"], row["uploaded_by"], row["upload_date"])
+    return get_row("datasets_metadata", dataset_id)
+
+
+def _delete_dataset(dataset_id, actor):
+    from app.data.datasets import delete_dataset
+    delete_dataset(dataset_id)
+
+
+def _create_user(body, actor):
+    from app.data.users import create_user_secure
+    username = _required(body, "username")
+    is_admin = 1 if body.get("is_admin") else 0
+    success, message = create_user_secure(
+        username, _required(body, "password"), is_admin, 1 if body.get("disabled") else 0,
+        body.get("role") or ("admin" if is_admin else "user"), body.get("email") or "", actor=actor,
+    )
+    if not success:
+        raise ApiError(400, message)
+    row = list_rows("users", filters={"username": username}, limit=1)["rows"][0]
+    # Shown once, like on the Users page
+    row["message"] = message
+    return row
+
+
+def _update_user(user_id, body, actor):
+    from app.data.users import get_user_by_id, update_user
+    current = get_user_by_id(user_id)
+    if current is None:
+        raise ApiError(404, "Not found")
+    row = _merged("users", user_id, body)
+    success, message = update_user(
+        user_id, row["username"], password=body.get("password"), is_admin=row["is_admin"],
+        disabled=row["disabled"], role=row["role"], email=row["email"], license_key=current[7], actor=actor,
+    )
+    if not success:
+        raise ApiError(400, message)
+    return get_row("users", user_id)
+
+
+def _delete_user(user_id, actor):
+    from app.data.users import delete_user
+    success, message = delete_user(user_id, actor=actor)
+    if not success:
+        raise ApiError(500, message)
+
+
+RESOURCES = {
+    "incidents": ("cyber_incidents", _create_incident, _update_incident, _delete_incident),
+    "tickets": ("it_tickets", _create_ticket, _update_ticket, _delete_ticket),
+    "datasets": ("datasets_metadata", _create_dataset, _update_dataset, _delete_dataset),
+    "users": ("users", _create_user, _update_user, _delete_user),
+}
+ADMIN_ONLY_RESOURCES = {"users"}
+SUMMARY_TABLES = {"cyber_incidents", "it_tickets"}
+
+LIST_PARAMS = {"limit", "offset", "after", "sort", "q", "since", "until", "count"}
+
+
+def _int_or_text(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _list(table, query):
+    spec = LISTINGS[table]
+    filters = {}
+    for name in query.keys():
+        if name in LIST_PARAMS:
+            continue
+        if name not in spec["filters"]:
+            raise ApiError(400, f"Unknown parameter {name!r}")
+        values = [_int_or_text(v) for v in query.getlist(name)]
+        filters[name] = values if len(values) > 1 else values[0]
+    sort = query.get("sort") or None
+    descending = bool(sort and sort.startswith("-"))
+    try:
+        return list_rows(
+            table,
+            filters=filters,
+            search=query.get("q"),
+            since=query.get("since"),
+            until=query.get("until"),
+            sort=sort.lstrip("-") if sort else None,
+            descending=descending,
+            limit=int(query.get("limit", 50)),
+            offset=int(query.get("offset", 0)),
+            after=_int_or_text(query.get("after")) if query.get("after") else None,
+            count=query.get("count") in ("1", "true", "yes"),
+        )
+    except ValueError as e:
+        raise ApiError(400, str(e))
+
+
+# --- authentication -----------------------------------------------------------------
+
+class _AuthCache:
+    def __init__(self, seconds=AUTH_CACHE_SECONDS):
+        self.seconds = seconds
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def authenticate(self, header):
+        """Return the user for a Basic auth header, or None (runs in the executor)."""
+        from app.data.generations import get_table_generation
+        from app.data.security import authenticate_user
+
+        if not header or not header.startswith("Basic "):
+            return None
+        try:
+            username, _, password = base64.b64decode(header[6:]).decode("utf-8").partition(":")
+        except ValueError:
+            return None
+        # Only a digest of the password is kept in memory
+        cache_key = (username, hashlib.sha256(password.encode("utf-8")).hexdigest())
+        now = time.monotonic()
+        # Read before authenticating, so a change made meanwhile is not cached
+        generation = get_table_generation("users")
+        with self._lock:
+            entry = self._entries.get(cache_key)
+        if entry and entry[0] > now and entry[1] == generation:
+            return entry[2]
+        success, user, _ = authenticate_user(username, password)
+        if not success:
+            return None
+        with self._lock:
+            if len(self._entries) > 10000:
+                self._entries.clear()
+            self._entries[cache_key] = (now + self.seconds, generation, user)
+        return user
+
+
+# --- application ----------------------------------------------------------------------
+
+def create_app(workers=WORKERS):
+    """
+    Build the Starlette application.
+
+    Args:
+        workers: Threads running data calls (also the connection pool size)
+
+    Returns:
+        starlette.applications.Starlette
+
+    Raises:
+        ImportError: starlette is not installed
+    """
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, PlainTextResponse
+    from starlette.routing import Route
+
+    auth_cache = _AuthCache()
+    run = async_api.run_async
+
+    def endpoint(route, needs_auth=True):
+        def decorate(handler):
+            @functools.wraps(handler)
+            async def wrapper(request):
+                start = time.perf_counter()
+                try:
+                    user = None
+                    if needs_auth:
+                        user = await run(auth_cache.authenticate, request.headers.get("authorization"))
+                        if user is None:
+                            raise ApiError(401, "Authentication required")
+                    response = await handler(request, user)
+                except ApiError as e:
+                    response = JSONResponse({"error": e.message}, status_code=e.status)
+                    if e.status == 401:
+                        response.headers["WWW-Authenticate"] = 'Basic realm="platform"'
+                except sqlite3.IntegrityError as e:
+                    response = JSONResponse({"error": f"Conflict: {e}"}, status_code=409)
+                except sqlite3.OperationalError as e:
+                    # e.g. "database is locked" under heavy write contention
+                    response = JSONResponse({"error": str(e)}, status_code=503)
+                except Exception:
+                    traceback.print_exc()
+                    response = JSONResponse({"error": "Internal error"}, status_code=500)
+                REQUESTS.inc(route=route, status=str(response.status_code))
+                REQUEST_SECONDS.observe(time.perf_counter() - start, route=route)
+                return response
+            return wrapper
+        return decorate
+
+    def resource_for(request, user, write=False):
+        name = request.path_params["resource"]
+        if name not in RESOURCES:
+            raise ApiError(404, f"Unknown resource {name!r}")
+        if (write or name in ADMIN_ONLY_RESOURCES) and not user.get("is_admin"):
+            raise ApiError(403, "Admin privileges required")
+        return RESOURCES[name]
+
+    async def json_body(request):
+        try:
+            body = await request.json()
+        except ValueError:
+            raise ApiError(400, "Body must be JSON")
+        if not isinstance(body, dict):
+            raise ApiError(400, "Body must be a JSON object")
+        return body
+
+    @endpoint("health", needs_auth=False)
+    async def health(request, user):
+        return JSONResponse({"status": "ok"})
+
+    @endpoint("metrics", needs_auth=False)
+    async def metrics_endpoint(request, user):
+        return PlainTextResponse(metrics.render_metrics(), media_type=metrics.CONTENT_TYPE)
+
+    @endpoint("list")
+    async def list_resource(request, user):
+        table = resource_for(request, user)[0]
+        return JSONResponse(await run(_list, table, request.query_params))
+
+    @endpoint("create")
+    async def create_resource(request, user):
+        _, create, _, _ = resource_for(request, user, write=True)
+        row = await run(create, await json_body(request), user["username"])
+        return JSONResponse(row, status_code=201)
+
+    @endpoint("summary")
+    async def summary_resource(request, user):
+        table = resource_for(request, user)[0]
+        if table not in SUMMARY_TABLES:
+            raise ApiError(404, "No summary for this resource")
+        summary = await async_api.dashboard_summary(table)
+        return JSONResponse({
+            name: value.to_dict(orient="index") if hasattr(value, "columns") else value.to_dict()
+            for name, value in summary.items()
+        })
+
+    @endpoint("get")
+    async def get_resource(request, user):
+        table = resource_for(request, user)[0]
+        row = await run(get_row, table, request.path_params["key"])
+        if row is None:
+            raise ApiError(404, "Not found")
+        return JSONResponse(row)
+
+    @endpoint("update")
+    async def update_resource(request, user):
+        _, _, update, _ = resource_for(request, user, write=True)
+        row = await run(update, request.path_params["key"], await json_body(request), user["username"])
+        return JSONResponse(row)
+
+    @endpoint("delete")
+    async def delete_resource(request, user):
+        table, _, _, delete = resource_for(request, user, write=True)
+        key = request.path_params["key"]
+        if await run(get_row, table, key) is None:
+            raise ApiError(404, "Not found")
+        await run(delete, key, user["username"])
+        return JSONResponse({"deleted": key})
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        async_api.configure(workers)
+        db.enable_connection_pool(workers)
+        try:
+            yield
+        finally:
+            async_api.shutdown()
+            db.disable_connection_pool()
+
+    return Starlette(
+        routes=[
+            Route("/api/health", health),
+            Route("/metrics", metrics_endpoint),
+            Route("/api/{resource}", list_resource, methods=["GET"]),
+            Route("/api/{resource}", create_resource, methods=["POST"]),
+            Route("/api/{resource}/summary", summary_resource, methods=["GET"]),
+            Route("/api/{resource}/{key:int}", get_resource, methods=["GET"]),
+            Route("/api/{resource}/{key:int}", update_resource, methods=["PUT", "PATCH"]),
+            Route("/api/{resource}/{key:int}", delete_resource, methods=["DELETE"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the platform data as a JSON API.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="threads running database calls")
+    parser.add_argument("--db", help=f"database file (default: {db.DB_PATH})")
+    parser.add_argument("--access-log", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    try:
+        import uvicorn
+        app = create_app(args.workers)
+    except ImportError as e:
+        print(f"The API server needs starlette and uvicorn ({e}); install them with pip.")
+        return 1
+    if args.db:
+        db.DB_PATH = args.db
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=args.access_log)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
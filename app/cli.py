@@ -0,0 +1,385 @@
+"""
+Batch command line for the platform, for cron jobs and scripts.
+
+Unlike the interactive console (main.py without arguments), a command does
+only its own step: tables, test users and the CSV migrations are set up by
+`init` (which skips what is already done, see app/data/init_state.py) and
+by nothing else. The result of a command is printed as one JSON
+document on stdout (anything the data layer prints goes to stderr), and the
+exit status is 0 on success, 1 when the command failed or failed in part,
+and 2 on usage errors.
+
+Usage (from the repository root):
+    python main.py init [--force]
+    python main.py import incidents new_incidents.csv more.jsonl
+    python main.py import users DATA/users.txt
+    python main.py export tickets -o tickets.csv
+    python main.py export users --format jsonl > users.jsonl
+    python main.py profile uploads/sales_2024.csv --uploaded-by alice
+    python main.py stats
+    python main.py users unlock alice bob
+    python main.py users unlock --file locked.txt
+    python main.py bench data_suite --scales small
+    python main.py jobs submit profile path=uploads/sales_2024.csv uploaded_by=alice
+    python main.py jobs list --status failed
+    python main.py worker --processes 4
+"""
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import sys
+import time
+
+from app.data import db
+
+# CLI / API names -> tables
+TABLES = {
+    "incidents": "cyber_incidents",
+    "tickets": "it_tickets",
+    "datasets": "datasets_metadata",
+    "users": "users",
+}
+
+BENCHMARKS = (
+    "data_suite",
+    "async_page_load",
+    "page_render",
+    "load_test",
+    "api_load_test",
+    "import_time",
+    "memory_report",
+)
+
+
+class CommandError(Exception):
+    """A command could not do its job; reported as {"error": message}."""
+
+
+def _count_rows(curr, table):
+    from app.data.lookups import NORMALIZED_TABLES
+    # Counting the base table avoids the view's lookup joins
+    source = NORMALIZED_TABLES[table]["base"] if table in NORMALIZED_TABLES else table
+    curr.execute(f"SELECT COUNT(*) FROM {source};")
+    return curr.fetchone()[0]
+
+
+def cmd_init(args, out):
+    from app.data.init_state import initialize
+
+    start = time.perf_counter()
+    steps = initialize(force=args.force)
+    failed = any(step["status"] == "failed" for step in steps)
+    return {"seconds": time.perf_counter() - start, "steps": steps}, 1 if failed else 0
+
+
+def cmd_import(args, out):
+    from app.data import bulk
+    from app.data.users import bulk_import_users
+
+    table = TABLES[args.table]
+    files, failed = [], False
+    for path in args.files:
+        try:
+            if table == "users":
+                # Invalid lines are reported and skipped, the rest is imported
+                report = bulk_import_users(path, workers=args.workers, actor="cli")
+                files.append({"path": path, "rows": report.pop("imported"), **report})
+                failed = failed or bool(report["errors"])
+            else:
+                files.append({"path": path, "rows": bulk.import_file(table, path, args.format)})
+        except Exception as e:
+            failed = True
+            files.append({"path": path, "error": f"{type(e).__name__}: {e}"})
+    result = {"table": table, "rows": sum(f.get("rows", 0) for f in files), "files": files}
+    return result, 1 if failed else 0
+
+
+def cmd_export(args, out):
+    from app.data import bulk
+
+    table = TABLES[args.table]
+    if args.output == "-":
+        bulk.export_table(table, out, args.format)
+        return None, 0
+    rows = bulk.export_table(table, args.output, args.format)
+    return {"table": table, "path": args.output, "rows": rows}, 0
+
+
+def cmd_profile(args, out):
+    from app.data.dataset_profiles import profile_and_register
+
+    if args.dataset_id is not None and len(args.files) > 1:
+        raise CommandError("--dataset-id needs exactly one file")
+    datasets, failed = [], False
+    for path in args.files:
+        try:
+            dataset_id, profile = profile_and_register(
+                path, fmt=args.format, dataset_id=args.dataset_id, uploaded_by=args.uploaded_by
+            )
+            datasets.append({"path": path, "dataset_id": dataset_id, **profile})
+        except Exception as e:
+            failed = True
+            datasets.append({"path": path, "error": f"{type(e).__name__}: {e}"})
+    return {"datasets": datasets}, 1 if failed else 0
+
+
+def cmd_stats(args, out):
+    from app.data.generations import get_table_generations
+    from app.data.snapshots import snapshot_info
+
+    conn = db.get_connection()
+    curr = conn.cursor()
+    try:
+        rows = {table: _count_rows(curr, table) for table in TABLES.values()}
+        curr.execute(
+            "SELECT COALESCE(SUM(is_admin = 1), 0), COALESCE(SUM(disabled = 1), 0), "
+            "COALESCE(SUM(failed_attempts > 0), 0) FROM users;"
+        )
+        admins, disabled, with_failures = curr.fetchone()
+    finally:
+        conn.close()
+    snapshots = {}
+    for table in ("cyber_incidents", "it_tickets", "datasets_metadata"):
+        info = snapshot_info(table)
+        snapshots[table] = {"generation": info["generation"], "rows": info["rows"]} if info else None
+    return {
+        "database": db.DB_PATH,
+        "database_bytes": os.path.getsize(db.DB_PATH),
+        "rows": rows,
+        "users": {"admins": admins, "disabled": disabled, "with_failed_attempts": with_failures},
+        "generations": get_table_generations(),
+        "snapshots": snapshots,
+    }, 0
+
+
+def cmd_users_list(args, out):
+    from app.data.pagination import list_rows
+
+    filters = {"disabled": 1} if args.disabled else None
+    rows, after = [], None
+    while True:
+        page = list_rows("users", filters=filters, limit=1000, after=after)
+        rows.extend(page["rows"])
+        after = page["next_after"]
+        if after is None:
+            return {"users": rows}, 0
+
+
+def cmd_users_unlock(args, out):
+    from app.data.users import get_user_by_username, unlock_user_account
+
+    usernames = list(args.usernames)
+    if args.file:
+        with (sys.stdin if args.file == "-" else open(args.file, "r")) as f:
+            usernames.extend(line.strip() for line in f if line.strip())
+    if not usernames:
+        raise CommandError("No usernames given (pass them as arguments or with --file)")
+
+    unlocked, not_found, errors = [], [], {}
+    for username in usernames:
+        user = get_user_by_username(username)
+        if not user:
+            not_found.append(username)
+            continue
+        ok, message = unlock_user_account(user[0], actor=args.actor)
+        if ok:
+            unlocked.append(username)
+        else:
+            errors[username] = message
+    result = {"unlocked": unlocked, "not_found": not_found, "errors": errors}
+    return result, 1 if not_found or errors else 0
+
+
+def _job_param(text):
+    key, sep, value = text.partition("=")
+    if not sep or not key:
+        raise argparse.ArgumentTypeError(f"expected key=value, got {text!r}")
+    try:
+        # Numbers, true/false and quoted strings; anything else is a string
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+
+def cmd_jobs_submit(args, out):
+    from app.data import jobs
+
+    job_id = jobs.submit_job(args.kind, dict(args.params), submitted_by=args.submitted_by,
+                             max_attempts=args.max_attempts)
+    return jobs.get_job(job_id), 0
+
+
+def cmd_jobs_list(args, out):
+    from app.data import jobs
+
+    return {
+        "counts": jobs.get_job_counts(),
+        "workers": jobs.get_workers(),
+        "jobs": jobs.list_jobs(status=args.status, limit=args.limit),
+    }, 0
+
+
+def cmd_jobs_show(args, out):
+    from app.data import jobs
+
+    job = jobs.get_job(args.job_id)
+    if job is None:
+        raise CommandError(f"No job {args.job_id}")
+    return job, 0
+
+
+def _change_jobs(change, job_ids):
+    changed = [job_id for job_id in job_ids if change(job_id)]
+    unchanged = [job_id for job_id in job_ids if job_id not in changed]
+    return {"changed": changed, "unchanged": unchanged}, 1 if unchanged else 0
+
+
+def cmd_jobs_cancel(args, out):
+    from app.data import jobs
+
+    return _change_jobs(jobs.cancel_job, args.job_ids)
+
+
+def cmd_jobs_retry(args, out):
+    from app.data import jobs
+
+    return _change_jobs(jobs.retry_job, args.job_ids)
+
+
+def cmd_worker(args, out):
+    from app.data import jobs
+
+    start = time.perf_counter()
+    counts = jobs.run_workers(processes=args.processes, idle_exit=args.idle_exit)
+    return {"seconds": time.perf_counter() - start, "jobs": counts}, 0
+
+
+def cmd_bench(args, out):
+    module = importlib.import_module(f"benchmarks.{args.suite}")
+    bench_args = list(args.args)
+    if "--json" not in bench_args:
+        bench_args.append("--json")
+    # The benchmark prints its own JSON report
+    with contextlib.redirect_stdout(out):
+        status = module.main(bench_args)
+    return None, status or 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Run one platform operation and print the result as JSON.",
+        epilog="Run without arguments for the interactive console.",
+    )
+    parser.add_argument("--db", help=f"database file (default: {db.DB_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    p = commands.add_parser("init", help="create tables, load users and migrate the CSV files")
+    p.set_defaults(handler=cmd_init)
+    p.add_argument("--force", action="store_true", help="rerun steps already recorded as done")
+
+    p = commands.add_parser("import", help="append rows from CSV / JSON lines / JSON files")
+    p.set_defaults(handler=cmd_import)
+    p.add_argument("table", choices=TABLES)
+    p.add_argument("files", nargs="+",
+                   help='files to import, "-" for stdin (users: users.txt files, see bulk_import_users())')
+    p.add_argument("--format", choices=("csv", "jsonl", "json"), help="default: from the file extension")
+    p.add_argument("--workers", type=int, help="users: password hashing processes (default: one per CPU)")
+
+    p = commands.add_parser("export", help="write a table to a file (no password hashes)")
+    p.set_defaults(handler=cmd_export)
+    p.add_argument("table", choices=TABLES)
+    p.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    p.add_argument("--format", choices=("csv", "jsonl", "json"), help="default: from the file extension, else csv")
+
+    p = commands.add_parser("profile", help="profile data files and add them to the datasets catalog")
+    p.set_defaults(handler=cmd_profile)
+    p.add_argument("files", nargs="+", help="CSV, TSV, JSON lines or Parquet files")
+    p.add_argument("--format", choices=("csv", "tsv", "jsonl", "parquet"), help="default: from the file extension")
+    p.add_argument("--dataset-id", type=int, help="refresh this catalog entry instead of adding one")
+    p.add_argument("--uploaded-by", default="cli", help="name recorded as the uploader (default: cli)")
+
+    p = commands.add_parser("stats", help="row counts, generations and snapshot state")
+    p.set_defaults(handler=cmd_stats)
+
+    p = commands.add_parser("users", help="user administration")
+    user_commands = p.add_subparsers(dest="users_command", required=True, metavar="action")
+    p = user_commands.add_parser("list", help="list users (without secrets)")
+    p.set_defaults(handler=cmd_users_list)
+    p.add_argument("--disabled", action="store_true", help="only disabled (locked) accounts")
+    p = user_commands.add_parser("unlock", help="re-enable accounts and reset their failed attempts")
+    p.set_defaults(handler=cmd_users_unlock)
+    p.add_argument("usernames", nargs="*")
+    p.add_argument("--file", help='file with one username per line ("-" for stdin)')
+    p.add_argument("--actor", default="cli", help="name recorded in the audit log (default: cli)")
+
+    p = commands.add_parser("jobs", help="background job queue (see app/data/jobs.py)")
+    job_commands = p.add_subparsers(dest="jobs_command", required=True, metavar="action")
+    p = job_commands.add_parser("submit", help="queue a job; a `worker` runs it")
+    p.set_defaults(handler=cmd_jobs_submit)
+    p.add_argument("kind", choices=("init", "import", "import_users", "profile"))
+    p.add_argument("params", nargs="*", type=_job_param, metavar="key=value",
+                   help="job parameters, e.g. path=data.csv table=it_tickets force=true")
+    p.add_argument("--max-attempts", type=int, default=3, help="attempts before the job fails (default: 3)")
+    p.add_argument("--submitted-by", default="cli", help="name recorded with the job (default: cli)")
+    p = job_commands.add_parser("list", help="job counts, live workers and the latest jobs")
+    p.set_defaults(handler=cmd_jobs_list)
+    p.add_argument("--status", choices=("queued", "running", "succeeded", "failed", "cancelled"))
+    p.add_argument("--limit", type=int, default=50)
+    p = job_commands.add_parser("show", help="one job with its parameters and result")
+    p.set_defaults(handler=cmd_jobs_show)
+    p.add_argument("job_id", type=int)
+    p = job_commands.add_parser("cancel", help="cancel queued or running jobs")
+    p.set_defaults(handler=cmd_jobs_cancel)
+    p.add_argument("job_ids", nargs="+", type=int)
+    p = job_commands.add_parser("retry", help="queue failed or cancelled jobs again")
+    p.set_defaults(handler=cmd_jobs_retry)
+    p.add_argument("job_ids", nargs="+", type=int)
+
+    p = commands.add_parser("worker", help="run queued jobs in worker processes (until Ctrl+C)")
+    p.set_defaults(handler=cmd_worker)
+    p.add_argument("--processes", type=int, help="worker processes (default: one per CPU)")
+    p.add_argument("--idle-exit", type=float, help="stop after this many seconds without jobs")
+
+    p = commands.add_parser("bench", help="run a benchmark from benchmarks/ with --json")
+    p.set_defaults(handler=cmd_bench)
+    p.add_argument("suite", choices=BENCHMARKS)
+    p.add_argument("args", nargs=argparse.REMAINDER, help="arguments for the benchmark")
+    return parser
+
+
+def main(argv=None):
+    """
+    Run one command.
+
+    Args:
+        argv: Arguments without the program name (default: sys.argv[1:])
+
+    Returns:
+        int: Exit status
+    """
+    args = build_parser().parse_args(argv)
+    if args.db:
+        db.DB_PATH = args.db
+    if args.command != "init" and not os.path.exists(db.DB_PATH):
+        print(json.dumps({"error": f"No database at {db.DB_PATH}; run `init` first"}))
+        return 1
+
+    out = sys.stdout
+    try:
+        # stdout is kept for the result (or the exported data)
+        with contextlib.redirect_stdout(sys.stderr):
+            result, status = args.handler(args, out)
+    except CommandError as e:
+        result, status = {"error": str(e)}, 1
+    except Exception as e:
+        result, status = {"error": f"{type(e).__name__}: {e}"}, 1
+    if result is not None:
+        print(json.dumps(result, indent=2, default=str), file=out)
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1 +1,5 @@
-# Data package
\ No newline at end of file
+# Data package
+#
+# pandas is imported inside the data functions that need it, not at module
+# level, so CRUD-only callers (e.g. the main.py menus) don't pay its import
+# cost at startup.
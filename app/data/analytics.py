@@ -0,0 +1,284 @@
+"""
+Aggregations shared by the dashboard pages.
+
+Each aggregation has a pandas version that works on a DataFrame already
+loaded by read_all_*, and a SQL version that lets SQLite do the grouping
+when the full table does not need to be loaded.
+"""
+from .db import get_connection
+from .dtypes import LEVEL_ORDER, STATUS_ORDER
+from .lookups import NORMALIZED_TABLES
+
+# Columns that may be used in SQL aggregations, per table
+AGGREGATE_COLUMNS = {
+    "cyber_incidents": {"severity", "category", "status"},
+    "it_tickets": {"priority", "issue_type", "status", "assigned_to"},
+}
+
+
+def _check_columns(table, *columns):
+    allowed = AGGREGATE_COLUMNS.get(table)
+    if allowed is None or any(col not in allowed for col in columns):
+        raise ValueError(f"Cannot aggregate {table} by {columns}")
+
+
+def category_level_profile(df, category_col, level_col, levels=LEVEL_ORDER, top_n=5):
+    """
+    Percentage of each level within each of the top categories.
+
+    One crosstab over the whole frame replaces filtering the frame once
+    per category, so the cost is O(n) instead of O(top_n * n).
+
+    Args:
+        df: DataFrame with category_col and level_col
+        category_col: Column to group by, e.g. "category" or "issue_type"
+        level_col: Column whose distribution is profiled, e.g. "severity"
+        levels: Level columns of the result, in order (missing levels are 0)
+        top_n: Number of most frequent categories to keep
+
+    Returns:
+        pandas.DataFrame: Indexed by category (most frequent first),
+        one column per level, rows summing to 100
+    """
+    import pandas as pd
+
+    counts = pd.crosstab(df[category_col], df[level_col])
+    return _normalize_profile(counts, levels, top_n)
+
+
+def read_category_level_profile(table, category_col, level_col, levels=LEVEL_ORDER, top_n=5):
+    """
+    Same result as category_level_profile(), computed with one SQL GROUP BY.
+
+    Args:
+        table: "cyber_incidents" or "it_tickets"
+        category_col: Column to group by
+        level_col: Column whose distribution is profiled
+        levels: Level columns of the result, in order
+        top_n: Number of most frequent categories to keep
+
+    Returns:
+        pandas.DataFrame: Same shape as category_level_profile()
+    """
+    import pandas as pd
+
+    _check_columns(table, category_col, level_col)
+    conn = get_connection()
+    try:
+        rows = pd.read_sql(
+            f"SELECT {category_col} AS category, {level_col} AS level, COUNT(*) AS n "
+            f"FROM {table} WHERE {category_col} IS NOT NULL AND {level_col} IS NOT NULL "
+            f"GROUP BY {category_col}, {level_col};",
+            conn,
+        )
+    finally:
+        conn.close()
+    counts = rows.pivot(index="category", columns="level", values="n").fillna(0)
+    return _normalize_profile(counts, levels, top_n)
+
+
+def level_status_bubbles(df, x_col, y_col, mode_col, mode_name="most_common",
+                         x_order=LEVEL_ORDER, y_order=STATUS_ORDER):
+    """
+    Count and most common mode_col value at each (x_col, y_col) combination.
+
+    Works on group counts rather than the rows themselves: no copy of the
+    frame is made and the mode comes from sorted value counts instead of a
+    Python lambda per group, so it scales to millions of rows.
+
+    Args:
+        df: DataFrame with x_col, y_col and mode_col
+        x_col: Column plotted on the x axis, e.g. "priority"
+        y_col: Column plotted on the y axis, e.g. "status"
+        mode_col: Column whose most common value is reported per combination
+        mode_name: Name of the mode column in the result
+        x_order: Known x values; their index is the x position
+        y_order: Known y values; their index is the y position
+
+    Returns:
+        pandas.DataFrame: Columns x_col + "_num", y_col + "_num", "count"
+        and mode_name ("Unknown" when mode_col is empty for a combination).
+        Values not in x_order / y_order are left out.
+    """
+    counts = df.groupby([x_col, y_col], observed=True).size().rename("count").reset_index()
+    if mode_col in (x_col, y_col):
+        # Mode of a grouping column is the group value itself
+        counts["_mode"] = counts[mode_col]
+        return _position_bubbles(counts, x_col, y_col, "_mode", mode_name, x_order, y_order)
+
+    # Mode per combination: most frequent value, smallest value on ties (like Series.mode()[0])
+    modes = df.groupby([x_col, y_col, mode_col], observed=True).size().rename("n").reset_index()
+    modes = modes.sort_values([x_col, y_col, "n", mode_col], ascending=[True, True, False, True], kind="stable")
+    modes = modes.drop_duplicates([x_col, y_col])[[x_col, y_col, mode_col]]
+
+    return _position_bubbles(counts.merge(modes, on=[x_col, y_col], how="left"),
+                             x_col, y_col, mode_col, mode_name, x_order, y_order)
+
+
+def read_level_status_bubbles(table, x_col, y_col, mode_col, mode_name="most_common",
+                              x_order=LEVEL_ORDER, y_order=STATUS_ORDER):
+    """
+    Same result as level_status_bubbles(), computed in SQLite with a window query.
+
+    Args:
+        table: "cyber_incidents" or "it_tickets"
+        x_col, y_col, mode_col, mode_name, x_order, y_order: As for level_status_bubbles()
+
+    Returns:
+        pandas.DataFrame: Same shape as level_status_bubbles()
+    """
+    import pandas as pd
+
+    _check_columns(table, x_col, y_col, mode_col)
+    sql = f"""
+        WITH totals AS (
+            SELECT {x_col} AS x, {y_col} AS y, COUNT(*) AS count
+            FROM {table}
+            WHERE {x_col} IS NOT NULL AND {y_col} IS NOT NULL
+            GROUP BY {x_col}, {y_col}
+        ),
+        ranked AS (
+            SELECT {x_col} AS x, {y_col} AS y, {mode_col} AS mode,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY {x_col}, {y_col}
+                       ORDER BY COUNT(*) DESC, {mode_col} ASC
+                   ) AS rn
+            FROM {table}
+            WHERE {mode_col} IS NOT NULL
+            GROUP BY {x_col}, {y_col}, {mode_col}
+        )
+        SELECT t.x AS {x_col}, t.y AS {y_col}, t.count AS count, r.mode AS {mode_col}
+        FROM totals t
+        LEFT JOIN ranked r ON r.x = t.x AND r.y = t.y AND r.rn = 1;
+    """
+    conn = get_connection()
+    try:
+        result = pd.read_sql(sql, conn)
+    finally:
+        conn.close()
+    return _position_bubbles(result, x_col, y_col, mode_col, mode_name, x_order, y_order)
+
+
+def _group_counts_sql(table, columns):
+    """
+    SQL returning columns + n (row count) per combination of non-null values.
+
+    On the normalized tables, lookup columns are grouped by their id on the
+    base table (a scan of its index) and only the groups are joined to
+    their names, instead of joining every row through the view.
+    """
+    spec = NORMALIZED_TABLES.get(table)
+    if spec and all(col in spec["lookups"] for col in columns):
+        ids = ", ".join(f"{col}_id" for col in columns)
+        names = ", ".join(f"{col}_lk.name AS {col}" for col in columns)
+        joins = " ".join(f"JOIN {spec['lookups'][col]} AS {col}_lk ON {col}_lk.id = g.{col}_id" for col in columns)
+        return f"SELECT {names}, g.n AS n FROM (SELECT {ids}, COUNT(*) AS n FROM {spec['base']} GROUP BY {ids}) AS g {joins}"
+    cols = ", ".join(columns)
+    not_null = " AND ".join(f"{col} IS NOT NULL" for col in columns)
+    return f"SELECT {cols}, COUNT(*) AS n FROM {table} WHERE {not_null} GROUP BY {cols}"
+
+
+def read_value_counts(table, column, top_n=None):
+    """
+    Same result as df[column].value_counts(), computed with one SQL GROUP BY.
+
+    Args:
+        table: "cyber_incidents" or "it_tickets"
+        column: Column to count
+        top_n: Only keep the most frequent values (optional)
+
+    Returns:
+        pandas.Series: Counts indexed by value, most frequent first
+    """
+    import pandas as pd
+
+    _check_columns(table, column)
+    sql = f"{_group_counts_sql(table, [column])} ORDER BY n DESC, {column}"
+    params = ()
+    if top_n:
+        sql += " LIMIT ?"
+        params = (int(top_n),)
+    conn = get_connection()
+    try:
+        rows = conn.execute(sql + ";", params).fetchall()
+    finally:
+        conn.close()
+    return pd.Series([n for _, n in rows], index=pd.Index([v for v, _ in rows], name=column),
+                     name="count", dtype="int64")
+
+
+def read_crosstab(table, row_col, col_col):
+    """
+    Same result as pd.crosstab(df[row_col], df[col_col]), computed in SQLite.
+
+    Args:
+        table: "cyber_incidents" or "it_tickets"
+        row_col: Column whose values become the rows
+        col_col: Column whose values become the columns
+
+    Returns:
+        pandas.DataFrame: Counts, 0 where a combination does not occur
+    """
+    import pandas as pd
+
+    _check_columns(table, row_col, col_col)
+    conn = get_connection()
+    try:
+        rows = conn.execute(_group_counts_sql(table, [row_col, col_col]) + ";").fetchall()
+    finally:
+        conn.close()
+    counts = pd.DataFrame(rows, columns=[row_col, col_col, "n"])
+    result = counts.pivot(index=row_col, columns=col_col, values="n").fillna(0).astype("int64")
+    result.columns.name = col_col
+    return result.sort_index().sort_index(axis=1)
+
+
+# table -> (level column, category column) of its dashboard
+DASHBOARD_COLUMNS = {
+    "cyber_incidents": ("severity", "category"),
+    "it_tickets": ("priority", "issue_type"),
+}
+
+
+def read_dashboard_summary(table):
+    """
+    Run the four chart aggregations of a dashboard page one after another.
+
+    See async_api.dashboard_summary() for the concurrent version.
+
+    Args:
+        table: "cyber_incidents" or "it_tickets"
+
+    Returns:
+        dict: by_level, by_status, top_categories (Series) and
+        level_by_status (DataFrame)
+    """
+    level_col, category_col = DASHBOARD_COLUMNS[table]
+    return {
+        "by_level": read_value_counts(table, level_col),
+        "by_status": read_value_counts(table, "status"),
+        "top_categories": read_value_counts(table, category_col, top_n=10),
+        "level_by_status": read_crosstab(table, level_col, "status"),
+    }
+
+
+def _position_bubbles(result, x_col, y_col, mode_col, mode_name, x_order, y_order):
+    result[f"{x_col}_num"] = result[x_col].astype(object).map({v: i for i, v in enumerate(x_order)})
+    result[f"{y_col}_num"] = result[y_col].astype(object).map({v: i for i, v in enumerate(y_order)})
+    result = result.dropna(subset=[f"{x_col}_num", f"{y_col}_num"])
+    result[mode_name] = result[mode_col].astype(object).where(result[mode_col].notna(), "Unknown")
+    result = result.astype({f"{x_col}_num": int, f"{y_col}_num": int})
+    return result[[f"{x_col}_num", f"{y_col}_num", "count", mode_name]] \
+        .sort_values([f"{x_col}_num", f"{y_col}_num"]).reset_index(drop=True)
+
+
+def _normalize_profile(counts, levels, top_n):
+    totals = counts.sum(axis=1)
+    totals = totals[totals > 0]
+    # Categories are ranked by rows that have both values
+    top = totals.sort_values(ascending=False, kind="stable").head(top_n).index
+    counts = counts.loc[top]
+    profile = counts.div(totals.loc[top], axis=0) * 100
+    profile = profile.reindex(columns=list(levels), fill_value=0)
+    profile.columns.name = None
+    return profile
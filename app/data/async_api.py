@@ -0,0 +1,167 @@
+"""
+Async counterparts of the app/data functions.
+
+Every data function opens its own connection, so independent calls can run
+side by side on a dedicated pool of database threads: sqlite3 releases the
+GIL while SQLite executes a statement, so several aggregations over a large
+table overlap instead of queueing. Coroutines here are the blocking
+functions run on that pool (`await read_all_tickets()`); run_concurrently()
+gives synchronous callers such as Streamlit pages the same overlap without
+an event loop.
+
+The JSON API runs all of its data calls through run_async(), so the pages,
+the API and the benchmarks share one bounded pool.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from . import analytics, audit, cyber_incidents, datasets, generations, it_tickets, pagination, snapshots, users
+
+ASYNC_WORKERS = 8
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the database thread pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=ASYNC_WORKERS, thread_name_prefix="data-async")
+        return _executor
+
+
+def configure(workers):
+    """
+    Resize the database thread pool (waits for running calls to finish).
+
+    Args:
+        workers: Number of database threads
+    """
+    global _executor, ASYNC_WORKERS
+    with _executor_lock:
+        old, _executor = _executor, None
+        ASYNC_WORKERS = workers
+    if old is not None:
+        old.shutdown(wait=True)
+
+
+def shutdown():
+    """Stop the database thread pool (a later call starts a new one)."""
+    configure(ASYNC_WORKERS)
+
+
+async def run_async(fn, *args, **kwargs):
+    """Run a blocking function on the database thread pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def run_concurrently(calls):
+    """
+    Run independent blocking calls at the same time and wait for all of them.
+
+    For synchronous code (e.g. a Streamlit page); the first exception raised
+    by a call is re-raised once all calls have finished.
+
+    Args:
+        calls: Iterable of (function, args) or (function, args, kwargs)
+
+    Returns:
+        list: Results in the order of `calls`
+    """
+    executor = get_executor()
+    futures = []
+    for call in calls:
+        fn, args, kwargs = (tuple(call) + ({},))[:3]
+        futures.append(executor.submit(fn, *args, **kwargs))
+    errors = [f.exception() for f in futures]
+    for error in errors:
+        if error is not None:
+            raise error
+    return [f.result() for f in futures]
+
+
+def _async(fn):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await run_async(fn, *args, **kwargs)
+    wrapper.__doc__ = f"Async version of {fn.__module__}.{fn.__name__}().\n\n{fn.__doc__ or ''}"
+    return wrapper
+
+
+# Cyber incidents
+read_all_cyber_incidents = _async(cyber_incidents.read_all_cyber_incidents)
+read_cyber_incidents_by_ids = _async(cyber_incidents.read_cyber_incidents_by_ids)
+create_incident = _async(cyber_incidents.create_incident)
+get_incident_by_id = _async(cyber_incidents.get_incident_by_id)
+get_all_incidents = _async(cyber_incidents.get_all_incidents)
+update_incident = _async(cyber_incidents.update_incident)
+delete_incident = _async(cyber_incidents.delete_incident)
+
+# IT tickets
+read_all_tickets = _async(it_tickets.read_all_tickets)
+read_tickets_by_ids = _async(it_tickets.read_tickets_by_ids)
+create_ticket = _async(it_tickets.create_ticket)
+get_ticket_by_id = _async(it_tickets.get_ticket_by_id)
+get_all_tickets = _async(it_tickets.get_all_tickets)
+update_ticket = _async(it_tickets.update_ticket)
+delete_ticket = _async(it_tickets.delete_ticket)
+
+# Datasets
+read_all_datasets = _async(datasets.read_all_datasets)
+create_dataset = _async(datasets.create_dataset)
+get_dataset_by_id = _async(datasets.get_dataset_by_id)
+get_all_datasets = _async(datasets.get_all_datasets)
+update_dataset = _async(datasets.update_dataset)
+delete_dataset = _async(datasets.delete_dataset)
+
+# Users
+create_user_secure = _async(users.create_user_secure)
+get_user_by_id = _async(users.get_user_by_id)
+get_user_by_username = _async(users.get_user_by_username)
+get_all_users = _async(users.get_all_users)
+update_user = _async(users.update_user)
+delete_user = _async(users.delete_user)
+unlock_user_account = _async(users.unlock_user_account)
+
+# Aggregations, snapshots, listings
+read_value_counts = _async(analytics.read_value_counts)
+read_crosstab = _async(analytics.read_crosstab)
+read_category_level_profile = _async(analytics.read_category_level_profile)
+read_level_status_bubbles = _async(analytics.read_level_status_bubbles)
+read_table = _async(snapshots.read_table)
+get_table_generation = _async(generations.get_table_generation)
+get_table_generations = _async(generations.get_table_generations)
+list_rows = _async(pagination.list_rows)
+get_row = _async(pagination.get_row)
+get_audit_events = _async(audit.get_audit_events)
+get_audit_event_counts = _async(audit.get_audit_event_counts)
+
+
+async def dashboard_summary(table):
+    """
+    Run the four chart aggregations of a dashboard page concurrently.
+
+    Args:
+        table: "cyber_incidents" or "it_tickets"
+
+    Returns:
+        dict: Same as analytics.read_dashboard_summary()
+    """
+    level_col, category_col = analytics.DASHBOARD_COLUMNS[table]
+    by_level, by_status, top_categories, level_by_status = await asyncio.gather(
+        read_value_counts(table, level_col),
+        read_value_counts(table, "status"),
+        read_value_counts(table, category_col, top_n=10),
+        read_crosstab(table, level_col, "status"),
+    )
+    return {
+        "by_level": by_level,
+        "by_status": by_status,
+        "top_categories": top_categories,
+        "level_by_status": level_by_status,
+    }
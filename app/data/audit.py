@@ -0,0 +1,192 @@
+import atexit
+import json
+import queue
+import threading
+from datetime import datetime
+
+from .db import get_connection
+
+
+AUDIT_COLUMNS = ["id", "created_at", "event_type", "user_id", "username", "actor", "details"]
+
+# Flush at least this often, or as soon as this many events are queued
+FLUSH_INTERVAL = 1.0
+BATCH_SIZE = 200
+
+
+class AuditWriter:
+    """
+    Background writer for the audit_events table.
+
+    Events are put on a queue and a single thread inserts them in batches,
+    one transaction per batch, so callers never wait for a commit.
+    """
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL, batch_size=BATCH_SIZE):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, event):
+        self._ensure_started()
+        self._queue.put(event)
+
+    def flush(self, timeout=5.0):
+        """Block until every event submitted so far has been written."""
+        self._ensure_started()
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _run(self):
+        while True:
+            batch, waiters = [], []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            # Drain whatever else is already waiting, up to one batch
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write(batch)
+            for waiter in waiters:
+                waiter.set()
+
+    def _write(self, batch):
+        conn = get_connection()
+        try:
+            conn.executemany("""
+                INSERT INTO audit_events
+                (created_at, event_type, user_id, username, actor, details)
+                VALUES (?, ?, ?, ?, ?, ?);
+            """, batch)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"Error writing audit events: {e}")
+        finally:
+            conn.close()
+
+
+_writer = AuditWriter()
+atexit.register(_writer.flush)
+
+
+def record_event(event_type, user_id=None, username=None, actor=None, details=None):
+    """
+    Queue an audit event. Returns immediately; the write happens in the background.
+
+    Args:
+        event_type: Event name, e.g. "user_created", "user_deleted"
+        user_id: ID of the affected user (optional)
+        username: Username of the affected user (optional)
+        actor: Username of whoever performed the action (optional)
+        details: Extra JSON-serialisable information (optional, never passwords)
+    """
+    _writer.submit((
+        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        event_type,
+        user_id,
+        username,
+        actor,
+        json.dumps(details) if details is not None else None,
+    ))
+
+
+def flush_audit_events():
+    """Write all queued audit events now."""
+    _writer.flush()
+
+
+def get_audit_events(event_type=None, username=None, actor=None, since=None, until=None, limit=100, offset=0):
+    """
+    Get audit events, newest first.
+
+    Args:
+        event_type: Only this event type (optional)
+        username: Only events affecting this username (optional)
+        actor: Only events performed by this username (optional)
+        since: Lower bound "YYYY-MM-DD HH:MM:SS" (optional, inclusive)
+        until: Upper bound "YYYY-MM-DD HH:MM:SS" (optional, inclusive)
+        limit: Maximum number of events
+        offset: Number of events to skip (for paging)
+
+    Returns:
+        list: List of audit event records (see AUDIT_COLUMNS)
+    """
+    flush_audit_events()
+
+    clauses, params = [], []
+    for column, value in (("event_type", event_type), ("username", username), ("actor", actor)):
+        if value:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if since:
+        clauses.append("created_at >= ?")
+        params.append(since)
+    if until:
+        clauses.append("created_at <= ?")
+        params.append(until)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    conn = get_connection()
+    curr = conn.cursor()
+    try:
+        curr.execute(
+            f"SELECT {', '.join(AUDIT_COLUMNS)} FROM audit_events {where} "
+            "ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?;",
+            (*params, limit, offset),
+        )
+        return curr.fetchall()
+    finally:
+        conn.close()
+
+
+def get_audit_event_counts(since=None):
+    """
+    Count audit events per event type.
+
+    Args:
+        since: Lower bound "YYYY-MM-DD HH:MM:SS" (optional)
+
+    Returns:
+        list: (event_type, count) tuples, most frequent first
+    """
+    flush_audit_events()
+    conn = get_connection()
+    curr = conn.cursor()
+    try:
+        if since:
+            curr.execute("""
+                SELECT event_type, COUNT(*) FROM audit_events
+                WHERE created_at >= ?
+                GROUP BY event_type ORDER BY COUNT(*) DESC;
+            """, (since,))
+        else:
+            curr.execute("""
+                SELECT event_type, COUNT(*) FROM audit_events
+                GROUP BY event_type ORDER BY COUNT(*) DESC;
+            """)
+        return curr.fetchall()
+    finally:
+        conn.close()
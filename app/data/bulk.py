@@ -0,0 +1,192 @@
+"""
+Bulk import and export of the platform tables from and to files (used by the batch CLI).
+
+Files are CSV, JSON lines or a JSON array (picked from the extension).
+They are streamed in chunks, so memory stays bounded on large files. An
+import runs in one transaction: a bad row rolls back the whole file, so a
+failed cron run can simply be repeated. Only the columns listed in
+pagination.LISTINGS are read or written, which keeps password hashes out of
+exports.
+"""
+import os
+import sys
+
+from .db import get_connection
+from .it_tickets import _fill_missing_issue_types
+from .lookups import NORMALIZED_TABLES
+from .pagination import LISTINGS
+
+CHUNK_ROWS = 50_000
+FORMATS = ("csv", "jsonl", "json")
+
+# Tables that can be imported with import_file() (users go through
+# users.load_users_from_file(), which handles their secrets)
+IMPORT_TABLES = ("cyber_incidents", "it_tickets", "datasets_metadata")
+
+# Column names older CSV exports use
+RENAMED_COLUMNS = {
+    "it_tickets": {"created_at": "created"},
+}
+
+
+def file_format(path, fmt=None):
+    """
+    Work out a file's format.
+
+    Args:
+        path: File path
+        fmt: Explicit format, one of FORMATS (default: from the extension, else csv)
+
+    Returns:
+        str: One of FORMATS
+    """
+    if fmt:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r} (choose from {', '.join(FORMATS)})")
+        return fmt
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    return {"ndjson": "jsonl"}.get(extension, extension) if extension in FORMATS + ("ndjson",) else "csv"
+
+
+def _read_chunks(path, fmt):
+    import pandas as pd
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=CHUNK_ROWS)
+    elif fmt == "jsonl":
+        yield from pd.read_json(path, lines=True, chunksize=CHUNK_ROWS, dtype=False)
+    else:
+        yield pd.read_json(path, orient="records", dtype=False)
+
+
+def upsert_frame(conn, table, df, key):
+    """
+    Write a DataFrame to a table, replacing the rows that have its keys.
+
+    The key columns have no UNIQUE constraint, so INSERT OR REPLACE would not
+    find the old rows: they are deleted by key and the frame is inserted. Both
+    run on the caller's connection, which commits or rolls back.
+
+    Args:
+        conn: Open connection
+        table: Table or normalized view, e.g. "cyber_incidents"
+        df: Rows to write, with the table's column names
+        key: Key column, e.g. "incident_id"
+
+    Returns:
+        int: Number of rows written
+    """
+    # Normalized views are deleted from through their base table (same key),
+    # which skips the view's lookup joins
+    source = NORMALIZED_TABLES[table]["base"] if table in NORMALIZED_TABLES else table
+    keys = df[key].dropna().unique().tolist()
+    curr = conn.cursor()
+    for i in range(0, len(keys), 500):
+        chunk = keys[i:i + 500]
+        curr.execute(f"DELETE FROM {source} WHERE {key} IN ({', '.join('?' * len(chunk))});", chunk)
+    df.to_sql(table, conn, if_exists="append", index=False)
+    return len(df)
+
+
+def import_file(table, path, fmt=None, progress=None):
+    """
+    Append the rows of a file to a table in one transaction.
+
+    Unknown columns are ignored; ticket issue types left empty are filled
+    in the same way as by migrate_tickets().
+
+    Args:
+        table: One of IMPORT_TABLES
+        path: CSV / JSON lines / JSON file ("-" for stdin)
+        fmt: Explicit format (default: from the extension)
+        progress: Called as progress(None, message) after every chunk
+            (optional, used by background jobs)
+
+    Returns:
+        int: Number of rows imported
+
+    Raises:
+        ValueError: Unknown table, or the file lacks the table's key column
+        sqlite3.Error: A row was rejected (nothing is imported)
+    """
+    if table not in IMPORT_TABLES:
+        raise ValueError(f"Cannot import into {table!r} (choose from {', '.join(IMPORT_TABLES)})")
+    spec = LISTINGS[table]
+    fmt = file_format(path, fmt)
+    source = sys.stdin if path == "-" else path
+
+    conn = get_connection()
+    curr = conn.cursor()
+    total = 0
+    try:
+        for chunk in _read_chunks(source, fmt):
+            chunk = chunk.rename(columns=RENAMED_COLUMNS.get(table, {}))
+            if spec["key"] not in chunk.columns:
+                raise ValueError(f"{path}: missing the {spec['key']!r} column")
+            columns = [col for col in spec["columns"] if col in chunk.columns]
+            chunk = chunk[columns]
+            if table == "it_tickets":
+                chunk = _fill_missing_issue_types(chunk.copy())
+            # NaN -> NULL
+            chunk = chunk.astype(object).where(chunk.notna(), None)
+            curr.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))});",
+                chunk.itertuples(index=False, name=None),
+            )
+            total += len(chunk)
+            if progress is not None:
+                progress(None, f"{total} rows read")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return total
+
+
+def export_table(table, path, fmt=None):
+    """
+    Write a table to a file, streamed in chunks ordered by its key.
+
+    Args:
+        table: Key of pagination.LISTINGS
+        path: Output file, or an open text file such as sys.stdout
+        fmt: Explicit format (default: from the extension, csv for open files)
+
+    Returns:
+        int: Number of rows written
+    """
+    import pandas as pd
+    spec = LISTINGS.get(table)
+    if spec is None:
+        raise ValueError(f"Unknown table {table!r}")
+    to_file = hasattr(path, "write")
+    fmt = file_format("" if to_file else path, fmt)
+    sql = f"SELECT {', '.join(spec['columns'])} FROM {table} ORDER BY {spec['key']};"
+
+    out = path if to_file else open(path, "w", newline="", encoding="utf-8")
+    conn = get_connection()
+    total = 0
+    try:
+        if fmt == "json":
+            out.write("[")
+        for chunk in pd.read_sql(sql, conn, chunksize=CHUNK_ROWS):
+            if chunk.empty:
+                continue
+            if fmt == "csv":
+                chunk.to_csv(out, index=False, header=total == 0)
+            elif fmt == "jsonl":
+                out.write(chunk.to_json(orient="records", lines=True).rstrip("\n") + "\n")
+            else:
+                # A JSON array per chunk, without its brackets
+                out.write(("," if total else "") + chunk.to_json(orient="records")[1:-1])
+            total += len(chunk)
+        if fmt == "json":
+            out.write("]\n")
+        elif fmt == "csv" and total == 0:
+            out.write(",".join(spec["columns"]) + "\n")
+    finally:
+        conn.close()
+        if not to_file:
+            out.close()
+    return total
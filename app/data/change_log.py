@@ -0,0 +1,161 @@
+from .db import get_connection
+
+# A change with a NULL key and this op means every row of the table may have
+# changed (bulk loads that bypass the triggers); consumers must re-read it all.
+RELOAD_OP = "reload"
+
+# Logical table -> key column recorded in change_log (see schema.create_tables)
+CHANGE_LOG_KEYS = {
+    "users": "id",
+    "cyber_incidents": "incident_id",
+    "it_tickets": "ticket_id",
+    "datasets_metadata": "dataset_id",
+}
+
+
+def record_table_reload(curr, table):
+    """
+    Record that a table was rewritten without going through the triggers.
+
+    Args:
+        curr: Cursor of the transaction that did the rewrite
+        table: Logical table name (one of CHANGE_LOG_KEYS)
+    """
+    curr.execute(
+        "INSERT INTO change_log (table_name, row_key, op) VALUES (?, NULL, ?);",
+        (table, RELOAD_OP),
+    )
+
+
+def latest_change_seq():
+    """
+    Get the sequence number of the last recorded change.
+
+    Returns:
+        int: Last sequence number (0 if nothing was ever recorded)
+    """
+    conn = get_connection()
+    curr = conn.cursor()
+    try:
+        # AUTOINCREMENT keeps the high-water mark even after pruning
+        curr.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log';")
+        row = curr.fetchone()
+        return row[0] if row else 0
+    finally:
+        conn.close()
+
+
+def changes_since(seq, table=None, limit=None):
+    """
+    Get the changes recorded after a sequence number, oldest first.
+
+    Args:
+        seq: Last sequence number the caller has already applied
+        table: Only return changes to this table (optional)
+        limit: Maximum number of changes to return (optional)
+
+    Returns:
+        list: Dicts with seq, table, key, op ("insert", "update", "delete"
+        or RELOAD_OP with key None) and changed_at
+    """
+    sql = "SELECT seq, table_name, row_key, op, changed_at FROM change_log WHERE seq > ?"
+    params = [seq]
+    if table is not None:
+        sql += " AND table_name = ?"
+        params.append(table)
+    sql += " ORDER BY seq"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    conn = get_connection()
+    curr = conn.cursor()
+    try:
+        curr.execute(sql + ";", params)
+        return [
+            {"seq": s, "table": t, "key": k, "op": op, "changed_at": at}
+            for s, t, k, op, at in curr.fetchall()
+        ]
+    finally:
+        conn.close()
+
+
+def changed_keys(seq, table):
+    """
+    Collapse the changes to one table into the last operation per key.
+
+    Args:
+        seq: Last sequence number the caller has already applied
+        table: Logical table name (one of CHANGE_LOG_KEYS)
+
+    Returns:
+        tuple: (last seq seen, {key: last op}); last seq is `seq` when
+        nothing changed. A None key means the whole table was reloaded.
+    """
+    conn = get_connection()
+    curr = conn.cursor()
+    try:
+        curr.execute(
+            """
+            SELECT row_key, op, seq FROM change_log
+            WHERE table_name = ? AND seq > ?
+            ORDER BY seq;
+            """,
+            (table, seq),
+        )
+        keys = {}
+        last = seq
+        for key, op, row_seq in curr.fetchall():
+            keys[key] = op
+            last = row_seq
+        return last, keys
+    finally:
+        conn.close()
+
+
+def change_log_covers(seq):
+    """
+    Check that no change after `seq` has been pruned from the log.
+
+    A caller whose state is at `seq` can only apply deltas while this is
+    True; otherwise it has to rebuild from a full read.
+
+    Returns:
+        bool: True if changes_since(seq) is complete
+    """
+    conn = get_connection()
+    curr = conn.cursor()
+    try:
+        curr.execute("SELECT MIN(seq) FROM change_log;")
+        oldest = curr.fetchone()[0]
+    finally:
+        conn.close()
+    if oldest is None:
+        return seq >= latest_change_seq()
+    return seq >= oldest - 1
+
+
+def prune_change_log(keep=100000):
+    """
+    Delete all but the most recent `keep` changes.
+
+    Args:
+        keep: Number of most recent changes to keep
+
+    Returns:
+        int: Number of changes deleted
+    """
+    conn = get_connection()
+    curr = conn.cursor()
+    try:
+        curr.execute(
+            "DELETE FROM change_log WHERE seq <= (SELECT COALESCE(MAX(seq), 0) FROM change_log) - ?;",
+            (keep,),
+        )
+        conn.commit()
+        return curr.rowcount
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
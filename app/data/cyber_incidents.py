@@ -1,35 +1,89 @@
-import pandas as pd
 from .db import get_connection
+from .dtypes import optimize_incidents
 
 
-def migrate_cyber_incidents():
+def migrate_cyber_incidents(path="DATA/cyber_incidents.csv"):
     """
     Migrate cyber incidents from CSV file to database.
+    
+    Incidents already in the database are replaced by the file's version
+    (matched by incident_id), so loading a file again adds no duplicates.
+    
+    Args:
+        path: CSV file to load (default: "DATA/cyber_incidents.csv")
+    
+    Returns:
+        int: Number of rows migrated, or None if the migration failed
     """
+    import pandas as pd
+    from .bulk import upsert_frame
     try:
-        df = pd.read_csv("DATA/cyber_incidents.csv")
+        df = pd.read_csv(path)
         conn = get_connection()
-        df.to_sql("cyber_incidents", conn, if_exists="append", index=False)
-        conn.close()
+        try:
+            count = upsert_frame(conn, "cyber_incidents", df, "incident_id")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return count
     except FileNotFoundError:
         print("Warning: cyber_incidents.csv not found")
     except Exception as e:
         print(f"Error migrating cyber incidents: {e}")
 
 
-def read_all_cyber_incidents():
+def read_all_cyber_incidents(optimize=True):
     """
     Read all cyber incidents from the database.
     
+    Args:
+        optimize: Return compact dtypes (ordered categoricals for severity and
+            status, categorical category, parsed timestamp, downcast id)
+    
     Returns:
         pandas.DataFrame: DataFrame containing all cyber incidents
     """
+    import pandas as pd
     conn = get_connection()
     try:
         df = pd.read_sql("SELECT * FROM cyber_incidents;", conn)
-        return df
     finally:
         conn.close()
+    return optimize_incidents(df) if optimize else df
+
+
+def read_cyber_incidents_by_ids(incident_ids, optimize=True):
+    """
+    Read the cyber incidents with the given IDs (e.g. the keys from changes_since()).
+    
+    Args:
+        incident_ids: Incident IDs to read
+        optimize: Return the same compact dtypes as read_all_cyber_incidents()
+    
+    Returns:
+        pandas.DataFrame: Matching incidents, same columns as read_all_cyber_incidents()
+    """
+    import pandas as pd
+    incident_ids = list(incident_ids)
+    conn = get_connection()
+    try:
+        frames = []
+        # Stay well below SQLite's limit on bound parameters
+        for i in range(0, len(incident_ids), 500):
+            chunk = incident_ids[i:i + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            frames.append(pd.read_sql(
+                f"SELECT * FROM cyber_incidents WHERE incident_id IN ({placeholders});", conn, params=chunk
+            ))
+        if not frames:
+            frames.append(pd.read_sql("SELECT * FROM cyber_incidents WHERE 0;", conn))
+    finally:
+        conn.close()
+    df = pd.concat(frames, ignore_index=True)
+    return optimize_incidents(df) if optimize else df
 
 
 # CRUD
@@ -0,0 +1,342 @@
+"""
+Profiling of uploaded dataset files for the datasets catalog.
+
+profile_file() reads a CSV/TSV, JSON lines or Parquet file once, in chunks,
+and returns its row and column counts, file size and per-column statistics
+(type, null count, min/max/mean/std for numbers, longest value for text).
+Memory is bounded by one chunk: column statistics are merged chunk by chunk
+(means and variances with Chan's parallel update), so multi-GB files can be
+profiled. save_dataset_profile() writes the result to datasets_metadata and
+dataset_columns.
+"""
+import math
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+from . import db
+from .db import get_connection
+
+CHUNK_ROWS = 100_000
+FORMATS = ("csv", "tsv", "jsonl", "parquet")
+
+DATASET_COLUMNS = [
+    "dataset_id", "position", "name", "dtype", "non_null", "nulls",
+    "min_value", "max_value", "mean", "std", "max_length",
+]
+
+def _pyarrow_parquet():
+    # Optional dependency, only needed for Parquet files
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None
+    return pq
+
+
+def file_format(name, fmt=None):
+    """
+    Work out a dataset file's format from its name.
+
+    Args:
+        name: File name or path
+        fmt: Explicit format, one of FORMATS
+
+    Returns:
+        str: One of FORMATS (csv when the extension is unknown)
+    """
+    if fmt:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r} (choose from {', '.join(FORMATS)})")
+        return fmt
+    extension = os.path.splitext(str(name))[1].lower().lstrip(".")
+    return {"ndjson": "jsonl", "pq": "parquet", "tab": "tsv"}.get(extension, extension) \
+        if extension in FORMATS + ("ndjson", "pq", "tab") else "csv"
+
+
+def _read_chunks(source, fmt, chunk_rows):
+    import pandas as pd
+    if fmt in ("csv", "tsv"):
+        yield from pd.read_csv(source, sep="\t" if fmt == "tsv" else ",", chunksize=chunk_rows)
+    elif fmt == "jsonl":
+        yield from pd.read_json(source, lines=True, chunksize=chunk_rows)
+    else:
+        pq = _pyarrow_parquet()
+        if pq is None:
+            raise ValueError("Profiling Parquet files needs pyarrow; install it with pip")
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+
+
+def _kind(series):
+    from pandas.api import types
+    if types.is_bool_dtype(series):
+        return "boolean"
+    if types.is_integer_dtype(series):
+        return "integer"
+    if types.is_float_dtype(series):
+        return "float"
+    if types.is_datetime64_any_dtype(series):
+        return "datetime"
+    return "string"
+
+
+def _merge_kinds(a, b):
+    if a is None or a == b:
+        return b
+    if {a, b} == {"integer", "float"}:
+        return "float"
+    return "string"
+
+
+class _ColumnStats:
+    """Running statistics of one column."""
+
+    def __init__(self, name):
+        self.name = name
+        self.kind = None
+        self.non_null = 0
+        self.nulls = 0
+        self.min = self.max = None
+        self.count = 0       # numeric values seen
+        self.mean = 0.0
+        self.m2 = 0.0        # sum of squared deviations from the mean
+        self.max_length = None
+
+    def update(self, series):
+        values = series.dropna()
+        self.nulls += len(series) - len(values)
+        self.non_null += len(values)
+        if values.empty:
+            # An all-null chunk says nothing about the type
+            return
+        self.kind = _merge_kinds(self.kind, _kind(values))
+
+        if self.kind in ("integer", "float"):
+            values = values.astype("float64")
+            n, mean = len(values), float(values.mean())
+            m2 = float(((values - mean) ** 2).sum())
+            delta, total = mean - self.mean, self.count + n
+            self.mean += delta * n / total
+            self.m2 += m2 + delta * delta * self.count * n / total
+            self.count = total
+            low, high = float(values.min()), float(values.max())
+        elif self.kind == "datetime":
+            low, high = values.min().isoformat(), values.max().isoformat()
+        elif self.kind == "string":
+            # Also after mixed types: numeric statistics no longer mean anything
+            self.min = self.max = None
+            self.count = 0
+            lengths = values.astype(str).str.len()
+            self.max_length = max(self.max_length or 0, int(lengths.max()))
+            return
+        else:
+            return
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def result(self, position):
+        numeric = self.kind in ("integer", "float") and self.count
+        return {
+            "position": position,
+            "name": self.name,
+            "dtype": self.kind or "empty",
+            "non_null": self.non_null,
+            "nulls": self.nulls,
+            "min_value": self.min,
+            "max_value": self.max,
+            "mean": self.mean if numeric else None,
+            "std": math.sqrt(self.m2 / (self.count - 1)) if numeric and self.count > 1 else None,
+            "max_length": self.max_length,
+        }
+
+
+def profile_file(source, name=None, fmt=None, chunk_rows=CHUNK_ROWS, progress=None):
+    """
+    Profile a dataset file in one streaming pass.
+
+    Args:
+        source: Path or binary file-like object (e.g. a Streamlit upload)
+        name: File name, used for the format when source is a file object
+        fmt: Explicit format, one of FORMATS (default: from the name)
+        chunk_rows: Rows held in memory at a time
+        progress: Called as progress(fraction, message) after every chunk
+            (optional, used by background jobs)
+
+    Returns:
+        dict: name, format, rows, columns, file_bytes, seconds and
+        column_stats (one dict per column, see DATASET_COLUMNS)
+
+    Raises:
+        ValueError: Unknown format, or Parquet without pyarrow
+    """
+    start = time.perf_counter()
+    is_path = isinstance(source, (str, os.PathLike))
+    name = name or (os.path.basename(source) if is_path else getattr(source, "name", "dataset"))
+    fmt = file_format(name, fmt)
+    if is_path:
+        file_bytes = os.path.getsize(source)
+    else:
+        file_bytes = getattr(source, "size", None)
+
+    # Paths are opened here, so the read position gives the progress
+    handle = open(source, "rb") if is_path else source
+    try:
+        rows, stats = _profile_chunks(_read_chunks(handle, fmt, chunk_rows), handle, file_bytes, progress)
+    finally:
+        if is_path:
+            handle.close()
+
+    return {
+        "name": name,
+        "format": fmt,
+        "rows": rows,
+        "columns": len(stats),
+        "file_bytes": file_bytes,
+        "seconds": time.perf_counter() - start,
+        "column_stats": [column.result(i) for i, column in enumerate(stats.values())],
+    }
+
+
+def _profile_chunks(chunks, handle, file_bytes, progress):
+    rows, stats = 0, {}
+    for chunk in chunks:
+        for column in chunk.columns:
+            if column not in stats:
+                stats[column] = _ColumnStats(str(column))
+                # Columns missing from earlier chunks (JSON lines) were null there
+                stats[column].nulls = rows
+            stats[column].update(chunk[column])
+        for column in stats.keys() - set(chunk.columns):
+            stats[column].nulls += len(chunk)
+        rows += len(chunk)
+        if progress is not None:
+            fraction = min(handle.tell() / file_bytes, 1.0) if file_bytes and hasattr(handle, "tell") else None
+            progress(fraction, f"{rows} rows profiled")
+    return rows, stats
+
+
+def save_dataset_profile(profile, dataset_id=None, uploaded_by=None, upload_date=None):
+    """
+    Write a profile to the catalog in one transaction.
+
+    An existing dataset_id is updated (its column statistics replaced);
+    otherwise a new dataset is added.
+
+    Args:
+        profile: Result of profile_file()
+        dataset_id: Dataset to update (default: a new id)
+        uploaded_by: Username who uploaded the file (optional)
+        upload_date: Upload date (default: today)
+
+    Returns:
+        int: The dataset ID
+    """
+    upload_date = upload_date or datetime.now().strftime("%Y-%m-%d")
+    profiled_at = datetime.now().isoformat(timespec="seconds")
+    conn = get_connection()
+    curr = conn.cursor()
+    try:
+        # Take the write lock before choosing the id: dataset_id is not
+        # UNIQUE, so two saves reading the same MAX() would share an id
+        curr.execute("BEGIN IMMEDIATE;")
+        exists = False
+        if dataset_id is None:
+            curr.execute("SELECT COALESCE(MAX(dataset_id), 0) + 1 FROM datasets_metadata;")
+            dataset_id = curr.fetchone()[0]
+        else:
+            curr.execute("SELECT 1 FROM datasets_metadata WHERE dataset_id = ?;", (dataset_id,))
+            exists = curr.fetchone() is not None
+        values = (profile["name"], profile["rows"], profile["columns"], uploaded_by, upload_date,
+                  profile["file_bytes"], profile["format"], profiled_at, profile["seconds"])
+        if exists:
+            curr.execute("""
+                UPDATE datasets_metadata
+                SET name = ?, rows = ?, columns = ?, uploaded_by = ?, upload_date = ?,
+                    file_bytes = ?, file_format = ?, profiled_at = ?, profile_seconds = ?
+                WHERE dataset_id = ?;
+            """, values + (dataset_id,))
+        else:
+            curr.execute("""
+                INSERT INTO datasets_metadata
+                (name, rows, columns, uploaded_by, upload_date, file_bytes, file_format, profiled_at,
+                 profile_seconds, dataset_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+            """, values + (dataset_id,))
+        curr.execute("DELETE FROM dataset_columns WHERE dataset_id = ?;", (dataset_id,))
+        curr.executemany(
+            f"INSERT INTO dataset_columns ({', '.join(DATASET_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(DATASET_COLUMNS))});",
+            [(dataset_id,) + tuple(column[c] for c in DATASET_COLUMNS[1:]) for column in profile["column_stats"]],
+        )
+        conn.commit()
+        return dataset_id
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def profile_and_register(source, name=None, fmt=None, dataset_id=None, uploaded_by=None, progress=None):
+    """
+    Profile a file and add (or refresh) its catalog entry.
+
+    Arguments are those of profile_file() and save_dataset_profile().
+
+    Returns:
+        tuple: (dataset_id, profile)
+    """
+    profile = profile_file(source, name=name, fmt=fmt, progress=progress)
+    return save_dataset_profile(profile, dataset_id=dataset_id, uploaded_by=uploaded_by), profile
+
+
+def save_upload(fileobj, name):
+    """
+    Save an uploaded file next to the database, for a background profile job.
+
+    Args:
+        fileobj: Binary file-like object (e.g. a Streamlit upload)
+        name: Original file name (kept at the end, after a timestamp and a
+            random part, for the format)
+
+    Returns:
+        str: Path of the saved file, unique even for uploads of the same
+        name in the same second
+    """
+    directory = os.path.join(os.path.dirname(os.path.abspath(db.DB_PATH)), "uploads")
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(
+        dir=directory, prefix=f"{datetime.now():%Y%m%d%H%M%S}_", suffix=f"_{os.path.basename(name)}"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            shutil.copyfileobj(fileobj, f, 1 << 20)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def get_dataset_columns(dataset_id):
+    """
+    Read the column statistics of a profiled dataset.
+
+    Args:
+        dataset_id: The dataset ID
+
+    Returns:
+        pandas.DataFrame: One row per column, in file order (empty if the
+        dataset was never profiled)
+    """
+    import pandas as pd
+    conn = get_connection()
+    try:
+        return pd.read_sql(
+            f"SELECT {', '.join(DATASET_COLUMNS[1:])} FROM dataset_columns WHERE dataset_id = ? ORDER BY position;",
+            conn, params=(dataset_id,),
+        )
+    finally:
+        conn.close()
@@ -1,14 +1,24 @@
-import pandas as pd
-
 from .db import get_connection
 
-def migrate_datasets():
-    df = pd.read_csv("DATA/datasets_metadata.csv")
+
+def migrate_datasets(path="DATA/datasets_metadata.csv"):
+    # Datasets already in the database are replaced by the file's version
+    import pandas as pd
+    from .bulk import upsert_frame
+    df = pd.read_csv(path)
     conn = get_connection()
-    df.to_sql("datasets_metadata", conn, if_exists="append", index=False)
-    conn.close()
+    try:
+        count = upsert_frame(conn, "datasets_metadata", df, "dataset_id")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return count
 
 def read_all_datasets():
+    import pandas as pd
     conn = get_connection()
     df = pd.read_sql("SELECT * FROM datasets_metadata;", conn)
     conn.close()
@@ -83,9 +93,21 @@ def update_dataset(dataset_id, name, rows, columns, uploaded_by=None, upload_dat
     conn.close()
 
 def delete_dataset(dataset_id):
+    """
+    Delete a dataset record and its profiled column statistics.
+
+    Args:
+        dataset_id: The dataset ID
+    """
     conn = get_connection()
     curr = conn.cursor()
-    curr.execute("DELETE FROM datasets_metadata WHERE dataset_id = ?;", (dataset_id,))
-    conn.commit()
-    conn.close()
+    try:
+        curr.execute("DELETE FROM dataset_columns WHERE dataset_id = ?;", (dataset_id,))
+        curr.execute("DELETE FROM datasets_metadata WHERE dataset_id = ?;", (dataset_id,))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
 
@@ -1,8 +1,256 @@
+import queue
 import sqlite3
+import time
+import weakref
+
+from . import metrics, query_stats
 
 DB_PATH = "DATA/inteligence_platform.db"
 
+# Record latency, rows and call site of every statement (see query_stats.py)
+INSTRUMENT_QUERIES = True
+
+# Connection pool, off unless enable_connection_pool() is called (e.g. by the API server)
+_pool = None
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    Cursor that reports every statement to query_stats.
+
+    A SELECT is timed from execute() through the last fetch, counting only
+    the time spent inside the cursor; it is recorded once its rows are
+    exhausted, or when the cursor is reused or closed.
+    """
+
+    _pending = None
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        sql, params, ms, rows, site = pending
+        query_stats.record_statement(sql, ms, rows, site, params=params,
+                                     plan_fn=lambda: self._explain(sql, params))
+
+    def _explain(self, sql, params):
+        # Plain cursor, so the EXPLAIN itself is not recorded
+        return sqlite3.Cursor(self.connection).execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+
+    def _run(self, method, sql, params, many=False):
+        self._finish()
+        site = query_stats.call_site()
+        start = time.perf_counter()
+        try:
+            method(sql, params)
+        except Exception as e:
+            query_stats.record_statement(sql, (time.perf_counter() - start) * 1000, 0, site,
+                                         error=type(e).__name__)
+            raise
+        ms = (time.perf_counter() - start) * 1000
+        if self.description is None:
+            # No result rows: rowcount is the number of rows changed
+            query_stats.record_statement(sql, ms, self.rowcount, site, params=None if many else params,
+                                         plan_fn=None if many else lambda: self._explain(sql, params))
+        else:
+            self._pending = [sql, params, ms, 0, site]
+        return self
+
+    def execute(self, sql, parameters=()):
+        return self._run(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._run(super().executemany, sql, seq_of_parameters, many=True)
+
+    def _fetched(self, start, count, exhausted):
+        pending = self._pending
+        if pending is not None:
+            pending[2] += (time.perf_counter() - start) * 1000
+            pending[3] += count
+            if exhausted:
+                self._finish()
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(start, len(rows), not rows)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows), True)
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(start, 0, True)
+            raise
+        self._fetched(start, 1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # Cursors dropped without being read to the end or closed
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors (including conn.execute()) are InstrumentedCursors."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursors = weakref.WeakSet()
+
+    def cursor(self, factory=None):
+        if factory is None:
+            factory = InstrumentedCursor if INSTRUMENT_QUERIES else sqlite3.Cursor
+        cursor = super().cursor(factory)
+        if isinstance(cursor, InstrumentedCursor):
+            self._cursors.add(cursor)
+        return cursor
+
+    # sqlite3's own shortcuts bypass cursor(), so route them through it
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def _finish_cursors(self):
+        # Record statements whose rows were not read to the end (e.g. a single fetchone())
+        for cursor in list(self._cursors):
+            cursor._finish()
+
+    def close(self):
+        self._finish_cursors()
+        super().close()
+
+
+class PooledConnection(InstrumentedConnection):
+    """Connection whose close() hands it back to its pool instead of closing it."""
+
+    _pool = None
+
+    def close(self):
+        pool = self._pool
+        if pool is None:
+            super().close()
+            return
+        self._finish_cursors()
+        pool.release(self)
+
+    def really_close(self):
+        self._pool = None
+        super().close()
+
+
+POOL_CONNECTIONS = metrics.counter(
+    "platform_db_pool_connections_total", "Connections handed out by the pool", ["result"]
+)
+
+
+class ConnectionPool:
+    """
+    Reuses connections to one database across threads.
+
+    The data functions open and close a connection per call; with a pool
+    their close() returns the connection here and the next call reuses it,
+    saving the open (file open, schema parse) on every request. Connections
+    never block: when all are in use a new one is opened, and connections
+    beyond `size` are really closed when released.
+    """
+
+    def __init__(self, path, size=8):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._closed = False
+
+    def acquire(self):
+        try:
+            conn = self._idle.get_nowait()
+            POOL_CONNECTIONS.inc(result="reused")
+        except queue.Empty:
+            # Pooled connections move between threads (e.g. an executor's workers)
+            conn = sqlite3.connect(self.path, factory=PooledConnection, check_same_thread=False)
+            conn._pool = self
+            POOL_CONNECTIONS.inc(result="opened")
+        return conn
+
+    def release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()  # don't hand uncommitted work to the next caller
+        except sqlite3.Error:
+            conn.really_close()
+            return
+        if self._closed or self._idle.qsize() >= self.size:
+            conn.really_close()
+        else:
+            self._idle.put(conn)
+
+    def idle(self):
+        return self._idle.qsize()
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().really_close()
+            except queue.Empty:
+                return
+
+
+def enable_connection_pool(size=8):
+    """
+    Make get_connection() hand out pooled connections to DB_PATH.
+
+    Args:
+        size: Idle connections kept open
+
+    Returns:
+        ConnectionPool
+    """
+    global _pool
+    if _pool is not None:
+        _pool.close()
+    _pool = ConnectionPool(DB_PATH, size)
+    return _pool
+
+
+def disable_connection_pool():
+    """Close the pool's idle connections; get_connection() opens new ones again."""
+    global _pool
+    if _pool is not None:
+        _pool.close()
+    _pool = None
+
+
+metrics.gauge("platform_db_pool_idle_connections", "Idle connections in the pool",
+              fn=lambda: _pool.idle() if _pool is not None else 0)
+
 
 def get_connection():
+    pool = _pool
+    # Callers that point DB_PATH elsewhere (benchmarks, migrations) bypass the pool
+    if pool is not None and pool.path == DB_PATH:
+        return pool.acquire()
+    if INSTRUMENT_QUERIES:
+        return sqlite3.connect(DB_PATH, factory=InstrumentedConnection)
     return sqlite3.connect(DB_PATH)
-
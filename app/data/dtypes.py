@@ -0,0 +1,106 @@
+"""
+Compact dtypes for the DataFrames returned by read_all_*.
+
+Low-cardinality text columns become pandas categoricals (one small integer
+code per row instead of a Python string), levels and statuses get a fixed
+order, timestamps are parsed and integer columns are downcast.
+"""
+
+LEVEL_ORDER = ['Low', 'Medium', 'High', 'Critical']
+STATUS_ORDER = ['Open', 'In Progress', 'Resolved', 'Closed']
+
+# column -> known order (ordered categorical) or None (unordered categorical)
+INCIDENT_CATEGORIES = {
+    "severity": LEVEL_ORDER,
+    "status": STATUS_ORDER,
+    "category": None,
+}
+TICKET_CATEGORIES = {
+    "priority": LEVEL_ORDER,
+    "status": STATUS_ORDER,
+    "issue_type": None,
+    "assigned_to": None,
+}
+
+
+def to_category(series, order=None):
+    """
+    Convert a column to a categorical.
+
+    Args:
+        series: Column to convert
+        order: Known values in order. Values outside it are kept and sorted
+            after the known ones, so no data is ever dropped.
+
+    Returns:
+        pandas.Series: Categorical column (ordered when order is given)
+    """
+    import pandas as pd
+
+    values = series.dropna().unique()
+    if order is None:
+        categories = sorted(values, key=str)
+    else:
+        known = set(order)
+        categories = list(order) + sorted((v for v in values if v not in known), key=str)
+    return series.astype(pd.CategoricalDtype(categories, ordered=order is not None))
+
+
+def optimize_dtypes(df, categories, datetimes=(), integers=()):
+    """
+    Apply compact dtypes to a DataFrame in place of its object columns.
+
+    Args:
+        df: DataFrame as returned by pd.read_sql
+        categories: {column: order or None} for categorical columns
+        datetimes: Columns to parse as datetimes (unparseable values become NaT)
+        integers: Columns to downcast to the smallest integer type
+
+    Returns:
+        pandas.DataFrame: The same frame with converted columns
+    """
+    import pandas as pd
+
+    for column, order in categories.items():
+        if column in df.columns:
+            df[column] = to_category(df[column], order)
+    for column in datetimes:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], errors="coerce", format="ISO8601")
+    for column in integers:
+        if column in df.columns and df[column].notna().all():
+            df[column] = pd.to_numeric(df[column], downcast="integer")
+    return df
+
+
+def optimize_incidents(df):
+    return optimize_dtypes(df, INCIDENT_CATEGORIES, datetimes=("timestamp",), integers=("incident_id",))
+
+
+def optimize_tickets(df):
+    return optimize_dtypes(df, TICKET_CATEGORIES, datetimes=("created",), integers=("ticket_id",))
+
+
+def memory_report(before, after):
+    """
+    Compare deep memory usage of two versions of the same DataFrame.
+
+    Returns:
+        dict: bytes per column before/after, totals and bytes per row
+    """
+    before_cols = before.memory_usage(deep=True)
+    after_cols = after.memory_usage(deep=True)
+    rows = max(len(before), 1)
+    return {
+        "rows": len(before),
+        "columns": {
+            col: {"before": int(before_cols[col]), "after": int(after_cols[col]),
+                  "dtype_before": str(before[col].dtype) if col in before else "",
+                  "dtype_after": str(after[col].dtype) if col in after else ""}
+            for col in before_cols.index
+        },
+        "total_before": int(before_cols.sum()),
+        "total_after": int(after_cols.sum()),
+        "bytes_per_row_before": before_cols.sum() / rows,
+        "bytes_per_row_after": after_cols.sum() / rows,
+    }
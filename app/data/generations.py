@@ -0,0 +1,51 @@
+from . import metrics
+from .db import get_connection
+
+
+# Tables whose changes bump a generation counter (see schema.create_tables)
+TRACKED_TABLES = ("users", "cyber_incidents", "it_tickets", "datasets_metadata")
+
+
+def get_table_generation(table):
+    """
+    Get the current generation of a table.
+
+    The generation is bumped by a trigger on every insert, update and delete,
+    so two reads that see the same generation saw the same data.
+
+    Args:
+        table: Table name (one of TRACKED_TABLES)
+
+    Returns:
+        int: Generation counter (0 if the table was never written)
+    """
+    conn = get_connection()
+    curr = conn.cursor()
+    try:
+        curr.execute("SELECT generation FROM data_generations WHERE table_name = ?;", (table,))
+        row = curr.fetchone()
+        return row[0] if row else 0
+    finally:
+        conn.close()
+
+
+def get_table_generations():
+    """
+    Get the generation of every tracked table.
+
+    Returns:
+        dict: {table_name: generation}
+    """
+    conn = get_connection()
+    curr = conn.cursor()
+    try:
+        curr.execute("SELECT table_name, generation FROM data_generations;")
+        return dict(curr.fetchall())
+    finally:
+        conn.close()
+
+
+metrics.gauge(
+    "platform_table_generation", "Generation counter of each tracked table (bumped on every write)", ["table"],
+    fn=lambda: {(table,): generation for table, generation in get_table_generations().items()},
+)
@@ -0,0 +1,191 @@
+"""
+Startup initialization that remembers what it has already done.
+
+The init_state table records the schema version create_tables() last ran
+for, whether the test users were seeded, and a fingerprint (size and
+SHA-256) of every source file that was migrated. initialize() skips steps
+whose record is current, so a restart against an unchanged database and
+unchanged files costs a few queries. The record lives in the database
+itself, so a new database file starts from scratch.
+"""
+import hashlib
+import time
+from datetime import datetime
+
+from .db import get_connection
+
+# Bump whenever create_tables() changes, so existing databases run it again
+SCHEMA_VERSION = 2
+
+# step name -> source file migrated by it
+SOURCE_FILES = {
+    "users_file": "DATA/users.txt",
+    "incidents_csv": "DATA/cyber_incidents.csv",
+    "datasets_csv": "DATA/datasets_metadata.csv",
+    "tickets_csv": "DATA/it_tickets.csv",
+}
+
+
+def _ensure_table(curr):
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS init_state (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+    """)
+
+
+def get_init_state():
+    """
+    Get the recorded initialization state.
+
+    Returns:
+        dict: {key: value}, e.g. {"schema_version": "1", "test_users": "seeded"}
+    """
+    conn = get_connection()
+    curr = conn.cursor()
+    try:
+        _ensure_table(curr)
+        conn.commit()
+        curr.execute("SELECT key, value FROM init_state;")
+        return dict(curr.fetchall())
+    finally:
+        conn.close()
+
+
+def set_init_state(key, value):
+    """
+    Record that an initialization step is done.
+
+    Args:
+        key: State key, e.g. "schema_version" or "source:DATA/users.txt"
+        value: Value to compare with on the next startup
+    """
+    conn = get_connection()
+    curr = conn.cursor()
+    try:
+        _ensure_table(curr)
+        curr.execute(
+            "INSERT OR REPLACE INTO init_state (key, value, updated_at) VALUES (?, ?, ?);",
+            (key, str(value), datetime.now().isoformat(timespec="seconds")),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def file_fingerprint(path):
+    """
+    Fingerprint a file by size and content hash.
+
+    Args:
+        path: File path
+
+    Returns:
+        str: "<size>:<sha256>", or None if the file does not exist
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+            size = f.tell()
+    except FileNotFoundError:
+        return None
+    return f"{size}:{digest.hexdigest()}"
+
+
+def initialize(force=False, progress=None):
+    """
+    Run the startup steps that are not done yet.
+
+    Steps: create_tables() (once per SCHEMA_VERSION), the test users (once),
+    the users file and CSV migrations (again only when the file changed;
+    the CSV migrations replace rows by key and the users file skips existing
+    usernames, so loading a file again adds no duplicates), then the
+    incremental snapshot refresh and change-log pruning (every time, both
+    are cheap when nothing changed). A failing step is reported and the
+    others still run.
+
+    Args:
+        force: Run every step, ignoring the recorded state
+        progress: Called as progress(fraction, message) after every step
+            (optional, used by background jobs)
+
+    Returns:
+        list: One dict per step: step, status ("done", "skipped", "missing"
+        or "failed"), seconds and detail
+    """
+    from .change_log import prune_change_log
+    from .cyber_incidents import migrate_cyber_incidents
+    from .datasets import migrate_datasets
+    from .it_tickets import migrate_tickets
+    from .schema import create_tables
+    from .snapshots import refresh_all_snapshots
+    from .users import add_test_users, load_users_from_file
+
+    state = {} if force else get_init_state()
+    results = []
+
+    def step(name, fn):
+        start = time.perf_counter()
+        try:
+            status, detail = fn()
+        except Exception as e:
+            status, detail = "failed", f"{type(e).__name__}: {e}"
+        results.append({"step": name, "status": status, "seconds": time.perf_counter() - start, "detail": detail})
+        if progress is not None:
+            progress(len(results) / (len(SOURCE_FILES) + 4), f"{name}: {status}")
+
+    def schema():
+        if state.get("schema_version") == str(SCHEMA_VERSION):
+            return "skipped", f"schema version {SCHEMA_VERSION}"
+        create_tables()
+        set_init_state("schema_version", SCHEMA_VERSION)
+        return "done", f"schema version {SCHEMA_VERSION}"
+
+    def test_users():
+        if state.get("test_users") == "seeded":
+            return "skipped", "already seeded"
+        add_test_users()
+        set_init_state("test_users", "seeded")
+        return "done", "seeded"
+
+    def migration(path, migrate):
+        def run():
+            fingerprint = file_fingerprint(path)
+            if fingerprint is None:
+                return "missing", f"{path} not found"
+            if state.get(f"source:{path}") == fingerprint:
+                return "skipped", f"{path} unchanged"
+            count = migrate(path)
+            if count is None:
+                return "failed", f"{path} could not be loaded (see the output above)"
+            set_init_state(f"source:{path}", fingerprint)
+            return "done", f"{count} rows from {path}"
+        return run
+
+    def snapshots():
+        exported = refresh_all_snapshots()
+        return "done", f"refreshed: {', '.join(exported)}" if exported else "up to date"
+
+    def change_log():
+        return "done", f"{prune_change_log()} old changes pruned"
+
+    step("schema", schema)
+    step("test_users", test_users)
+    migrations = {
+        "users_file": load_users_from_file,
+        "incidents_csv": migrate_cyber_incidents,
+        "datasets_csv": migrate_datasets,
+        "tickets_csv": migrate_tickets,
+    }
+    for name, migrate in migrations.items():
+        step(name, migration(SOURCE_FILES[name], migrate))
+    step("snapshots", snapshots)
+    step("change_log", change_log)
+    return results
@@ -1,16 +1,60 @@
-import pandas as pd
 import random
 from .db import get_connection
+from .dtypes import optimize_tickets
+
+COMMON_ISSUE_TYPES = [
+    'Hardware Issue', 'Software Issue', 'Network Problem', 
+    'Account Access', 'Email Problem', 'Printer Issue',
+    'Password Reset', 'System Error', 'Performance Issue', 'Other'
+]
+
+# Checked in order: the first group with a keyword in the description wins
+ISSUE_TYPE_KEYWORDS = [
+    (('password', 'login', 'access'), 'Account Access'),
+    (('printer', 'print'), 'Printer Issue'),
+    (('email', 'mail'), 'Email Problem'),
+    (('network', 'internet', 'connection'), 'Network Problem'),
+    (('hardware', 'computer', 'laptop'), 'Hardware Issue'),
+    (('software', 'application', 'program'), 'Software Issue'),
+]
+
+
+def infer_issue_type(description):
+    """
+    Guess a ticket's issue type from its description.
+    
+    Args:
+        description: Ticket description (any value; converted to text)
+        
+    Returns:
+        str: Issue type from the first matching keyword group, or a random
+        common issue type when no keyword matches
+    """
+    desc = str(description).lower()
+    for keywords, issue_type in ISSUE_TYPE_KEYWORDS:
+        if any(word in desc for word in keywords):
+            return issue_type
+    return random.choice(COMMON_ISSUE_TYPES)
 
 
-def migrate_tickets():
+def migrate_tickets(path="DATA/it_tickets.csv"):
     """
     Migrate IT tickets from CSV file to database.
-    Maps CSV column names to database column names if needed.
+    Maps CSV column names to database column names if needed. Tickets
+    already in the database are replaced by the file's version (matched by
+    ticket_id), so loading a file again adds no duplicates.
+    
+    Args:
+        path: CSV file to load (default: "DATA/it_tickets.csv")
+    
+    Returns:
+        int: Number of rows migrated, or None if the migration failed
     """
+    import pandas as pd
+    from .bulk import upsert_frame
     conn = None
     try:
-        df = pd.read_csv("DATA/it_tickets.csv")
+        df = pd.read_csv(path)
         conn = get_connection()
         
         # Map CSV column names to database column names if they differ
@@ -27,95 +71,88 @@ def migrate_tickets():
         df = df[[col for col in db_columns if col in df.columns]]
         
         # Fill empty issue_type values during migration
-        if 'issue_type' in df.columns:
-            mask = df['issue_type'].isna() | (df['issue_type'] == 'None') | (df['issue_type'] == '')
-            
-            if mask.any():
-                common_issue_types = [
-                    'Hardware Issue', 'Software Issue', 'Network Problem', 
-                    'Account Access', 'Email Problem', 'Printer Issue',
-                    'Password Reset', 'System Error', 'Performance Issue', 'Other'
-                ]
-                
-                # Try to infer from description if available
-                if 'description' in df.columns:
-                    for idx in df[mask].index:
-                        desc = str(df.loc[idx, 'description']).lower()
-                        if any(word in desc for word in ['password', 'login', 'access']):
-                            df.loc[idx, 'issue_type'] = 'Account Access'
-                        elif any(word in desc for word in ['printer', 'print']):
-                            df.loc[idx, 'issue_type'] = 'Printer Issue'
-                        elif any(word in desc for word in ['email', 'mail']):
-                            df.loc[idx, 'issue_type'] = 'Email Problem'
-                        elif any(word in desc for word in ['network', 'internet', 'connection']):
-                            df.loc[idx, 'issue_type'] = 'Network Problem'
-                        elif any(word in desc for word in ['hardware', 'computer', 'laptop']):
-                            df.loc[idx, 'issue_type'] = 'Hardware Issue'
-                        elif any(word in desc for word in ['software', 'application', 'program']):
-                            df.loc[idx, 'issue_type'] = 'Software Issue'
-                        else:
-                            # Assign random common type
-                            df.loc[idx, 'issue_type'] = random.choice(common_issue_types)
-                else:
-                    # If no description, assign random common types
-                    df.loc[mask, 'issue_type'] = [random.choice(common_issue_types) for _ in range(mask.sum())]
+        _fill_missing_issue_types(df)
         
-        df.to_sql("it_tickets", conn, if_exists="append", index=False)
+        count = upsert_frame(conn, "it_tickets", df, "ticket_id")
+        conn.commit()
         conn.close()
+        return count
     except FileNotFoundError:
         print("Warning: it_tickets.csv not found")
     except Exception as e:
         print(f"Error migrating IT tickets: {e}")
         if conn:
+            conn.rollback()
             conn.close()
 
 
-def read_all_tickets():
-    conn = get_connection()
-    df = pd.read_sql("SELECT * FROM it_tickets;", conn)
-    conn.close()
-    
-    # Fix empty issue_type values - generate based on description or other fields
+def _fill_missing_issue_types(df):
+    """Fix empty issue_type values - generate based on description or other fields."""
     if 'issue_type' in df.columns:
         # Replace None, NaN, empty strings with generated values
         mask = df['issue_type'].isna() | (df['issue_type'] == 'None') | (df['issue_type'] == '')
         
         if mask.any():
-            # Generate issue types based on description keywords or assign random common types
-            common_issue_types = [
-                'Hardware Issue', 'Software Issue', 'Network Problem', 
-                'Account Access', 'Email Problem', 'Printer Issue',
-                'Password Reset', 'System Error', 'Performance Issue', 'Other'
-            ]
-            
-            # Try to infer from description if available
             if 'description' in df.columns:
-                for idx in df[mask].index:
-                    desc = str(df.loc[idx, 'description']).lower()
-                    if any(word in desc for word in ['password', 'login', 'access']):
-                        df.loc[idx, 'issue_type'] = 'Account Access'
-                    elif any(word in desc for word in ['printer', 'print']):
-                        df.loc[idx, 'issue_type'] = 'Printer Issue'
-                    elif any(word in desc for word in ['email', 'mail']):
-                        df.loc[idx, 'issue_type'] = 'Email Problem'
-                    elif any(word in desc for word in ['network', 'internet', 'connection']):
-                        df.loc[idx, 'issue_type'] = 'Network Problem'
-                    elif any(word in desc for word in ['hardware', 'computer', 'laptop']):
-                        df.loc[idx, 'issue_type'] = 'Hardware Issue'
-                    elif any(word in desc for word in ['software', 'application', 'program']):
-                        df.loc[idx, 'issue_type'] = 'Software Issue'
-                    else:
-                        # Assign random common type
-                        import random
-                        df.loc[idx, 'issue_type'] = random.choice(common_issue_types)
+                df.loc[mask, 'issue_type'] = [infer_issue_type(desc) for desc in df.loc[mask, 'description']]
             else:
                 # If no description, assign random common types
-                import random
-                df.loc[mask, 'issue_type'] = [random.choice(common_issue_types) for _ in range(mask.sum())]
-    
+                df.loc[mask, 'issue_type'] = [random.choice(COMMON_ISSUE_TYPES) for _ in range(mask.sum())]
     return df
 
 
+def read_all_tickets(optimize=True):
+    """
+    Read all IT tickets from the database, filling in missing issue types.
+    
+    Args:
+        optimize: Return compact dtypes (ordered categoricals for priority and
+            status, categorical issue_type/assigned_to, parsed created, downcast id)
+    
+    Returns:
+        pandas.DataFrame: DataFrame containing all IT tickets
+    """
+    import pandas as pd
+    conn = get_connection()
+    df = pd.read_sql("SELECT * FROM it_tickets;", conn)
+    conn.close()
+    
+    _fill_missing_issue_types(df)
+    return optimize_tickets(df) if optimize else df
+
+
+def read_tickets_by_ids(ticket_ids, optimize=True):
+    """
+    Read the IT tickets with the given IDs (e.g. the keys from changes_since()).
+    
+    Args:
+        ticket_ids: Ticket IDs to read
+        optimize: Return the same compact dtypes as read_all_tickets()
+    
+    Returns:
+        pandas.DataFrame: Matching tickets, same columns as read_all_tickets()
+    """
+    import pandas as pd
+    ticket_ids = list(ticket_ids)
+    conn = get_connection()
+    try:
+        frames = []
+        for i in range(0, len(ticket_ids), 500):
+            chunk = ticket_ids[i:i + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            frames.append(pd.read_sql(
+                f"SELECT * FROM it_tickets WHERE ticket_id IN ({placeholders});", conn, params=chunk
+            ))
+        if not frames:
+            frames.append(pd.read_sql("SELECT * FROM it_tickets WHERE 0;", conn))
+    finally:
+        conn.close()
+    df = pd.concat(frames, ignore_index=True)
+    
+    _fill_missing_issue_types(df)
+    return optimize_tickets(df) if optimize else df
+
+
 # CRUD
 
 def create_ticket(ticket_id, created, priority, issue_type, assigned_to, status, description=None):
@@ -0,0 +1,618 @@
+"""
+Background jobs: a job queue in SQLite, run by worker processes.
+
+Long operations (migrations, bulk imports, dataset profiling) are submitted
+with submit_job(), which returns at once; run_workers() runs them in worker
+processes, one job per process at a time, so several jobs run in parallel
+across cores and the page or console that submitted them stays responsive.
+Workers claim jobs with a single UPDATE ... RETURNING, so any number of
+them (also from several `main.py worker` commands) can share one queue.
+
+The queue lives in its own database file next to the data (jobs_db_path()):
+an import holds the data database's write lock for its whole transaction,
+which must not stop its own progress updates or other workers claiming jobs.
+
+A job reports progress through the callback it is given, and a heartbeat
+thread keeps its row fresh while it runs. Cancelling a queued job takes
+effect at once; a running job stops at its next progress report. A failing
+job is queued again after a back-off until it has used max_attempts (every
+job kind is safe to repeat: each runs in one data transaction), unless its
+error is one of PERMANENT_ERRORS, which another attempt would only repeat.
+A job whose worker died (no heartbeat for STALE_SECONDS) is requeued the
+same way.
+A job's temporary input file (params "remove_file") is removed once the job
+has finished, whatever the outcome.
+"""
+import json
+import os
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from . import db
+
+STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+ACTIVE_STATUSES = ("queued", "running")
+
+MAX_ATTEMPTS = 3
+RETRY_DELAY_SECONDS = 10     # doubled after every failed attempt
+POLL_SECONDS = 1.0
+HEARTBEAT_SECONDS = 10
+STALE_SECONDS = 120
+IDLE_EXIT_SECONDS = 300      # workers started by ensure_workers() stop when idle this long
+SPAWN_GRACE_SECONDS = 30     # time started workers get to register themselves
+
+# Errors that another attempt would only repeat: bad parameters, a missing
+# input file, invalid file contents. The job fails at once instead of retrying
+PERMANENT_ERRORS = (ValueError, KeyError, FileNotFoundError)
+
+JOB_COLUMNS = [
+    "job_id", "kind", "params", "status", "progress", "message", "result", "error",
+    "attempts", "max_attempts", "cancel_requested", "submitted_by", "created_at",
+    "run_after", "started_at", "finished_at", "heartbeat_at", "worker",
+]
+
+# Queue files whose tables this process has created
+_ready = set()
+
+# Time of the last ensure_workers() start, so repeated submits don't start
+# more workers while the first ones are still starting up
+_spawned_at = None
+
+
+class JobCancelled(Exception):
+    """Raised by a job's progress callback once the job was cancelled."""
+
+
+def _run_init(params, progress):
+    from .init_state import initialize
+    steps = initialize(force=bool(params.get("force")), progress=progress)
+    failed = [step["step"] for step in steps if step["status"] == "failed"]
+    if failed:
+        raise RuntimeError(f"Steps failed: {', '.join(failed)}")
+    return {"steps": steps}
+
+
+def _run_import(params, progress):
+    from .bulk import import_file
+    rows = import_file(params["table"], params["path"], params.get("format"), progress=progress)
+    return {"table": params["table"], "path": params["path"], "rows": rows}
+
+
+def _run_import_users(params, progress):
+    from .users import bulk_import_users
+    return bulk_import_users(params["path"], workers=params.get("workers"), actor=params.get("actor"),
+                             progress=progress)
+
+
+def _run_profile(params, progress):
+    from .dataset_profiles import profile_and_register
+    dataset_id, profile = profile_and_register(
+        params["path"], name=params.get("name"), fmt=params.get("format"),
+        dataset_id=params.get("dataset_id"), uploaded_by=params.get("uploaded_by"), progress=progress,
+    )
+    return {"dataset_id": dataset_id, **profile}
+
+
+# kind -> function(params, progress) returning a JSON-serializable result;
+# progress(fraction, message) takes a fraction in [0, 1] or None
+JOB_KINDS = {
+    "init": _run_init,
+    "import": _run_import,
+    "import_users": _run_import_users,
+    "profile": _run_profile,
+}
+
+
+def _remove_input(params):
+    # Uploads are saved to a temporary file for their job
+    if isinstance(params, str):
+        params = json.loads(params)
+    if params.get("remove_file") and params.get("path"):
+        try:
+            os.remove(params["path"])
+        except FileNotFoundError:
+            pass
+
+
+def jobs_db_path():
+    """
+    Get the queue's database file, e.g. DATA/inteligence_platform_jobs.db.
+
+    Returns:
+        str: Path next to db.DB_PATH
+    """
+    return os.path.splitext(db.DB_PATH)[0] + "_jobs.db"
+
+
+def _connect():
+    path = jobs_db_path()
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    if path in _ready:
+        return conn
+    conn.execute("PRAGMA journal_mode = WAL;")  # pages read while workers write
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            params TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            progress REAL,
+            message TEXT,
+            result TEXT,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            cancel_requested INTEGER NOT NULL DEFAULT 0,
+            submitted_by TEXT,
+            created_at TEXT NOT NULL,
+            run_after TEXT,
+            started_at TEXT,
+            finished_at TEXT,
+            heartbeat_at TEXT,
+            worker TEXT
+        );
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, job_id);")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS job_workers (
+            worker TEXT PRIMARY KEY,
+            pid INTEGER NOT NULL,
+            started_at TEXT NOT NULL,
+            heartbeat_at TEXT NOT NULL
+        );
+    """)
+    _ready.add(path)
+    return conn
+
+
+def _now(offset_seconds=0):
+    # ISO text with a fixed format, so times compare as strings in SQL
+    return (datetime.now() + timedelta(seconds=offset_seconds)).isoformat(timespec="seconds")
+
+
+def _job_dict(row):
+    job = dict(row)
+    for key in ("params", "result"):
+        if job[key] is not None:
+            job[key] = json.loads(job[key])
+    return job
+
+
+def submit_job(kind, params=None, submitted_by=None, max_attempts=MAX_ATTEMPTS):
+    """
+    Queue a job.
+
+    Args:
+        kind: One of JOB_KINDS
+        params: Job parameters (JSON-serializable dict), e.g. {"path": "..."};
+            a relative "path" is made absolute, as workers may run elsewhere
+        submitted_by: Username submitting the job (optional)
+        max_attempts: Attempts before the job is marked failed
+
+    Returns:
+        int: The job ID
+
+    Raises:
+        ValueError: Unknown kind
+    """
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind {kind!r} (choose from {', '.join(JOB_KINDS)})")
+    params = dict(params or {})
+    if params.get("path"):
+        params["path"] = os.path.abspath(params["path"])
+    conn = _connect()
+    try:
+        curr = conn.execute(
+            "INSERT INTO jobs (kind, params, submitted_by, max_attempts, created_at) VALUES (?, ?, ?, ?, ?);",
+            (kind, json.dumps(params), submitted_by, max_attempts, _now()),
+        )
+        conn.commit()
+        return curr.lastrowid
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def get_job(job_id):
+    """
+    Get one job.
+
+    Args:
+        job_id: The job ID
+
+    Returns:
+        dict: Job row (params and result decoded), or None if not found
+    """
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE job_id = ?;", (job_id,)).fetchone()
+        return _job_dict(row) if row else None
+    finally:
+        conn.close()
+
+
+def list_jobs(status=None, submitted_by=None, limit=100):
+    """
+    List jobs, newest first.
+
+    Args:
+        status: Only jobs with this status (optional)
+        submitted_by: Only jobs submitted by this user (optional)
+        limit: Maximum number of jobs
+
+    Returns:
+        list: Job dicts, as from get_job()
+    """
+    where, params = [], []
+    if status:
+        where.append("status = ?")
+        params.append(status)
+    if submitted_by:
+        where.append("submitted_by = ?")
+        params.append(submitted_by)
+    sql = "SELECT * FROM jobs"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    conn = _connect()
+    try:
+        rows = conn.execute(sql + " ORDER BY job_id DESC LIMIT ?;", params + [limit]).fetchall()
+        return [_job_dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def cancel_job(job_id):
+    """
+    Cancel a job.
+
+    A queued job is cancelled at once; a running job is asked to stop and
+    is marked cancelled when it next reports progress.
+
+    Args:
+        job_id: The job ID
+
+    Returns:
+        bool: False if the job was not queued or running
+    """
+    conn = _connect()
+    try:
+        cancelled = conn.execute(
+            "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE job_id = ? AND status = 'queued' "
+            "RETURNING params;",
+            (_now(), job_id),
+        ).fetchone()
+        changed = cancelled is not None
+        if not changed:
+            changed = conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE job_id = ? AND status = 'running';", (job_id,)
+            ).rowcount > 0
+        conn.commit()
+        if cancelled is not None:
+            _remove_input(cancelled["params"])
+        return changed
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def retry_job(job_id):
+    """
+    Queue a failed or cancelled job again, with fresh attempts.
+
+    Args:
+        job_id: The job ID
+
+    Returns:
+        bool: False if the job was not failed or cancelled, or its
+        temporary input file was already removed (upload it again)
+    """
+    job = get_job(job_id)
+    if job is None or (job["params"].get("remove_file") and not os.path.exists(job["params"]["path"])):
+        return False
+    conn = _connect()
+    try:
+        curr = conn.execute("""
+            UPDATE jobs
+            SET status = 'queued', attempts = 0, cancel_requested = 0, run_after = NULL,
+                progress = NULL, message = NULL, error = NULL, result = NULL, finished_at = NULL
+            WHERE job_id = ? AND status IN ('failed', 'cancelled');
+        """, (job_id,))
+        conn.commit()
+        return curr.rowcount > 0
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def get_job_counts(submitted_by=None):
+    """
+    Count jobs by status.
+
+    Args:
+        submitted_by: Only jobs submitted by this user (optional)
+
+    Returns:
+        dict: {status: count} for every status in STATUSES
+    """
+    sql, params = "SELECT status, COUNT(*) FROM jobs", ()
+    if submitted_by:
+        sql, params = sql + " WHERE submitted_by = ?", (submitted_by,)
+    conn = _connect()
+    try:
+        counts = dict(conn.execute(sql + " GROUP BY status;", params).fetchall())
+    finally:
+        conn.close()
+    return {status: counts.get(status, 0) for status in STATUSES}
+
+
+def get_workers():
+    """
+    List the live workers (heartbeat within STALE_SECONDS).
+
+    Returns:
+        list: dicts with worker, pid, started_at and heartbeat_at
+    """
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            "SELECT * FROM job_workers WHERE heartbeat_at >= ? ORDER BY started_at;", (_now(-STALE_SECONDS),)
+        ).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def _claim_job(worker):
+    conn = _connect()
+    try:
+        now = _now()
+        # Jobs whose worker stopped sending heartbeats count as a failed attempt
+        stale = conn.execute("""
+            UPDATE jobs
+            SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                error = 'worker ' || worker || ' stopped', worker = NULL,
+                finished_at = CASE WHEN attempts >= max_attempts THEN ? END
+            WHERE status = 'running' AND heartbeat_at < ?
+            RETURNING status, params;
+        """, (now, _now(-STALE_SECONDS))).fetchall()
+        row = conn.execute("""
+            UPDATE jobs
+            SET status = 'running', attempts = attempts + 1, started_at = ?, heartbeat_at = ?, worker = ?,
+                progress = NULL, message = NULL
+            WHERE job_id = (
+                SELECT job_id FROM jobs
+                WHERE status = 'queued' AND (run_after IS NULL OR run_after <= ?)
+                ORDER BY job_id LIMIT 1
+            )
+            RETURNING job_id, kind, params, attempts, max_attempts;
+        """, (now, now, worker, now)).fetchone()
+        conn.commit()
+        for job in stale:
+            if job["status"] == "failed":
+                _remove_input(job["params"])
+        return dict(row) if row else None
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _update_job(job_id, sql, params):
+    conn = _connect()
+    try:
+        conn.execute(f"UPDATE jobs SET {sql} WHERE job_id = ?;", tuple(params) + (job_id,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _progress_callback(job_id):
+    def progress(fraction=None, message=None):
+        conn = _connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET progress = COALESCE(?, progress), message = COALESCE(?, message), "
+                "heartbeat_at = ? WHERE job_id = ?;",
+                (fraction, message, _now(), job_id),
+            )
+            conn.commit()
+            cancelled = conn.execute("SELECT cancel_requested FROM jobs WHERE job_id = ?;", (job_id,)).fetchone()[0]
+        finally:
+            conn.close()
+        if cancelled:
+            raise JobCancelled()
+    return progress
+
+
+def _heartbeat(job_id, stop):
+    while not stop.wait(HEARTBEAT_SECONDS):
+        try:
+            _update_job(job_id, "heartbeat_at = ?", (_now(),))
+        except sqlite3.Error:
+            pass  # the next beat tries again
+
+
+def run_job(job):
+    """
+    Run a claimed job and record its outcome.
+
+    Args:
+        job: dict from the claim (job_id, kind, params, attempts, max_attempts)
+
+    Returns:
+        str: The job's new status
+    """
+    job_id = job["job_id"]
+    stop = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(job_id, stop), daemon=True)
+    beat.start()
+    try:
+        progress = _progress_callback(job_id)
+        progress(0.0, "started")
+        result = JOB_KINDS[job["kind"]](json.loads(job["params"]), progress)
+        status = "succeeded"
+        _update_job(job_id, "status = ?, progress = 1.0, result = ?, error = NULL, finished_at = ?",
+                    (status, json.dumps(result, default=str), _now()))
+    except KeyboardInterrupt:
+        # The worker is stopping: not the job's fault, so the attempt is given back
+        _update_job(job_id, "status = 'queued', attempts = attempts - 1, worker = NULL, "
+                            "message = 'worker stopped; requeued'", ())
+        raise
+    except JobCancelled:
+        status = "cancelled"
+        _update_job(job_id, "status = ?, message = 'cancelled while running', finished_at = ?", (status, _now()))
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        if job["attempts"] < job["max_attempts"] and not isinstance(e, PERMANENT_ERRORS):
+            status = "queued"
+            delay = RETRY_DELAY_SECONDS * 2 ** (job["attempts"] - 1)
+            _update_job(job_id, "status = ?, error = ?, run_after = ?, worker = NULL",
+                        (status, error, _now(delay)))
+        else:
+            status = "failed"
+            _update_job(job_id, "status = ?, error = ?, finished_at = ?", (status, error, _now()))
+    finally:
+        stop.set()
+        beat.join()
+    if status != "queued":
+        _remove_input(job["params"])
+    return status
+
+
+def _worker_loop(db_path, idle_exit=None, poll_seconds=POLL_SECONDS):
+    # Runs in its own process: point it at the same database as the parent
+    db.DB_PATH = db_path
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    conn = _connect()
+    try:
+        conn.execute("INSERT OR REPLACE INTO job_workers (worker, pid, started_at, heartbeat_at) VALUES (?, ?, ?, ?);",
+                     (worker, os.getpid(), _now(), _now()))
+        conn.commit()
+    finally:
+        conn.close()
+
+    counts = {}
+    idle_since = last_beat = time.monotonic()
+    try:
+        while True:
+            try:
+                job = _claim_job(worker)
+            except sqlite3.OperationalError:
+                job = None  # queue busy; try again on the next poll
+            if job is not None:
+                status = run_job(job)
+                counts[status] = counts.get(status, 0) + 1
+                idle_since = time.monotonic()
+            elif idle_exit is not None and time.monotonic() - idle_since >= idle_exit:
+                return counts
+            else:
+                time.sleep(poll_seconds)
+            if time.monotonic() - last_beat >= HEARTBEAT_SECONDS:
+                conn = _connect()
+                try:
+                    conn.execute("UPDATE job_workers SET heartbeat_at = ? WHERE worker = ?;", (_now(), worker))
+                    conn.commit()
+                finally:
+                    conn.close()
+                last_beat = time.monotonic()
+    except KeyboardInterrupt:
+        return counts
+    finally:
+        conn = _connect()
+        try:
+            conn.execute("DELETE FROM job_workers WHERE worker = ?;", (worker,))
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def _counted_worker(db_path, idle_exit, poll_seconds, results):
+    results.put(_worker_loop(db_path, idle_exit, poll_seconds))
+
+
+def run_workers(processes=None, idle_exit=None, poll_seconds=POLL_SECONDS):
+    """
+    Run jobs until stopped (Ctrl+C) or, with idle_exit, until the queue
+    has been empty that long.
+
+    Args:
+        processes: Worker processes (default: one per CPU)
+        idle_exit: Seconds without work after which a worker stops (default: never)
+        poll_seconds: Wait between checks of an empty queue
+
+    Returns:
+        dict: {status: number of jobs} over all workers
+    """
+    import multiprocessing
+
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        return _worker_loop(db.DB_PATH, idle_exit, poll_seconds)
+
+    # Workers are not daemonic: user imports start their own hashing pool
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=_counted_worker, args=(db.DB_PATH, idle_exit, poll_seconds, results))
+        for _ in range(processes)
+    ]
+    for process in workers:
+        process.start()
+    counts = {}
+    try:
+        for process in workers:
+            process.join()
+    except KeyboardInterrupt:
+        # From a terminal the workers got the interrupt as well; pass it on
+        # to those that did not (e.g. when only this process was signalled)
+        for process in workers:
+            process.join(timeout=2)
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGINT)
+                process.join()
+    while not results.empty():
+        for status, n in results.get().items():
+            counts[status] = counts.get(status, 0) + n
+    return counts
+
+
+def ensure_workers(processes=None, idle_exit=IDLE_EXIT_SECONDS):
+    """
+    Start background workers (`main.py worker`) unless some are running.
+
+    Used by the pages after submitting a job. The workers run detached from
+    the caller, write their output to a log next to the database and stop
+    once the queue has been empty for idle_exit seconds.
+
+    Args:
+        processes: Worker processes (default: one per CPU)
+        idle_exit: Seconds without work after which the workers stop
+
+    Returns:
+        bool: True if workers were started
+    """
+    global _spawned_at
+    if get_workers() or (_spawned_at is not None and time.monotonic() - _spawned_at < SPAWN_GRACE_SECONDS):
+        return False
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    command = [sys.executable, "main.py", "--db", os.path.abspath(db.DB_PATH), "worker",
+               "--processes", str(processes or os.cpu_count() or 1), "--idle-exit", str(idle_exit)]
+    log_path = os.path.splitext(os.path.abspath(db.DB_PATH))[0] + "_jobs.log"
+    with open(log_path, "a") as log:
+        subprocess.Popen(command, cwd=root, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+                         start_new_session=True)
+    _spawned_at = time.monotonic()
+    return True
@@ -0,0 +1,251 @@
+"""
+Dimension (lookup) tables for the low-cardinality incident and ticket columns.
+
+cyber_incidents and it_tickets are views over the *_data base tables, which
+store small integer ids pointing into severity_levels, priority_levels,
+statuses, incident_categories and issue_types. The views expose the original
+column names and text values, and INSTEAD OF triggers translate inserts,
+updates and deletes, so read_all_* and the CRUD functions work unchanged.
+Values that are not in a lookup table yet are added to it on write.
+"""
+from .db import get_connection
+from .dtypes import LEVEL_ORDER, STATUS_ORDER
+
+# lookup table -> seeded values in sort order (None: filled from the data)
+LOOKUP_TABLES = {
+    "severity_levels": LEVEL_ORDER,
+    "priority_levels": LEVEL_ORDER,
+    "statuses": STATUS_ORDER,
+    "incident_categories": None,
+    "issue_types": None,
+}
+
+# view -> base table, key column, (column, type) in view order, encoded columns
+NORMALIZED_TABLES = {
+    "cyber_incidents": {
+        "base": "cyber_incidents_data",
+        "key": "incident_id",
+        "columns": [
+            ("incident_id", "INTEGER"),
+            ("timestamp", "TEXT"),
+            ("severity", "TEXT"),
+            ("category", "TEXT"),
+            ("status", "TEXT"),
+            ("description", "TEXT"),
+        ],
+        "lookups": {
+            "severity": "severity_levels",
+            "category": "incident_categories",
+            "status": "statuses",
+        },
+    },
+    "it_tickets": {
+        "base": "it_tickets_data",
+        "key": "ticket_id",
+        "columns": [
+            ("ticket_id", "INTEGER"),
+            ("created", "TEXT"),
+            ("priority", "TEXT"),
+            ("issue_type", "TEXT"),
+            ("assigned_to", "TEXT"),
+            ("status", "TEXT"),
+            ("description", "TEXT"),
+        ],
+        "lookups": {
+            "priority": "priority_levels",
+            "issue_type": "issue_types",
+            "status": "statuses",
+        },
+    },
+}
+
+
+def _object_type(curr, name):
+    curr.execute("SELECT type FROM sqlite_master WHERE name = ?;", (name,))
+    row = curr.fetchone()
+    return row[0] if row else None
+
+
+def _base_columns(spec):
+    """Column names of the base table, in view column order."""
+    return [f"{col}_id" if col in spec["lookups"] else col for col, _ in spec["columns"]]
+
+
+def _encoded_values(spec, source):
+    """SQL expressions turning source.<column> text values into base table values."""
+    values = []
+    for col, _ in spec["columns"]:
+        lookup = spec["lookups"].get(col)
+        if lookup:
+            values.append(f"(SELECT id FROM {lookup} WHERE name = {source}.{col})")
+        else:
+            values.append(f"{source}.{col}")
+    return values
+
+
+def _ensure_lookup_values(spec):
+    """Trigger statements adding NEW values missing from the lookup tables."""
+    return "".join(
+        f"""
+                INSERT OR IGNORE INTO {lookup} (name, sort_order)
+                SELECT NEW.{col}, (SELECT COALESCE(MAX(sort_order), 0) + 1 FROM {lookup})
+                WHERE NEW.{col} IS NOT NULL;"""
+        for col, lookup in spec["lookups"].items()
+    )
+
+
+def create_lookup_tables(curr):
+    """Create and seed the lookup tables."""
+    for table, values in LOOKUP_TABLES.items():
+        curr.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE,
+                sort_order INTEGER NOT NULL
+            );
+        """)
+        for position, name in enumerate(values or [], start=1):
+            curr.execute(
+                f"INSERT OR IGNORE INTO {table} (name, sort_order) VALUES (?, ?);",
+                (name, position),
+            )
+
+
+def create_normalized_table(curr, view):
+    """
+    Create the base table, view and INSTEAD OF triggers for one normalized table.
+
+    An existing plain table with the view's name (databases created before the
+    lookup tables existed) is dictionary-encoded into the base table and dropped.
+
+    Args:
+        curr: Cursor to run the statements on (inside a transaction)
+        view: Key of NORMALIZED_TABLES, e.g. "cyber_incidents"
+    """
+    spec = NORMALIZED_TABLES[view]
+    base, key = spec["base"], spec["key"]
+    columns = [col for col, _ in spec["columns"]]
+    base_columns = _base_columns(spec)
+
+    legacy = None
+    if _object_type(curr, view) == "table":
+        legacy = f"{view}_legacy"
+        curr.execute(f"ALTER TABLE {view} RENAME TO {legacy};")
+
+    definitions = []
+    for col, col_type in spec["columns"]:
+        lookup = spec["lookups"].get(col)
+        if lookup:
+            definitions.append(f"{col}_id INTEGER REFERENCES {lookup}(id)")
+        else:
+            definitions.append(f"{col} {col_type}")
+    curr.execute(f"CREATE TABLE IF NOT EXISTS {base} ({', '.join(definitions)});")
+    curr.execute(f"CREATE INDEX IF NOT EXISTS idx_{base}_{key} ON {base} ({key});")
+    for col in spec["lookups"]:
+        curr.execute(f"CREATE INDEX IF NOT EXISTS idx_{base}_{col}_id ON {base} ({col}_id);")
+
+    selected, joins = [], []
+    for col in columns:
+        lookup = spec["lookups"].get(col)
+        if lookup:
+            selected.append(f"{col}_lk.name AS {col}")
+            joins.append(f"LEFT JOIN {lookup} AS {col}_lk ON {col}_lk.id = d.{col}_id")
+        else:
+            selected.append(f"d.{col} AS {col}")
+    curr.execute(f"""
+        CREATE VIEW IF NOT EXISTS {view} AS
+        SELECT {', '.join(selected)}
+        FROM {base} AS d
+        {' '.join(joins)};
+    """)
+
+    ensure = _ensure_lookup_values(spec)
+    curr.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{view}_insert
+        INSTEAD OF INSERT ON {view}
+        BEGIN{ensure}
+            INSERT INTO {base} ({', '.join(base_columns)})
+            VALUES ({', '.join(_encoded_values(spec, 'NEW'))});
+        END;
+    """)
+    assignments = ", ".join(
+        f"{target} = {value}" for target, value in zip(base_columns, _encoded_values(spec, "NEW"))
+    )
+    curr.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{view}_update
+        INSTEAD OF UPDATE ON {view}
+        BEGIN{ensure}
+            UPDATE {base} SET {assignments}
+            WHERE {key} IS OLD.{key};
+        END;
+    """)
+    curr.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{view}_delete
+        INSTEAD OF DELETE ON {view}
+        BEGIN
+            DELETE FROM {base} WHERE {key} IS OLD.{key};
+        END;
+    """)
+
+    if legacy:
+        _encode_legacy_rows(curr, spec, legacy)
+        curr.execute(f"DROP TABLE {legacy};")
+
+
+def _encode_legacy_rows(curr, spec, legacy):
+    """Copy a legacy text table into the base table in two set-based passes."""
+    for col, lookup in spec["lookups"].items():
+        # New values are appended after the existing ones, alphabetically
+        curr.execute(f"""
+            INSERT OR IGNORE INTO {lookup} (name, sort_order)
+            SELECT value, (SELECT COALESCE(MAX(sort_order), 0) FROM {lookup})
+                          + ROW_NUMBER() OVER (ORDER BY value)
+            FROM (
+                SELECT DISTINCT {col} AS value FROM {legacy}
+                WHERE {col} IS NOT NULL AND {col} NOT IN (SELECT name FROM {lookup})
+            );
+        """)
+    curr.execute(f"""
+        INSERT INTO {spec['base']} ({', '.join(_base_columns(spec))})
+        SELECT {', '.join(_encoded_values(spec, 'l'))}
+        FROM {legacy} AS l
+        ORDER BY l.rowid;
+    """)
+
+
+def create_normalized_schema(conn):
+    """
+    Create lookup tables and normalized tables in one transaction, so an
+    interrupted migration leaves the old table in place.
+    """
+    curr = conn.cursor()
+    curr.execute("BEGIN;")
+    try:
+        create_lookup_tables(curr)
+        for view in NORMALIZED_TABLES:
+            create_normalized_table(curr, view)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def get_lookup_values(table):
+    """
+    Get the values of a lookup table in sort order.
+
+    Args:
+        table: One of LOOKUP_TABLES
+
+    Returns:
+        list: (id, name) tuples
+    """
+    if table not in LOOKUP_TABLES:
+        raise ValueError(f"Unknown lookup table: {table}")
+    conn = get_connection()
+    curr = conn.cursor()
+    try:
+        curr.execute(f"SELECT id, name FROM {table} ORDER BY sort_order, id;")
+        return curr.fetchall()
+    finally:
+        conn.close()
@@ -0,0 +1,294 @@
+"""
+In-process metrics (counters, gauges, histograms) in the Prometheus text
+exposition format.
+
+Modules register their metrics at import time and update them as they
+work: logins and lockouts (security.py, users.py), access denials
+(app/utils/auth.py), statement latency (query_stats.py), snapshot and
+figure-cache hits, and page renders (app/utils/profiling.py).
+
+The metrics of this process are served by start_metrics_server() at
+http://METRICS_HOST:METRICS_PORT/metrics, or written to a file with
+write_metrics_file() (e.g. for the node exporter's textfile collector).
+"""
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9108
+METRICS_FILE = "DATA/metrics.prom"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_registry = {}
+_registry_lock = threading.Lock()
+_server = None
+_server_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        with self._lock:
+            return [(self.name, key, (), value) for key, value in sorted(self._values.items())]
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {_escape(self.help)}", f"# TYPE {self.name} {self.type}"]
+        for name, key, extra, value in self._samples():
+            lines.append(f"{name}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. requests served."""
+
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """
+    Value that goes up and down.
+
+    A gauge built with fn is read at collection time instead: fn returns a
+    number (no labels) or a dict of {label values tuple: number}.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name, help, labelnames=(), fn=None):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def _samples(self):
+        if self.fn is None:
+            return super()._samples()
+        try:
+            values = self.fn()
+        except Exception:
+            return []  # e.g. the database is not reachable; skip this gauge
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [(self.name, tuple(str(v) for v in key), (), value) for key, value in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (e.g. latencies in seconds) over fixed buckets."""
+
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=(0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(b for b in buckets if b != math.inf)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    samples.append((f"{self.name}_bucket", key, (("le", _format_value(float(bound))),), cumulative))
+                samples.append((f"{self.name}_sum", key, (), total))
+                samples.append((f"{self.name}_count", key, (), count))
+        return samples
+
+
+def _register(cls, name, help, labelnames, **kwargs):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, help, labelnames, **kwargs)
+        elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+            raise ValueError(f"Metric {name} is already registered with a different type or labels")
+        return metric
+
+
+def counter(name, help, labelnames=()):
+    """Get or register a Counter (names should end in _total)."""
+    return _register(Counter, name, help, labelnames)
+
+
+def gauge(name, help, labelnames=(), fn=None):
+    """Get or register a Gauge, optionally computed by fn at collection time."""
+    return _register(Gauge, name, help, labelnames, fn=fn)
+
+
+def histogram(name, help, labelnames=(), buckets=(0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)):
+    """Get or register a Histogram (observe values in seconds for latencies)."""
+    return _register(Histogram, name, help, labelnames, buckets=buckets)
+
+
+def get_metric(name):
+    """Return a registered metric, or None."""
+    with _registry_lock:
+        return _registry.get(name)
+
+
+_start_time = gauge("platform_process_start_time_seconds", "Start time of the process since the epoch")
+_start_time.set(time.time())
+
+
+def render_metrics():
+    """
+    Render every registered metric.
+
+    Returns:
+        str: Prometheus text exposition format (version 0.0.4)
+    """
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda m: m.name)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.expose())
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_file(path=None):
+    """
+    Write the current metrics to a file (atomically replaced).
+
+    Args:
+        path: Output file (default: METRICS_FILE)
+
+    Returns:
+        str: The path written
+    """
+    path = path or METRICS_FILE
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_metrics())
+    os.replace(tmp, path)
+    return path
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes every few seconds would flood the console
+
+
+def start_metrics_server(port=None, host=None):
+    """
+    Serve /metrics from a background thread (once per process).
+
+    Later calls return the running server. Streamlit pages go through
+    app.utils.auth.start_metrics(), which caches it for the process.
+    With several app processes on one host, only the first one gets the
+    port; the others keep running without an endpoint.
+
+    Args:
+        port: TCP port (default: METRICS_PORT)
+        host: Interface to bind (default: METRICS_HOST, local only)
+
+    Returns:
+        ThreadingHTTPServer or None if the port could not be bound
+    """
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server or None
+        try:
+            server = ThreadingHTTPServer((host or METRICS_HOST, port or METRICS_PORT), _MetricsHandler)
+        except OSError as e:
+            print(f"Warning: metrics endpoint not started: {e}")
+            _server = False  # don't retry on every call
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+        _server = server
+        return server
+
+
+def stop_metrics_server():
+    """Stop the endpoint started by start_metrics_server(), if any."""
+    global _server
+    with _server_lock:
+        if _server:
+            _server.shutdown()
+            _server.server_close()
+        _server = None
@@ -0,0 +1,175 @@
+"""
+Paginated, filterable reads of the platform tables (used by the JSON API).
+
+Only the columns and filters listed in LISTINGS can be used, so caller
+input never ends up in the SQL text. Pages are either offset based
+(limit/offset) or, when sorting by the key, keyset based (after=<last key
+of the previous page>), which stays fast on deep pages of large tables.
+"""
+from .db import get_connection
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+
+# table -> key, columns returned, equality filters, free-text column, date column
+LISTINGS = {
+    "cyber_incidents": {
+        "key": "incident_id",
+        "columns": ["incident_id", "timestamp", "severity", "category", "status", "description"],
+        "filters": ["incident_id", "severity", "category", "status"],
+        "search": "description",
+        "date": "timestamp",
+    },
+    "it_tickets": {
+        "key": "ticket_id",
+        "columns": ["ticket_id", "created", "priority", "issue_type", "assigned_to", "status", "description"],
+        "filters": ["ticket_id", "priority", "issue_type", "assigned_to", "status"],
+        "search": "description",
+        "date": "created",
+    },
+    "datasets_metadata": {
+        "key": "dataset_id",
+        "columns": ["dataset_id", "name", "rows", "columns", "uploaded_by", "upload_date"],
+        "filters": ["dataset_id", "name", "uploaded_by"],
+        "search": "name",
+        "date": "upload_date",
+    },
+    # No password hashes, license keys or recovery codes
+    "users": {
+        "key": "id",
+        "columns": ["id", "username", "is_admin", "disabled", "role", "email", "failed_attempts"],
+        "filters": ["id", "username", "is_admin", "disabled", "role"],
+        "search": "username",
+        "date": None,
+    },
+}
+
+
+def _where(spec, filters, search, since, until):
+    clauses, params = [], []
+    for column, value in (filters or {}).items():
+        if column not in spec["filters"]:
+            raise ValueError(f"Cannot filter on {column!r} (allowed: {', '.join(spec['filters'])})")
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        if len(values) == 1:
+            clauses.append(f"{column} = ?")
+        else:
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+    if search:
+        clauses.append(f"{spec['search']} LIKE ? ESCAPE '\\'")
+        escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        params.append(f"%{escaped}%")
+    if (since or until) and not spec["date"]:
+        raise ValueError("This table has no date column to filter on")
+    if since:
+        clauses.append(f"{spec['date']} >= ?")
+        params.append(since)
+    if until:
+        clauses.append(f"{spec['date']} < ?")
+        params.append(until)
+    return clauses, params
+
+
+def list_rows(table, filters=None, search=None, since=None, until=None, sort=None, descending=False,
+              limit=DEFAULT_LIMIT, offset=0, after=None, count=False):
+    """
+    Read one page of a table.
+
+    Args:
+        table: Key of LISTINGS
+        filters: {column: value or list of values}, columns from the
+            table's "filters"
+        search: Substring to look for in the table's "search" column
+        since: Only rows whose date column is >= this (ISO date/time text)
+        until: Only rows whose date column is < this
+        sort: Column to sort by (default: the key)
+        descending: Sort descending
+        limit: Page size (capped at MAX_LIMIT)
+        offset: Rows to skip (offset pagination)
+        after: Key of the last row of the previous page (keyset pagination,
+            only when sorting by the key)
+        count: Also count all matching rows (a full scan on large tables)
+
+    Returns:
+        dict: rows (list of dicts), limit, offset, next_after (key to pass
+        as `after` for the next page, None on the last page) and total
+        (None unless count is True)
+
+    Raises:
+        ValueError: Unknown table, column or an invalid combination
+    """
+    spec = LISTINGS.get(table)
+    if spec is None:
+        raise ValueError(f"Unknown table {table!r}")
+    key = spec["key"]
+    sort = sort or key
+    if sort not in spec["columns"]:
+        raise ValueError(f"Cannot sort by {sort!r}")
+    if after is not None and sort != key:
+        raise ValueError(f"'after' needs the rows sorted by {key}")
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    offset = max(0, int(offset))
+
+    clauses, params = _where(spec, filters, search, since, until)
+    page_clauses, page_params = list(clauses), list(params)
+    if after is not None:
+        page_clauses.append(f"{key} {'<' if descending else '>'} ?")
+        page_params.append(after)
+    direction = "DESC" if descending else "ASC"
+    # The key breaks ties so offset pages don't overlap
+    order = f"{sort} {direction}" + (f", {key} {direction}" if sort != key else "")
+
+    sql = f"SELECT {', '.join(spec['columns'])} FROM {table}"
+    if page_clauses:
+        sql += " WHERE " + " AND ".join(page_clauses)
+    sql += f" ORDER BY {order} LIMIT ? OFFSET ?;"
+
+    conn = get_connection()
+    curr = conn.cursor()
+    try:
+        curr.execute(sql, page_params + [limit, offset])
+        rows = [dict(zip(spec["columns"], row)) for row in curr.fetchall()]
+        total = None
+        if count:
+            count_sql = f"SELECT COUNT(*) FROM {table}"
+            if clauses:
+                count_sql += " WHERE " + " AND ".join(clauses)
+            curr.execute(count_sql + ";", params)
+            total = curr.fetchone()[0]
+    finally:
+        conn.close()
+
+    return {
+        "rows": rows,
+        "limit": limit,
+        "offset": offset,
+        "next_after": rows[-1][key] if len(rows) == limit and sort == key else None,
+        "total": total,
+    }
+
+
+def get_row(table, key_value):
+    """
+    Read one row by key.
+
+    Args:
+        table: Key of LISTINGS
+        key_value: Value of the table's key column
+
+    Returns:
+        dict: The row's listed columns, or None if not found
+    """
+    spec = LISTINGS.get(table)
+    if spec is None:
+        raise ValueError(f"Unknown table {table!r}")
+    conn = get_connection()
+    curr = conn.cursor()
+    try:
+        curr.execute(
+            f"SELECT {', '.join(spec['columns'])} FROM {table} WHERE {spec['key']} = ? LIMIT 1;", (key_value,)
+        )
+        row = curr.fetchone()
+    finally:
+        conn.close()
+    return dict(zip(spec["columns"], row)) if row else None
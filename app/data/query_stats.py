@@ -0,0 +1,257 @@
+"""
+In-memory statistics for the SQL statements run through db.get_connection().
+
+The instrumented cursors in db.py call record_statement() once per finished
+statement. Statements are grouped by their SQL text (whitespace collapsed),
+with counts, latency histograms, rows returned and the call sites that ran
+them. Statements slower than the slow-query threshold are also kept, with
+their EXPLAIN QUERY PLAN, in a bounded in-memory log and appended to
+SLOW_QUERY_LOG (rotated at SLOW_QUERY_LOG_MAX_BYTES, one old file kept).
+Parameter values are never kept, only their types: statements on users
+bind password hashes and recovery codes.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from . import metrics
+
+# Upper bounds of the latency histogram buckets (the last one catches the rest)
+LATENCY_BUCKETS_MS = [0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000, float("inf")]
+
+SLOW_QUERY_MS = 100.0
+SLOW_QUERY_LOG = "DATA/slow_queries.jsonl"
+SLOW_QUERY_LOG_MAX_BYTES = 5 * 1024 * 1024
+MAX_SLOW_QUERIES = 200
+MAX_STATEMENTS = 500  # distinct SQL texts tracked; later ones are grouped as "(other)"
+
+STATEMENT_SECONDS = metrics.histogram(
+    "platform_db_statement_seconds", "Latency of SQL statements by kind", ["kind"],
+    buckets=[b / 1000 for b in LATENCY_BUCKETS_MS],
+)
+STATEMENT_ERRORS = metrics.counter("platform_db_statement_errors_total", "Failed SQL statements by kind", ["kind"])
+_STATEMENT_KINDS = {"select", "insert", "update", "delete", "replace", "with", "create", "alter", "drop",
+                    "pragma", "begin", "commit", "rollback"}
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_SKIP_FILES = {os.path.abspath(__file__), os.path.join(os.path.dirname(os.path.abspath(__file__)), "db.py")}
+
+_lock = threading.Lock()
+_statements = {}
+_histogram = [0] * len(LATENCY_BUCKETS_MS)
+_slow = deque(maxlen=MAX_SLOW_QUERIES)
+_total_ms = 0.0
+_started_at = time.time()
+
+
+def normalize_sql(sql):
+    """Collapse whitespace so the same statement always gets the same key."""
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def call_site():
+    """
+    Find the first caller outside the database layer that is part of the repo.
+
+    Returns:
+        str: "path/to/file.py:line function", or "?" if none was found
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(_REPO_ROOT) and filename not in _SKIP_FILES:
+            return f"{os.path.relpath(filename, _REPO_ROOT)}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+
+def _bucket(ms):
+    for i, bound in enumerate(LATENCY_BUCKETS_MS):
+        if ms <= bound:
+            return i
+    return len(LATENCY_BUCKETS_MS) - 1
+
+
+def record_statement(sql, ms, rows, site, error=None, params=None, plan_fn=None):
+    """
+    Record one finished statement.
+
+    Args:
+        sql: Statement text
+        ms: Wall time from execute() to the last row fetched
+        rows: Rows returned (SELECT) or changed (INSERT/UPDATE/DELETE)
+        site: Call site from call_site()
+        error: Exception class name if the statement failed
+        params: Bound parameters (only kept for slow queries)
+        plan_fn: Zero-argument callable returning the EXPLAIN QUERY PLAN
+            rows; only called for slow queries
+    """
+    global _total_ms
+    key = normalize_sql(sql)
+    bucket = _bucket(ms)
+    with _lock:
+        _total_ms += ms
+        stats = _statements.get(key)
+        if stats is None:
+            if len(_statements) >= MAX_STATEMENTS:
+                key = "(other)"
+                stats = _statements.get(key)
+            if stats is None:
+                stats = _statements[key] = {
+                    "count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                    "histogram": [0] * len(LATENCY_BUCKETS_MS), "sites": Counter(),
+                }
+        stats["count"] += 1
+        stats["total_ms"] += ms
+        stats["max_ms"] = max(stats["max_ms"], ms)
+        stats["rows"] += max(rows, 0)
+        stats["histogram"][bucket] += 1
+        stats["sites"][site] += 1
+        if error:
+            stats["errors"] += 1
+        _histogram[bucket] += 1
+
+    kind = key.split(" ", 1)[0].lower()
+    kind = kind if kind in _STATEMENT_KINDS else "other"
+    STATEMENT_SECONDS.observe(ms / 1000, kind=kind)
+    if error:
+        STATEMENT_ERRORS.inc(kind=kind)
+
+    if ms >= SLOW_QUERY_MS:
+        _record_slow(key, ms, rows, site, error, params, plan_fn)
+
+
+def _describe_params(params):
+    # Types only, e.g. "(str, int, NoneType)"; values may be secrets
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in params.items()) + "}"
+    return "(" + ", ".join(type(value).__name__ for value in params) + ")"
+
+
+def _append_slow_log(entry):
+    os.makedirs(os.path.dirname(SLOW_QUERY_LOG) or ".", exist_ok=True)
+    try:
+        if os.path.getsize(SLOW_QUERY_LOG) >= SLOW_QUERY_LOG_MAX_BYTES:
+            os.replace(SLOW_QUERY_LOG, SLOW_QUERY_LOG + ".1")
+    except FileNotFoundError:
+        pass
+    with open(SLOW_QUERY_LOG, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def _record_slow(sql, ms, rows, site, error, params, plan_fn):
+    plan = None
+    if plan_fn is not None:
+        try:
+            plan = [row[-1] for row in plan_fn()]
+        except Exception as e:  # plans are best effort (e.g. connection already closed)
+            plan = [f"(no plan: {type(e).__name__})"]
+    entry = {
+        "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "ms": round(ms, 3),
+        "rows": rows,
+        "sql": sql,
+        "params": _describe_params(params) if params else None,
+        "site": site,
+        "error": error,
+        "plan": plan,
+    }
+    with _lock:
+        _slow.append(entry)
+    if SLOW_QUERY_LOG:
+        try:
+            _append_slow_log(entry)
+        except OSError:
+            pass
+
+
+def set_slow_query_threshold(ms):
+    """Set the latency (milliseconds) above which statements are logged as slow."""
+    global SLOW_QUERY_MS
+    SLOW_QUERY_MS = float(ms)
+
+
+def get_query_stats(top=None, sort_by="total_ms"):
+    """
+    Get per-statement statistics.
+
+    Args:
+        top: Only return this many statements (optional)
+        sort_by: Field to sort by, descending ("total_ms", "count", "max_ms", ...)
+
+    Returns:
+        list: Dicts with sql, count, errors, total_ms, mean_ms, max_ms, rows,
+        histogram and sites (most frequent first)
+    """
+    with _lock:
+        rows = [
+            {
+                "sql": sql,
+                "count": s["count"],
+                "errors": s["errors"],
+                "total_ms": s["total_ms"],
+                "mean_ms": s["total_ms"] / s["count"] if s["count"] else 0.0,
+                "max_ms": s["max_ms"],
+                "rows": s["rows"],
+                "histogram": list(s["histogram"]),
+                "sites": s["sites"].most_common(),
+            }
+            for sql, s in _statements.items()
+        ]
+    rows.sort(key=lambda row: row[sort_by], reverse=True)
+    return rows[:top] if top else rows
+
+
+def get_latency_histogram():
+    """
+    Get the latency histogram over all statements.
+
+    Returns:
+        list: (upper bound in ms, count) per bucket
+    """
+    with _lock:
+        return list(zip(LATENCY_BUCKETS_MS, _histogram))
+
+
+def get_slow_queries():
+    """Get the in-memory slow-query log, newest first."""
+    with _lock:
+        return list(reversed(_slow))
+
+
+def get_summary():
+    """
+    Get totals since the last reset.
+
+    Returns:
+        dict: statements, distinct, errors, total_ms, slow and since (epoch seconds)
+    """
+    with _lock:
+        return {
+            "statements": sum(s["count"] for s in _statements.values()),
+            "distinct": len(_statements),
+            "errors": sum(s["errors"] for s in _statements.values()),
+            "total_ms": sum(s["total_ms"] for s in _statements.values()),
+            "slow": len(_slow),
+            "since": _started_at,
+        }
+
+
+def get_total_ms():
+    """Total statement time (milliseconds) since the last reset; cheap enough to call per span."""
+    return _total_ms
+
+
+def reset_query_stats():
+    """Clear all statistics and the in-memory slow-query log."""
+    global _started_at, _total_ms
+    with _lock:
+        _total_ms = 0.0
+        _statements.clear()
+        _histogram[:] = [0] * len(LATENCY_BUCKETS_MS)
+        _slow.clear()
+        _started_at = time.time()
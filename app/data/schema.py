@@ -1,4 +1,9 @@
+import sqlite3
+
 from .db import get_connection
+from .generations import TRACKED_TABLES
+from .change_log import CHANGE_LOG_KEYS
+from .lookups import NORMALIZED_TABLES, create_normalized_schema
 import random
 import string
 
@@ -13,6 +18,70 @@ def generate_license_key():
     return f"{block()}-{block()}-{block()}"
 
 
+def create_generation_triggers(curr, table, logical_name=None):
+    """
+    Create triggers that bump data_generations for `table` on every write.
+
+    Args:
+        curr: Cursor to run the statements on
+        table: Physical table the triggers are attached to
+        logical_name: Name the generation is recorded under (default: table)
+    """
+    logical_name = logical_name or table
+    curr.execute(
+        "INSERT OR IGNORE INTO data_generations (table_name, generation) VALUES (?, 0);",
+        (logical_name,),
+    )
+    for op in ("INSERT", "UPDATE", "DELETE"):
+        curr.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_{op.lower()}_generation
+            AFTER {op} ON {table}
+            BEGIN
+                UPDATE data_generations SET generation = generation + 1
+                WHERE table_name = '{logical_name}';
+            END;
+        """)
+
+
+def create_change_log_triggers(curr, table, key, logical_name=None):
+    """
+    Create triggers that append a change_log row for every write to `table`.
+
+    Updates that change the key are recorded as a delete of the old key
+    followed by an update of the new one.
+
+    Args:
+        curr: Cursor to run the statements on
+        table: Physical table the triggers are attached to
+        key: Key column recorded as row_key
+        logical_name: Name the changes are recorded under (default: table)
+    """
+    logical_name = logical_name or table
+    curr.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_insert_change_log
+        AFTER INSERT ON {table}
+        BEGIN
+            INSERT INTO change_log (table_name, row_key, op) VALUES ('{logical_name}', NEW.{key}, 'insert');
+        END;
+    """)
+    curr.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_update_change_log
+        AFTER UPDATE ON {table}
+        BEGIN
+            INSERT INTO change_log (table_name, row_key, op)
+            SELECT '{logical_name}', OLD.{key}, 'delete' WHERE OLD.{key} IS NOT NEW.{key};
+            INSERT INTO change_log (table_name, row_key, op) VALUES ('{logical_name}', NEW.{key}, 'update');
+        END;
+    """)
+    curr.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_delete_change_log
+        AFTER DELETE ON {table}
+        BEGIN
+            INSERT INTO change_log (table_name, row_key, op) VALUES ('{logical_name}', OLD.{key}, 'delete');
+        END;
+    """)
+
+
 def create_tables():
     """
     Create all database tables if they don't exist.
@@ -57,18 +126,6 @@ def create_tables():
         except:
             pass  # Column already exists or other error
     
-    # Cyber incidents table
-    curr.execute("""
-        CREATE TABLE IF NOT EXISTS cyber_incidents (
-            incident_id INTEGER,
-            timestamp TEXT,
-            severity TEXT,
-            category TEXT,
-            status TEXT,
-            description TEXT
-        );
-    """)
-    
     # Datasets metadata table
     curr.execute("""
         CREATE TABLE IF NOT EXISTS datasets_metadata (
@@ -80,20 +137,83 @@ def create_tables():
             upload_date TEXT
         );
     """)
-    
-    # IT tickets table
+    # Lookups and keyset pagination by id (e.g. the API)
+    curr.execute("CREATE INDEX IF NOT EXISTS idx_datasets_metadata_dataset_id ON datasets_metadata (dataset_id);")
+
+    # Filled in when a dataset file is profiled (see dataset_profiles.py)
+    for column, column_type in [("file_bytes", "INTEGER"), ("file_format", "TEXT"),
+                                ("profiled_at", "TEXT"), ("profile_seconds", "REAL")]:
+        try:
+            curr.execute(f"SELECT {column} FROM datasets_metadata LIMIT 1;")
+        except sqlite3.OperationalError:
+            curr.execute(f"ALTER TABLE datasets_metadata ADD COLUMN {column} {column_type};")
+            conn.commit()
+
+    # Per-column statistics of profiled datasets
     curr.execute("""
-        CREATE TABLE IF NOT EXISTS it_tickets (
-            ticket_id INTEGER,
-            created TEXT,
-            priority TEXT,
-            issue_type TEXT,
-            assigned_to TEXT,
-            status TEXT,
-            description TEXT
+        CREATE TABLE IF NOT EXISTS dataset_columns (
+            dataset_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            dtype TEXT NOT NULL,
+            non_null INTEGER NOT NULL,
+            nulls INTEGER NOT NULL,
+            min_value,
+            max_value,
+            mean REAL,
+            std REAL,
+            max_length INTEGER,
+            PRIMARY KEY (dataset_id, position)
         );
     """)
     
+    # Audit trail for user management
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS audit_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TEXT NOT NULL,
+            event_type TEXT NOT NULL,
+            user_id INTEGER,
+            username TEXT,
+            actor TEXT,
+            details TEXT
+        );
+    """)
+    curr.execute("CREATE INDEX IF NOT EXISTS idx_audit_created_at ON audit_events (created_at);")
+    curr.execute("CREATE INDEX IF NOT EXISTS idx_audit_username ON audit_events (username, created_at);")
+    curr.execute("CREATE INDEX IF NOT EXISTS idx_audit_event_type ON audit_events (event_type, created_at);")
+    curr.execute("CREATE INDEX IF NOT EXISTS idx_audit_actor ON audit_events (actor, created_at);")
+
+    # Generation counters, bumped by triggers on every write (used as cache keys)
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS data_generations (
+            table_name TEXT PRIMARY KEY,
+            generation INTEGER NOT NULL DEFAULT 0
+        );
+    """)
+
+    # Change-data-capture log: one row per written row, in commit order
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_key,
+            op TEXT NOT NULL,
+            changed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    curr.execute("CREATE INDEX IF NOT EXISTS idx_change_log_table_seq ON change_log (table_name, seq);")
+    conn.commit()
+
+    # Cyber incidents and IT tickets: views over integer-coded base tables
+    create_normalized_schema(conn)
+
+    for table in TRACKED_TABLES:
+        # Normalized tables are written through their base table
+        physical = NORMALIZED_TABLES[table]["base"] if table in NORMALIZED_TABLES else table
+        create_generation_triggers(curr, physical, table)
+        create_change_log_triggers(curr, physical, CHANGE_LOG_KEYS[table], table)
+
     conn.commit()
     conn.close()
 
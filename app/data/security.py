@@ -1,8 +1,17 @@
 import re
+import time
 import bcrypt
 import random
 import string
 
+from . import metrics
+
+LOGINS = metrics.counter("platform_logins_total", "Login attempts by result", ["result"])
+LOGIN_SECONDS = metrics.histogram(
+    "platform_login_seconds", "Time to authenticate a user (lookup and bcrypt check)",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
 
 def validate_password_strength(password):
     checks = {
@@ -75,21 +84,34 @@ def authenticate_user(username, password):
         # Fallback if relative import fails
         from app.data.users import get_user_by_username
     
+    start = time.perf_counter()
+    try:
+        success, user_data, message, result = _authenticate(get_user_by_username, username, password)
+    except Exception:
+        LOGINS.inc(result="error")
+        raise
+    LOGINS.inc(result=result)
+    LOGIN_SECONDS.observe(time.perf_counter() - start)
+    return success, user_data, message
+
+
+def _authenticate(get_user_by_username, username, password):
+    # Returns authenticate_user's tuple plus the result label for the metrics
     user = get_user_by_username(username)
     
     if not user:
-        return False, None, "Invalid username or password."
+        return False, None, "Invalid username or password.", "unknown_user"
     
     # user tuple structure: (id, username, password_hash, is_admin, disabled, role, email, license_key)
     user_id, db_username, password_hash, is_admin, disabled, role, email, license_key = user[:8]
     
     # Check if user is disabled
     if disabled:
-        return False, None, "This account is disabled."
+        return False, None, "This account is disabled.", "disabled"
     
     # Verify password
     if not verify_password(password, password_hash):
-        return False, None, "Invalid username or password."
+        return False, None, "Invalid username or password.", "bad_password"
     
     # Return user data as dictionary
     user_data = {
@@ -102,5 +124,5 @@ def authenticate_user(username, password):
         "license_key": license_key
     }
     
-    return True, user_data, "Login successful."
+    return True, user_data, "Login successful.", "success"
 
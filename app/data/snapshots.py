@@ -0,0 +1,258 @@
+"""
+Columnar snapshots of the dashboard tables (optional, needs pyarrow).
+
+Each table is exported to an uncompressed Arrow IPC file under
+DATA/snapshots, with a sidecar JSON recording the table generation it was
+taken at. Reading a snapshot memory-maps the file, so numeric and
+dictionary-encoded columns come back without a row-by-row SQLite read.
+
+A snapshot is only used while its generation matches the table's current
+one. A stale snapshot is brought up to date from the change log when only a
+few rows changed: the changed keys are re-read from SQLite and replace their
+old rows (so changed rows move to the end of the frame). Otherwise, or when
+pyarrow is not installed, the table is read from SQLite as before and, if
+pyarrow is available, written back out so the next reader gets the fast path.
+"""
+import json
+import os
+import threading
+import time
+
+from . import metrics
+from .change_log import CHANGE_LOG_KEYS, change_log_covers, changed_keys, latest_change_seq
+from .cyber_incidents import read_all_cyber_incidents, read_cyber_incidents_by_ids
+from .dtypes import optimize_incidents, optimize_tickets
+from .generations import get_table_generation
+from .it_tickets import read_all_tickets, read_tickets_by_ids
+
+SNAPSHOT_DIR = "DATA/snapshots"
+
+# table -> function reading it from SQLite (with compact dtypes)
+SNAPSHOT_READERS = {
+    "cyber_incidents": read_all_cyber_incidents,
+    "it_tickets": read_all_tickets,
+}
+
+# table -> (function reading rows by key, dtype optimizer) for delta updates
+SNAPSHOT_DELTA_READERS = {
+    "cyber_incidents": (read_cyber_incidents_by_ids, optimize_incidents),
+    "it_tickets": (read_tickets_by_ids, optimize_tickets),
+}
+
+READS = metrics.counter(
+    "platform_snapshot_reads_total", "Dashboard table reads by where the rows came from", ["table", "source"]
+)
+REBUILDS = metrics.counter("platform_snapshot_rebuilds_total", "Snapshot refreshes by kind", ["table", "kind"])
+
+# Above this share of changed keys a full re-read is cheaper than a delta
+DELTA_MAX_FRACTION = 0.1
+
+
+def _pyarrow():
+    # Optional dependency, imported on first use so startup doesn't pay for it
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        return None
+    return pa
+
+
+def snapshots_available():
+    """Return True if pyarrow is installed and snapshots can be used."""
+    return _pyarrow() is not None
+
+
+def _tmp_suffix():
+    # Unique per writer: streamlit sessions export from threads of one process
+    return f".{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _paths(table):
+    base = os.path.join(SNAPSHOT_DIR, table)
+    return base + ".arrow", base + ".json"
+
+
+def snapshot_info(table):
+    """
+    Get the sidecar metadata of a table's snapshot.
+
+    Returns:
+        dict: generation, change_seq, rows, created_at and export_seconds, or None if
+        there is no complete snapshot
+    """
+    data_path, meta_path = _paths(table)
+    try:
+        with open(meta_path, "r") as f:
+            info = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return info if os.path.exists(data_path) else None
+
+
+def write_snapshot(table, df, generation, change_seq=None):
+    """
+    Write a DataFrame as the snapshot of `table` at `generation`.
+
+    change_seq is the last change_log sequence number included in df; a
+    snapshot without one can only be replaced by a full export.
+
+    The data file is replaced before the sidecar, and both are written to a
+    temporary file first, so readers never see a half-written snapshot or a
+    sidecar claiming a generation the data file doesn't have.
+
+    Returns:
+        bool: True if written, False if pyarrow is not installed
+    """
+    pa = _pyarrow()
+    if pa is None:
+        return False
+    start = time.perf_counter()
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    data_path, meta_path = _paths(table)
+
+    arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = data_path + _tmp_suffix()
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, arrow_table.schema) as writer:
+            writer.write_table(arrow_table)
+    os.replace(tmp_path, data_path)
+
+    info = {
+        "generation": generation,
+        "change_seq": change_seq,
+        "rows": len(df),
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "export_seconds": round(time.perf_counter() - start, 4),
+    }
+    tmp_meta = meta_path + _tmp_suffix()
+    with open(tmp_meta, "w") as f:
+        json.dump(info, f)
+    os.replace(tmp_meta, meta_path)
+    return True
+
+
+def load_snapshot(table):
+    """
+    Load a table's snapshot through a memory map.
+
+    Returns:
+        pandas.DataFrame: Snapshot contents (categoricals keep their order)
+    """
+    pa = _pyarrow()
+    data_path, _ = _paths(table)
+    with pa.memory_map(data_path, "r") as source:
+        arrow_table = pa.ipc.open_file(source).read_all()
+    return arrow_table.to_pandas()
+
+
+def _apply_changes(table, info):
+    """
+    Bring a stale snapshot up to date from the change log.
+
+    Returns:
+        tuple: (DataFrame, last change seq applied), or None when the log
+        can't cover the gap or so much changed that a full read is cheaper
+    """
+    import pandas as pd
+
+    seq = info.get("change_seq")
+    if seq is None or not change_log_covers(seq):
+        return None
+    last_seq, keys = changed_keys(seq, table)
+    if None in keys or len(keys) > max(info["rows"] * DELTA_MAX_FRACTION, 1):
+        return None
+
+    read_by_ids, optimize = SNAPSHOT_DELTA_READERS[table]
+    df = load_snapshot(table)
+    if keys:
+        key_col = CHANGE_LOG_KEYS[table]
+        # Deleted keys are simply not found again
+        changed = read_by_ids(keys)
+        kept = df[~df[key_col].isin(list(keys))]
+        df = optimize(pd.concat([kept, changed], ignore_index=True))
+    return df, last_seq
+
+
+def _rebuild(table, generation, info):
+    """Refresh a stale snapshot by delta or full read, write it and return the frame."""
+    delta = _apply_changes(table, info) if info else None
+    if delta is not None:
+        df, change_seq = delta
+        REBUILDS.inc(table=table, kind="delta")
+    else:
+        REBUILDS.inc(table=table, kind="full")
+        # Read the sequence first: changes racing the read are re-applied later
+        change_seq = latest_change_seq()
+        df = SNAPSHOT_READERS[table]()
+    write_snapshot(table, df, generation, change_seq)
+    return df
+
+
+def refresh_snapshot(table, force=False):
+    """
+    Re-export a table if its snapshot is older than the table.
+
+    Meant to be called after writes (e.g. at the end of an import); reads
+    through read_table() refresh stale snapshots on their own.
+
+    Args:
+        table: One of SNAPSHOT_READERS
+        force: Export even if the snapshot is current
+
+    Returns:
+        bool: True if a new snapshot was written
+    """
+    if not snapshots_available():
+        return False
+    generation = get_table_generation(table)
+    info = snapshot_info(table)
+    if not force and info and info["generation"] == generation:
+        return False
+    _rebuild(table, generation, None if force else info)
+    return True
+
+
+def refresh_all_snapshots(force=False):
+    """Refresh every stale snapshot. Returns the list of tables exported."""
+    return [table for table in SNAPSHOT_READERS if refresh_snapshot(table, force)]
+
+
+def read_table(table, generation=None):
+    """
+    Read a dashboard table, from its snapshot when it is current.
+
+    Args:
+        table: One of SNAPSHOT_READERS
+        generation: Table generation the caller already read (saves a query)
+
+    Returns:
+        pandas.DataFrame: Same frame as the table's read_all_* function
+    """
+    if table not in SNAPSHOT_READERS:
+        raise ValueError(f"No snapshot reader for {table}")
+    pa = _pyarrow()
+    if pa is None:
+        READS.inc(table=table, source="sqlite")
+        return SNAPSHOT_READERS[table]()
+
+    if generation is None:
+        generation = get_table_generation(table)
+    info = snapshot_info(table)
+    if info and info["generation"] == generation:
+        try:
+            df = load_snapshot(table)
+            READS.inc(table=table, source="snapshot")
+            return df
+        except (OSError, pa.ArrowException):
+            pass  # unreadable snapshot: rebuild it below
+        info = None
+
+    try:
+        df = _rebuild(table, generation, info)
+        READS.inc(table=table, source="rebuilt")
+        return df
+    except (OSError, pa.ArrowException) as e:
+        print(f"Warning: could not write {table} snapshot: {e}")
+        READS.inc(table=table, source="sqlite")
+        return SNAPSHOT_READERS[table]()
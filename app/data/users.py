@@ -1,13 +1,18 @@
 from .db import get_connection
 from .schema import generate_license_key
+from .audit import record_event
+from . import metrics
 # Import security functions inside functions to avoid circular import
 
+LOCKOUTS = metrics.counter("platform_account_lockouts_total", "Accounts locked")
+UNLOCKS = metrics.counter("platform_account_unlocks_total", "Accounts unlocked by an admin")
+
 
 def _bool(value):
     return 0 if value in (None, "None") else int(value)
 
 
-def add_user_full(username, password_hash, is_admin, disabled, role, email, license_key):
+def add_user_full(username, password_hash, is_admin, disabled, role, email, license_key, actor=None, source=None):
     """
     Add a user to the database using INSERT OR IGNORE (prevents duplicates).
     
@@ -19,6 +24,9 @@ def add_user_full(username, password_hash, is_admin, disabled, role, email, lice
         role: User role
         email: User email
         license_key: License key
+        actor: Username performing the action, for the audit log (optional)
+        source: Where the user came from, for the audit log (optional,
+            e.g. "import" or "seed")
     """
     conn = get_connection()
     curr = conn.cursor()
@@ -30,6 +38,9 @@ def add_user_full(username, password_hash, is_admin, disabled, role, email, lice
     try:
         curr.execute(sql, (username, password_hash, is_admin, disabled, role, email, license_key))
         conn.commit()
+        if curr.rowcount == 1:
+            details = {"role": role, "source": source} if source else {"role": role}
+            record_event("user_created", curr.lastrowid, username, actor, details)
     except Exception as e:
         conn.rollback()
         raise
@@ -39,35 +50,207 @@ def add_user_full(username, password_hash, is_admin, disabled, role, email, lice
 
 def load_users_from_file(path="DATA/users.txt"):
     """
-    Load users from a text file.
+    Load users from a text file (see bulk_import_users() for the format).
     
     Args:
         path: Path to the users file (default: "DATA/users.txt")
+    
+    Returns:
+        int: Number of user lines loaded (new or already present), or None
+        if the file could not be read
     """
     try:
-        with open(path, "r") as f:
-            lines = f.readlines()
-        for line in lines:
-            parts = line.strip().split(',')
-            if len(parts) != 7:
-                continue
-            username, password_hash, is_admin, disabled, role, email, license_key = parts
-            add_user_full(username, password_hash, is_admin, disabled, role, email, license_key)
+        report = bulk_import_users(path)
     except FileNotFoundError:
         print(f"Warning: Users file not found at {path}")
+        return None
     except Exception as e:
         print(f"Error loading users from file: {e}")
+        return None
+    for error in report["errors"]:
+        print(f"Warning: {path} line {error['line']}: {error['error']}")
+    return report["imported"] + report["existing"]
+
+
+# Password field of a users file line holding a temporary plain-text
+# password ("plain:Welcome!2024") instead of a hash
+PLAINTEXT_PREFIX = "plain:"
+IMPORT_BATCH_ROWS = 2000
+
+
+def _parse_user_line(line, security):
+    """Validate one users file line; returns the row values or raises ValueError."""
+    parts = [part.strip() for part in line.split(",")]
+    if len(parts) != 7:
+        raise ValueError(f"expected 7 comma-separated fields, got {len(parts)}")
+    username, password, is_admin, disabled, role, email, license_key = [
+        None if part in ("", "None") else part for part in parts
+    ]
+    if not username:
+        raise ValueError("empty username")
+    if not password:
+        raise ValueError("empty password hash")
+    try:
+        is_admin, disabled = _bool(is_admin), _bool(disabled)
+    except ValueError:
+        is_admin = None
+    if is_admin not in (0, 1) or disabled not in (0, 1):
+        raise ValueError("is_admin and disabled must be 0 or 1")
+    if email and not security.is_valid_email(email):
+        raise ValueError(f"invalid email {email!r}")
+    plaintext = None
+    if password.startswith(PLAINTEXT_PREFIX):
+        plaintext = password[len(PLAINTEXT_PREFIX):]
+        valid, checks = security.validate_password_strength(plaintext)
+        if not valid:
+            raise ValueError(" ".join(security.password_feedback(checks)))
+    return {
+        "username": username,
+        "password_hash": None if plaintext is not None else password,
+        "plaintext": plaintext,
+        "is_admin": is_admin,
+        "disabled": disabled,
+        "role": role,
+        "email": email.lower() if email else email,
+        "license_key": license_key or generate_license_key(),
+    }
+
+
+def bulk_import_users(path, workers=None, actor=None, progress=None):
+    """
+    Import a large users file in one transaction.
+    
+    Lines are "username,password_hash,is_admin,disabled,role,email,license_key";
+    blank lines and lines starting with "#" are skipped. A password field of
+    "plain:<password>" is a temporary plain-text password: it must pass the
+    strength check and is hashed with bcrypt in a process pool. The file is
+    streamed in batches, so memory stays bounded; invalid lines are reported
+    and skipped, and usernames already in the database are left unchanged.
+    
+    Args:
+        path: Users file
+        workers: Hashing processes (default: one per CPU)
+        actor: Username performing the import, for the audit log (optional)
+        progress: Called as progress(fraction, message) after every batch
+            (optional, used by background jobs)
+    
+    Returns:
+        dict: imported, existing (usernames already present), hashed
+        (plain-text passwords of new users hashed), errors (list of
+        {line, username, error}) and seconds
+    """
+    import os
+    import time
+    from concurrent.futures import ProcessPoolExecutor
+
+    from . import security
+
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    report = {"imported": 0, "existing": 0, "hashed": 0, "errors": []}
+    created, seen = [], set()
+    pool = None
+
+    def insert(batch):
+        usernames = [row["username"] for row in batch]
+        existing = set()
+        for i in range(0, len(usernames), 500):
+            chunk = usernames[i:i + 500]
+            curr.execute(f"SELECT username FROM users WHERE username IN ({', '.join('?' * len(chunk))});", chunk)
+            existing.update(name for (name,) in curr.fetchall())
+        new_rows = [row for row in batch if row["username"] not in existing]
+
+        # Temporary passwords of new users are hashed in parallel; a pool is
+        # only started once a batch has enough of them to be worth it
+        nonlocal pool
+        to_hash = [row for row in new_rows if row["plaintext"] is not None]
+        if len(to_hash) > 1 and workers > 1 and pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers)
+        if to_hash:
+            passwords = [row["plaintext"] for row in to_hash]
+            if pool is not None:
+                hashes = pool.map(security.hash_password, passwords, chunksize=max(1, len(passwords) // (workers * 4)))
+            else:
+                hashes = map(security.hash_password, passwords)
+            for row, hashed in zip(to_hash, hashes):
+                row["password_hash"] = hashed
+            report["hashed"] += len(to_hash)
+
+        curr.executemany(
+            "INSERT INTO users (username, password_hash, is_admin, disabled, role, email, license_key) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?);",
+            [(row["username"], row["password_hash"], row["is_admin"], row["disabled"], row["role"],
+              row["email"], row["license_key"]) for row in new_rows],
+        )
+        report["imported"] += len(new_rows)
+        report["existing"] += len(existing)
+        created.extend((row["username"], row["role"]) for row in new_rows)
+
+    size = os.path.getsize(path) or 1
+    read = 0
+
+    conn = get_connection()
+    curr = conn.cursor()
+    try:
+        with open(path, "r") as f:
+            batch = []
+            for number, line in enumerate(f, start=1):
+                read += len(line)
+                if not line.strip() or line.lstrip().startswith("#"):
+                    continue
+                username = line.split(",", 1)[0].strip() or None
+                try:
+                    row = _parse_user_line(line, security)
+                    if row["username"] in seen:
+                        raise ValueError("duplicate username in the file")
+                except ValueError as e:
+                    report["errors"].append({"line": number, "username": username, "error": str(e)})
+                    continue
+                seen.add(row["username"])
+                batch.append(row)
+                if len(batch) >= IMPORT_BATCH_ROWS:
+                    insert(batch)
+                    batch = []
+                    if progress is not None:
+                        progress(min(read / size, 1.0), f"{report['imported']} users imported")
+            if batch:
+                insert(batch)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        conn.close()
+
+    # Audit events once the users are committed
+    if created:
+        conn = get_connection()
+        try:
+            ids = {}
+            for i in range(0, len(created), 500):
+                chunk = [username for username, _ in created[i:i + 500]]
+                ids.update(conn.execute(
+                    f"SELECT username, id FROM users WHERE username IN ({', '.join('?' * len(chunk))});", chunk
+                ).fetchall())
+        finally:
+            conn.close()
+        for username, role in created:
+            record_event("user_created", ids.get(username), username, actor, {"role": role, "source": "import"})
+    report["seconds"] = time.perf_counter() - start
+    return report
 
 
 def add_test_users():
     """Add test users to the database."""
-    add_user_full("alice", "hashed_password_123", None, None, None, None, None)
-    add_user_full("bob", "hashed_password_456", None, None, None, None, None)
+    add_user_full("alice", "hashed_password_123", None, None, None, None, None, source="seed")
+    add_user_full("bob", "hashed_password_456", None, None, None, None, None, source="seed")
 
 
 # CRUD
 
-def create_user(username, password_hash, is_admin, disabled, role, email, license_key):
+def create_user(username, password_hash, is_admin, disabled, role, email, license_key, actor=None):
     """
     Create a new user.
     
@@ -79,6 +262,7 @@ def create_user(username, password_hash, is_admin, disabled, role, email, licens
         role: User role
         email: User email
         license_key: License key
+        actor: Username performing the action, for the audit log (optional)
         
     Returns:
         int: The ID of the newly created user
@@ -94,6 +278,7 @@ def create_user(username, password_hash, is_admin, disabled, role, email, licens
         curr.execute(sql, (username, password_hash, is_admin, disabled, role, email, license_key))
         conn.commit()
         user_id = curr.lastrowid
+        record_event("user_created", user_id, username, actor, {"role": role})
         return user_id
     except Exception as e:
         conn.rollback()
@@ -178,7 +363,7 @@ def get_all_users():
         conn.close()
 
 
-def update_user(user_id, username, password=None, is_admin=0, disabled=0, role="user", email="", license_key=None):
+def update_user(user_id, username, password=None, is_admin=0, disabled=0, role="user", email="", license_key=None, actor=None):
     """
     Update an existing user.
     
@@ -191,6 +376,7 @@ def update_user(user_id, username, password=None, is_admin=0, disabled=0, role="
         role: New role
         email: New email
         license_key: New license key (optional)
+        actor: Username performing the action, for the audit log (optional)
         
     Returns:
         tuple: (success: bool, message: str)
@@ -237,6 +423,12 @@ def update_user(user_id, username, password=None, is_admin=0, disabled=0, role="
             user_id
         ))
         conn.commit()
+        record_event("user_updated", user_id, username, actor, {
+            "password_changed": bool(password),
+            "is_admin": _bool(is_admin),
+            "disabled": _bool(disabled),
+            "role": role,
+        })
         return True, "User updated."
     except Exception as e:
         conn.rollback()
@@ -245,12 +437,13 @@ def update_user(user_id, username, password=None, is_admin=0, disabled=0, role="
         conn.close()
 
 
-def delete_user(user_id):
+def delete_user(user_id, actor=None):
     """
     Delete a user by their ID.
     
     Args:
         user_id: The user ID to delete
+        actor: Username performing the action, for the audit log (optional)
         
     Returns:
         tuple: (success: bool, message: str)
@@ -258,8 +451,12 @@ def delete_user(user_id):
     conn = get_connection()
     curr = conn.cursor()
     try:
+        curr.execute("SELECT username FROM users WHERE id = ?", (user_id,))
+        row = curr.fetchone()
         curr.execute("DELETE FROM users WHERE id = ?", (user_id,))
         conn.commit()
+        if curr.rowcount:
+            record_event("user_deleted", user_id, row[0] if row else None, actor)
     except Exception as e:
         conn.rollback()
         return False, f"Database error: {e}"
@@ -272,7 +469,14 @@ def delete_user(user_id):
 # ACCOUNT SECURITY FUNCTIONS
 # ===============================
 
-def update_user_failed_attempts(user_id, failed_attempts):
+def _username_for(curr, user_id):
+    # Audit events record the affected username, so they can be filtered by it
+    curr.execute("SELECT username FROM users WHERE id = ?", (user_id,))
+    row = curr.fetchone()
+    return row[0] if row else None
+
+
+def update_user_failed_attempts(user_id, failed_attempts, actor=None):
     """Update failed login attempts for a user. Like in terminal code: user["failed_attempts"] = value"""
     conn = get_connection()
     curr = conn.cursor()
@@ -286,7 +490,9 @@ def update_user_failed_attempts(user_id, failed_attempts):
         
         # Update failed attempts (like in terminal code: save_users(users))
         curr.execute("UPDATE users SET failed_attempts = ? WHERE id = ?", (int(failed_attempts), user_id))
+        username = _username_for(curr, user_id)
         conn.commit()
+        record_event("failed_attempts_updated", user_id, username, actor, {"failed_attempts": int(failed_attempts)})
         
         # Verify update
         curr.execute("SELECT failed_attempts FROM users WHERE id = ?", (user_id,))
@@ -304,7 +510,7 @@ def update_user_failed_attempts(user_id, failed_attempts):
         conn.close()
 
 
-def lock_user_account(user_id):
+def lock_user_account(user_id, actor=None):
     """Lock a user account by setting disabled flag. Like in terminal code: user["is_locked"] = "1" """
     conn = get_connection()
     curr = conn.cursor()
@@ -318,7 +524,10 @@ def lock_user_account(user_id):
         
         # Lock account (like in terminal code: user["is_locked"] = "1", user["failed_attempts"] = 3)
         curr.execute("UPDATE users SET disabled = 1, failed_attempts = 3 WHERE id = ?", (user_id,))
+        username = _username_for(curr, user_id)
         conn.commit()
+        record_event("user_locked", user_id, username, actor)
+        LOCKOUTS.inc()
         print(f"DEBUG: Locked account for user {user_id}")
     except Exception as e:
         conn.rollback()
@@ -327,13 +536,16 @@ def lock_user_account(user_id):
         conn.close()
 
 
-def unlock_user_account(user_id):
+def unlock_user_account(user_id, actor=None):
     """Unlock a user account and reset failed attempts."""
     conn = get_connection()
     curr = conn.cursor()
     try:
         curr.execute("UPDATE users SET disabled = 0, failed_attempts = 0 WHERE id = ?", (user_id,))
+        username = _username_for(curr, user_id)
         conn.commit()
+        record_event("user_unlocked", user_id, username, actor)
+        UNLOCKS.inc()
         return True, "User unlocked successfully."
     except Exception as e:
         conn.rollback()
@@ -354,7 +566,7 @@ def get_user_by_email(email):
         conn.close()
 
 
-def generate_recovery_code_for_user(user_id):
+def generate_recovery_code_for_user(user_id, actor=None):
     """Generate and save a recovery code for a user."""
     # Import here to avoid circular import
     from .security import generate_recovery_code
@@ -363,7 +575,9 @@ def generate_recovery_code_for_user(user_id):
     curr = conn.cursor()
     try:
         curr.execute("UPDATE users SET recovery_code = ? WHERE id = ?", (recovery_code, user_id))
+        username = _username_for(curr, user_id)
         conn.commit()
+        record_event("recovery_code_generated", user_id, username, actor)
         return recovery_code
     except Exception as e:
         conn.rollback()
@@ -433,6 +647,7 @@ def reset_password_with_recovery(username, email, recovery_code, new_password):
             WHERE id = ?
         """, (new_password_hash, user_id))
         conn.commit()
+        record_event("password_reset", user_id, db_username, db_username, {"method": "recovery"})
         return True, "Password reset successfully."
     except Exception as e:
         conn.rollback()
@@ -469,7 +684,7 @@ def get_user_by_username_for_recovery(username):
 # ===============================
 # MAIN SECURE USER CREATION
 # ===============================
-def create_user_secure(username, password, is_admin, disabled, role, email):
+def create_user_secure(username, password, is_admin, disabled, role, email, actor=None):
     """
     Create a new user with password validation and hashing.
     
@@ -480,6 +695,7 @@ def create_user_secure(username, password, is_admin, disabled, role, email):
         disabled: Disabled flag (0 or 1)
         role: User role
         email: User email
+        actor: Username performing the action, for the audit log (optional)
         
     Returns:
         tuple: (success: bool, message: str or list of error messages)
@@ -521,6 +737,7 @@ def create_user_secure(username, password, is_admin, disabled, role, email):
             recovery_code
         ))
         conn.commit()
+        record_event("user_created", curr.lastrowid, username, actor, {"role": role})
         return True, f"User '{username}' created successfully.\nLicense Key: {license_key}\nRecovery Code: {recovery_code}"
     except Exception as e:
         conn.rollback()
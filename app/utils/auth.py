@@ -1,12 +1,30 @@
 import streamlit as st
 
+from app.data import metrics
+
+ACCESS_DENIED = metrics.counter("platform_access_denied_total", "Page views refused by the auth checks", ["reason"])
+
+
+@st.cache_resource
+def start_metrics():
+    """
+    Start the /metrics endpoint of this Streamlit process.
+
+    Cached for the process, so whichever page a session opens first starts
+    it and every later call is a no-op. Called by app.py, the login page
+    and require_login().
+    """
+    return metrics.start_metrics_server()
+
 
 def require_login():
     """
     Check if user is authenticated. If not, redirect to login.
     Call this at the beginning of protected pages.
     """
+    start_metrics()
     if "authenticated" not in st.session_state or not st.session_state.authenticated:
+        ACCESS_DENIED.inc(reason="not_logged_in")
         st.warning("Please log in to access this page.")
         st.info("Redirecting to login page...")
         st.switch_page("pages/0_Login.py")
@@ -23,6 +41,7 @@ def require_admin():
     user = require_login()
     
     if not user.get("is_admin", False):
+        ACCESS_DENIED.inc(reason="not_admin")
         st.error("Access denied. Admin privileges required.")
         st.stop()
     
@@ -0,0 +1,127 @@
+"""
+Plotly figure builders shared by the dashboard pages.
+
+Each builder takes already-aggregated data (value counts, crosstabs,
+profiles) and returns a Figure, so pages can wrap them in cached_figure()
+and skip both the aggregation and the plotly work on a cache hit.
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from app.data.dtypes import LEVEL_ORDER
+
+
+def pie_chart(counts, title, color_map=None):
+    """Pie chart of a value_counts() Series."""
+    # Categorical columns also count categories that never occur
+    counts = counts[counts > 0]
+    fig = px.pie(
+        values=counts.values,
+        names=counts.index,
+        title=title,
+        color_discrete_map=color_map
+    )
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+
+def count_bar_chart(counts, x_label, y_label, title, color_scale, tick_angle=None):
+    """Bar chart of a value_counts() Series, coloured by count."""
+    counts = counts[counts > 0]
+    counts_df = pd.DataFrame({
+        x_label: counts.index,
+        y_label: counts.values
+    })
+    fig = px.bar(
+        counts_df,
+        x=x_label,
+        y=y_label,
+        title=title,
+        color=y_label,
+        color_continuous_scale=color_scale
+    )
+    fig.update_layout(showlegend=False)
+    if tick_angle is not None:
+        fig.update_xaxes(tickangle=tick_angle)
+    return fig
+
+
+def grouped_bar_chart(table, title, x_title, y_title="Count", barmode='group'):
+    """One bar trace per column of a crosstab, grouped by its index."""
+    table = table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+    fig = go.Figure()
+    for column in table.columns:
+        fig.add_trace(go.Bar(
+            name=str(column),
+            x=table.index,
+            y=table[column]
+        ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+        barmode=barmode
+    )
+    return fig
+
+
+def bubble_scatter(agg, x_col, y_col, x_order, y_order, title, x_label, y_label,
+                   count_label, hover_col, color_scale, jitter=0.15, seed=0):
+    """
+    Bubble chart of counts at each (x, y) level combination.
+
+    Args:
+        agg: DataFrame with x_col/y_col level positions, 'count' and hover_col
+        jitter: Random offset added to positions so bubbles don't overlap
+        seed: Seed for the jitter, so the same data always draws the same chart
+    """
+    rng = np.random.default_rng(seed)
+    plot_df = agg.assign(
+        x_jitter=agg[x_col].to_numpy() + rng.uniform(-jitter, jitter, len(agg)),
+        y_jitter=agg[y_col].to_numpy() + rng.uniform(-jitter, jitter, len(agg)),
+    )
+    fig = px.scatter(
+        plot_df,
+        x='x_jitter',
+        y='y_jitter',
+        size='count',
+        color='count',
+        title=title,
+        labels={'x_jitter': x_label, 'y_jitter': y_label, 'count': count_label},
+        hover_data=[hover_col, 'count'],
+        size_max=30,
+        color_continuous_scale=color_scale
+    )
+    fig.update_xaxes(tickvals=list(range(len(x_order))), ticktext=x_order)
+    fig.update_yaxes(tickvals=list(range(len(y_order))), ticktext=y_order)
+    return fig
+
+
+def radar_chart(profile, title, levels=LEVEL_ORDER):
+    """
+    Radar chart with one trace per row of a profile.
+
+    Args:
+        profile: DataFrame indexed by group, one column per level, values in percent
+        levels: Level columns to plot, in axis order
+    """
+    fig = go.Figure()
+    for name, row in profile.iterrows():
+        fig.add_trace(go.Scatterpolar(
+            r=[row.get(level, 0) for level in levels],
+            theta=list(levels),
+            fill='toself',
+            name=str(name)
+        ))
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 100]
+            )),
+        showlegend=True,
+        title=title
+    )
+    return fig
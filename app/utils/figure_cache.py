@@ -0,0 +1,106 @@
+"""
+Process-wide cache of built plotly figures.
+
+Figures are stored as plotly JSON keyed on (chart name, table generation,
+chart parameters). Streamlit runs every session in the same process, so a
+figure built for one session is reused by all others until the underlying
+table changes and its generation moves on. prefetch_figures() builds the
+independent charts of a page side by side on the database thread pool.
+"""
+import json
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+from app.data import metrics
+from app.data.async_api import get_executor
+
+MAX_ENTRIES = 256
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+REQUESTS = metrics.counter("platform_figure_cache_requests_total", "Figure cache lookups by result", ["result"])
+metrics.gauge("platform_figure_cache_entries", "Figures held in the figure cache", fn=lambda: len(_cache))
+
+
+def _make_key(name, generation, params):
+    return name, generation, json.dumps(params or {}, sort_keys=True, default=str)
+
+
+def cached_figure(name, generation, params, builder):
+    """
+    Return the figure for `name`, building it only on a cache miss.
+
+    Args:
+        name: Unique chart name, e.g. "tickets.priority_pie"
+        generation: Generation of the table(s) the chart is built from
+        params: JSON-serialisable chart parameters that change the output
+        builder: Zero-argument callable returning a plotly Figure (or None)
+
+    Returns:
+        plotly.graph_objects.Figure or None
+    """
+    key = _make_key(name, generation, params)
+    with _lock:
+        spec = _cache.get(key)
+        if spec is not None:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+
+    if spec is not None:
+        REQUESTS.inc(result="hit")
+        return pio.from_json(spec, skip_invalid=True)
+
+    REQUESTS.inc(result="miss")
+    fig = builder()
+    with _lock:
+        _stats["misses"] += 1
+        if fig is not None:
+            # Older generations of this chart can never be hit again
+            for old_key in [k for k in _cache if k[0] == name and k[1] != generation]:
+                del _cache[old_key]
+            _cache[key] = fig.to_json()
+            while len(_cache) > MAX_ENTRIES:
+                _cache.popitem(last=False)
+    return fig
+
+
+def prefetch_figures(generation, charts):
+    """
+    Start getting several figures at once, building cache misses concurrently.
+
+    The charts of a page only read the same frame, so their data preparation
+    (value counts, crosstabs, aggregations) and figure building can run side
+    by side; pandas releases the GIL for much of that work. Builders run off
+    the script thread and must not call streamlit.
+
+    Args:
+        generation: Generation of the table(s) the charts are built from
+        charts: {name: (params, builder)}, as for cached_figure()
+
+    Returns:
+        dict: {name: Future of the figure}; result() re-raises the builder's exception
+    """
+    executor = get_executor()
+    return {
+        name: executor.submit(cached_figure, name, generation, params, builder)
+        for name, (params, builder) in charts.items()
+    }
+
+
+def clear_figure_cache():
+    with _lock:
+        _cache.clear()
+        _stats["hits"] = _stats["misses"] = 0
+
+
+def figure_cache_stats():
+    """
+    Returns:
+        dict: hits, misses and number of cached figures
+    """
+    with _lock:
+        return {**_stats, "entries": len(_cache)}
@@ -0,0 +1,76 @@
+"""
+Auto-refresh for the dashboard pages.
+
+Instead of rerunning the whole page on a timer, a small fragment polls the
+generation counters (one single-row query) and triggers a full rerun only
+when a table the page shows has changed. Each session also keeps its last
+read of every table, so reruns caused by widgets (filters, tabs) don't read
+the table again, and charts of unchanged tables come from the figure cache.
+"""
+import time
+
+import streamlit as st
+
+from app.data.generations import get_table_generation, get_table_generations
+from app.data.snapshots import read_table
+
+INTERVAL_OPTIONS = [5, 10, 30, 60]
+DEFAULT_INTERVAL = 10
+
+
+def load_table(table):
+    """
+    Read a dashboard table for this session.
+
+    The session's previous read is reused while the table's generation is
+    unchanged.
+
+    Args:
+        table: Table name, e.g. "cyber_incidents"
+
+    Returns:
+        tuple: (generation, DataFrame)
+    """
+    # Read the generation first: if data changes mid-read, the next
+    # check sees a newer generation and reads again
+    generation = get_table_generation(table)
+    tables = st.session_state.setdefault("live_tables", {})
+    cached = tables.get(table)
+    if cached is not None and cached[0] == generation:
+        return cached
+    tables[table] = (generation, read_table(table, generation))
+    return tables[table]
+
+
+def auto_refresh(tables):
+    """
+    Add the auto-refresh controls to the sidebar and start polling.
+
+    Call after load_table() for every table in `tables`.
+
+    Args:
+        tables: Tables the page shows; a change to any of them reruns the page
+    """
+    with st.sidebar:
+        st.subheader("Live updates")
+        enabled = st.toggle("Auto-refresh", key="live_refresh_enabled")
+        interval = st.selectbox(
+            "Check for changes every (seconds)",
+            INTERVAL_OPTIONS,
+            index=INTERVAL_OPTIONS.index(DEFAULT_INTERVAL),
+            key="live_refresh_interval",
+            disabled=not enabled,
+        )
+        if not enabled:
+            return
+
+        @st.fragment(run_every=interval)
+        def poll():
+            current = get_table_generations()
+            loaded = st.session_state.get("live_tables", {})
+            changed = [t for t in tables if t in loaded and current.get(t, 0) != loaded[t][0]]
+            if changed:
+                st.rerun()
+            st.caption(f"No changes as of {time.strftime('%H:%M:%S')}")
+
+        poll()
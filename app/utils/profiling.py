@@ -0,0 +1,222 @@
+"""
+Render profiling for the Streamlit pages.
+
+A page starts a PageProfile right after its auth check and marks where its
+sections begin (data load, transform, charts, table, ...). Each section is
+timed with its wall time and the SQL time spent in it (from query_stats),
+so a slow rerun can be attributed to the database, pandas or plotly.
+Admins can additionally capture a cProfile of whole reruns.
+
+Finished runs are kept per session (the last MAX_SESSION_PROFILES), appended
+to PROFILE_LOG as JSON lines for offline analysis, and shown to admins in a
+collapsed "Page profile" panel at the bottom of the page.
+
+Note that SQL time is process-wide: statements run by other sessions during
+a section are counted too.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import streamlit as st
+
+from app.data import metrics, query_stats
+from app.utils.auth import get_current_user
+
+# Set to False to turn page profiling off (pages keep working unchanged)
+PROFILE_PAGES = True
+PROFILE_LOG = "DATA/page_profiles.jsonl"
+MAX_SESSION_PROFILES = 50
+CPROFILE_TOP = 25  # functions shown/stored from a cProfile capture
+
+_CPROFILE_KEY = "profiling_cprofile"
+
+PAGE_RENDERS = metrics.counter("platform_page_renders_total", "Completed page runs", ["page"])
+PAGE_RENDER_SECONDS = metrics.histogram(
+    "platform_page_render_seconds", "Wall time of page runs", ["page"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+
+class PageProfile:
+    """Section timings of one page run."""
+
+    def __init__(self, page, cprofile=False):
+        self.page = page
+        self.sections = []
+        self._current = None
+        self._profiler = None
+        self._start = time.perf_counter()
+        self._start_sql = query_stats.get_total_ms()
+        if cprofile:
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:  # another profiler is already active in this thread
+                self._profiler = None
+
+    def _close(self):
+        if self._current is None:
+            return
+        name, start, start_sql = self._current
+        self._current = None
+        self.sections.append({
+            "name": name,
+            "ms": (time.perf_counter() - start) * 1000,
+            "sql_ms": max(query_stats.get_total_ms() - start_sql, 0.0),
+        })
+
+    def section(self, name):
+        """End the current section (if any) and start timing `name`."""
+        self._close()
+        self._current = (name, time.perf_counter(), query_stats.get_total_ms())
+
+    @contextmanager
+    def span(self, name):
+        """Time a block as its own section."""
+        self.section(name)
+        try:
+            yield
+        finally:
+            self._close()
+
+    def _cprofile_stats(self):
+        if self._profiler is None:
+            return None
+        self._profiler.disable()
+        out = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=out)
+        stats.sort_stats("cumulative").print_stats(CPROFILE_TOP)
+        top = []
+        for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            top.append({
+                "function": f"{os.path.basename(filename)}:{line} {function}",
+                "calls": calls,
+                "tottime_ms": tottime * 1000,
+                "cumtime_ms": cumtime * 1000,
+            })
+        top.sort(key=lambda row: row["cumtime_ms"], reverse=True)
+        return {"text": out.getvalue(), "top": top[:CPROFILE_TOP]}
+
+    def finish(self):
+        """
+        Stop timing, record the run and show the panel to admins.
+
+        Returns:
+            dict: The recorded run
+        """
+        self._close()
+        total_ms = (time.perf_counter() - self._start) * 1000
+        timed_ms = sum(s["ms"] for s in self.sections)
+        if total_ms - timed_ms > 0.01:
+            # Everything outside a section: widgets, layout, the page preamble
+            self.sections.append({"name": "(other)", "ms": total_ms - timed_ms, "sql_ms": 0.0})
+        user = get_current_user()
+        run = {
+            "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "page": self.page,
+            "user": user["username"] if user else None,
+            "total_ms": total_ms,
+            "sql_ms": max(query_stats.get_total_ms() - self._start_sql, 0.0),
+            "sections": self.sections,
+        }
+        cprofile = self._cprofile_stats()
+        PAGE_RENDERS.inc(page=self.page)
+        PAGE_RENDER_SECONDS.observe(total_ms / 1000, page=self.page)
+
+        history = st.session_state.setdefault("page_profiles", deque(maxlen=MAX_SESSION_PROFILES))
+        history.append(run)
+        _write_log(dict(run, cprofile=cprofile["top"]) if cprofile else run)
+
+        if user and user.get("is_admin", False):
+            _render_panel(run, cprofile, [r for r in history if r["page"] == self.page])
+        return run
+
+
+class _NoProfile:
+    """Stand-in used when PROFILE_PAGES is off."""
+
+    def section(self, name):
+        pass
+
+    @contextmanager
+    def span(self, name):
+        yield
+
+    def finish(self):
+        return None
+
+
+def start_page_profile(page):
+    """
+    Start profiling this run of a page.
+
+    Call once, near the top of the page, then mark sections with
+    profile.section(name) (or `with profile.span(name):`) and call
+    profile.finish() at the very end.
+
+    Args:
+        page: Page name used in the panel and the log, e.g. "cyber_incidents"
+
+    Returns:
+        PageProfile
+    """
+    if not PROFILE_PAGES:
+        return _NoProfile()
+    return PageProfile(page, cprofile=st.session_state.get(_CPROFILE_KEY, False))
+
+
+def _write_log(run):
+    if not PROFILE_LOG:
+        return
+    try:
+        os.makedirs(os.path.dirname(PROFILE_LOG) or ".", exist_ok=True)
+        with open(PROFILE_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run) + "\n")
+    except OSError:
+        pass
+
+
+def _render_panel(run, cprofile, history):
+    import pandas as pd
+
+    with st.expander(f"⏱️ Page profile: {run['total_ms']:.0f} ms ({run['sql_ms']:.0f} ms SQL)", expanded=False):
+        st.checkbox(
+            "Capture cProfile on the next runs of every page (slows pages down)",
+            key=_CPROFILE_KEY,
+        )
+
+        st.markdown("**This run**")
+        st.dataframe(pd.DataFrame([
+            {
+                "section": s["name"],
+                "ms": round(s["ms"], 1),
+                "sql ms": round(s["sql_ms"], 1),
+                "python ms": round(max(s["ms"] - s["sql_ms"], 0.0), 1),
+                "share": f"{s['ms'] / run['total_ms']:.0%}" if run["total_ms"] else "",
+            }
+            for s in run["sections"]
+        ]), use_container_width=True, hide_index=True)
+
+        if len(history) > 1:
+            st.markdown(f"**Last {len(history)} runs of this page in this session**")
+            rows = [{"section": s["name"], "ms": s["ms"], "sql_ms": s["sql_ms"]}
+                    for r in history for s in r["sections"]]
+            summary = pd.DataFrame(rows).groupby("section", sort=False).agg(
+                runs=("ms", "size"),
+                mean_ms=("ms", "mean"),
+                max_ms=("ms", "max"),
+                mean_sql_ms=("sql_ms", "mean"),
+            ).round(1).reset_index()
+            st.dataframe(summary, use_container_width=True, hide_index=True)
+
+        if cprofile:
+            st.markdown(f"**cProfile (top {CPROFILE_TOP} by cumulative time)**")
+            st.code(cprofile["text"])
+
+        st.caption(f"Runs are also appended to {PROFILE_LOG}.")
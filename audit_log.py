@@ -0,0 +1,252 @@
+import atexit
+import glob
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+
+# -----------------------------------
+# SETTINGS
+# -----------------------------------
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+SEGMENT_TIME_FORMAT = "%Y%m%d%H%M%S"
+
+DEFAULT_FLUSH_INTERVAL = 1.0          # seconds between background flushes
+DEFAULT_BUFFER_SIZE = 100             # events that trigger an early flush
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024   # rotate when the active file is this big
+DEFAULT_MAX_AGE = 24 * 60 * 60        # ...or this old (seconds)
+
+
+# -----------------------------------
+# AUDIT LOGGER
+# -----------------------------------
+class AuditLogger:
+    """
+    Buffered JSON-lines audit log.
+
+    Events are queued in memory and written by a background thread, either
+    every flush_interval seconds or as soon as buffer_size events are waiting,
+    so a burst of events costs one write instead of one open/close each.
+    The active file is rotated by size or age into a gzip segment named
+    after the first and last event time it contains.
+    """
+
+    def __init__(self, path, flush_interval=DEFAULT_FLUSH_INTERVAL, buffer_size=DEFAULT_BUFFER_SIZE,
+                 max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE, compress=True):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compress = compress
+
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._file = None
+        self._first_ts = None
+        self._last_ts = None
+        self._opened_at = None
+
+        self._thread = threading.Thread(target=self._run, name="audit-log-flush", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, event, message, user=None, **fields):
+        """Queue one audit event. Never blocks on disk I/O."""
+        record = {
+            "ts": datetime.now().strftime(TIMESTAMP_FORMAT),
+            "event": event,
+            "user": user,
+            "message": message,
+        }
+        record.update(fields)
+        with self._lock:
+            if self._closed:
+                self._write([record])
+                return
+            self._buffer.append(record)
+            if len(self._buffer) >= self.buffer_size:
+                self._wake.set()
+
+    def flush(self):
+        """Write all queued events to disk now."""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            self._write(batch)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        with self._write_lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    # -- internals ---------------------------------------------------------
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Warning: Could not write to audit log: {e}")
+
+    def _open(self):
+        if self._file:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # Age is measured from the first event already in the file, if any
+        self._first_ts, self._last_ts = _file_time_range(self.path)
+        if self._first_ts is not None:
+            self._opened_at = datetime.strptime(self._first_ts, TIMESTAMP_FORMAT).timestamp()
+        else:
+            self._opened_at = time.time()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _write(self, batch):
+        with self._write_lock:
+            self._open()
+            self._file.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in batch))
+            self._file.flush()
+            if self._first_ts is None:
+                self._first_ts = batch[0]["ts"]
+            self._last_ts = batch[-1]["ts"]
+            if self._should_rotate():
+                self._rotate()
+
+    def _should_rotate(self):
+        if self._file.tell() >= self.max_bytes:
+            return True
+        return self.max_age is not None and time.time() - self._opened_at >= self.max_age
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        if self._first_ts is None:
+            return
+
+        base, ext = os.path.splitext(self.path)
+        start = _segment_time(self._first_ts)
+        end = _segment_time(self._last_ts)
+        target = f"{base}.{start}_{end}{ext}"
+        suffix = 1
+        while os.path.exists(target) or os.path.exists(target + ".gz"):
+            target = f"{base}.{start}_{end}-{suffix}{ext}"
+            suffix += 1
+
+        os.replace(self.path, target)
+        if self.compress:
+            with open(target, "rb") as src, gzip.open(target + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(target)
+        self._first_ts = self._last_ts = None
+
+
+# -----------------------------------
+# QUERY HELPERS
+# -----------------------------------
+def _segment_time(ts):
+    return datetime.strptime(ts, TIMESTAMP_FORMAT).strftime(SEGMENT_TIME_FORMAT)
+
+
+def _from_segment_time(value):
+    return datetime.strptime(value, SEGMENT_TIME_FORMAT).strftime(TIMESTAMP_FORMAT)
+
+
+def _file_time_range(path):
+    """First and last event time of an uncompressed log file (reads only its ends)."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None, None
+    with open(path, "rb") as f:
+        first = f.readline()
+        f.seek(max(0, os.path.getsize(path) - 4096))
+        tail = f.read().splitlines()
+    try:
+        return json.loads(first)["ts"], json.loads(tail[-1])["ts"]
+    except (ValueError, KeyError, IndexError):
+        return None, None
+
+
+def list_segments(path):
+    """
+    All files belonging to a log, oldest first, as (path, first_ts, last_ts).
+    Rotated segment times come from the file name, so no segment is opened.
+    """
+    base, ext = os.path.splitext(path)
+    segments = []
+    for seg in glob.glob(f"{glob.escape(base)}.*_*{ext}*"):
+        name = os.path.basename(seg)[len(os.path.basename(base)) + 1:]
+        span = name.split(ext)[0]
+        start, _, end = span.partition("_")
+        end = end.split("-")[0]
+        try:
+            segments.append((seg, _from_segment_time(start), _from_segment_time(end)))
+        except ValueError:
+            continue
+    segments.sort(key=lambda s: (s[1], s[0]))
+
+    first, last = _file_time_range(path)
+    if first is not None:
+        segments.append((path, first, last))
+    return segments
+
+
+def query_events(path, user=None, event=None, since=None, until=None):
+    """
+    Yield audit events matching the filters, oldest first.
+
+    Args:
+        path: Active log file path (rotated segments are found next to it)
+        user: Only events for this username
+        event: Only this event type (or a collection of types)
+        since: datetime or "YYYY-MM-DDTHH:MM:SS" lower bound (inclusive)
+        until: datetime or "YYYY-MM-DDTHH:MM:SS" upper bound (inclusive)
+
+    Segments whose time range falls outside since/until are skipped without
+    being opened, and reading stops at the first event after until.
+    """
+    if isinstance(since, datetime):
+        since = since.strftime(TIMESTAMP_FORMAT)
+    if isinstance(until, datetime):
+        until = until.strftime(TIMESTAMP_FORMAT)
+    if isinstance(event, str):
+        event = {event}
+
+    for seg_path, first_ts, last_ts in list_segments(path):
+        if since and last_ts < since:
+            continue
+        if until and first_ts > until:
+            break
+
+        opener = gzip.open if seg_path.endswith(".gz") else open
+        with opener(seg_path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                ts = record.get("ts", "")
+                if since and ts < since:
+                    continue
+                if until and ts > until:
+                    return
+                if user is not None and record.get("user") != user:
+                    continue
+                if event is not None and record.get("event") not in event:
+                    continue
+                yield record
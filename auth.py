@@ -3,10 +3,12 @@ import os
 import re
 import time
 import sys
-from datetime import datetime
 import random
 import string
 import csv
+from contextlib import contextmanager
+
+from audit_log import AuditLogger, query_events
 
 # Cross-platform password input support
 try:
@@ -20,8 +22,20 @@ except ImportError:
     except ImportError:
         WINDOWS = None
 
+# Advisory file locking (POSIX); Windows uses msvcrt.locking
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 USER_DATA_FILE = "users.txt"
-LOG_FILE = "logs.txt"
+USER_JOURNAL_FILE = "users.journal"
+USER_LOCK_FILE = "users.lock"
+LOG_FILE = "logs.jsonl"
+
+JOURNAL_END_MARKER = "END"
+# Journal entries allowed before the user file is rewritten in full
+JOURNAL_COMPACT_THRESHOLD = 200
 
 # -----------------------------------
 # COLORS
@@ -35,14 +49,25 @@ BLINK = "\033[5m"
 # -----------------------------------
 # LOGGING
 # -----------------------------------
-def write_log(message):
+_audit_logger = None
+
+def get_audit_logger():
+    global _audit_logger
+    if _audit_logger is None:
+        _audit_logger = AuditLogger(LOG_FILE)
+    return _audit_logger
+
+def write_log(message, event="info", user=None, **fields):
     try:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(f"[{timestamp}] {message}\n")
+        get_audit_logger().log(event, message, user=user, **fields)
     except Exception as e:
         print(f"{RED}Warning: Could not write to log file: {e}{RESET}")
 
+def read_log(user=None, event=None, since=None, until=None):
+    """Events from the audit log (including rotated files) matching the filters."""
+    get_audit_logger().flush()
+    return list(query_events(LOG_FILE, user=user, event=event, since=since, until=until))
+
 # -----------------------------------
 # LOADING BAR
 # -----------------------------------
@@ -160,59 +185,168 @@ def generate_recovery_code():
         parts.append(part)
     return "-".join(parts)
 
+# -----------------------------------
+# FILE LOCKING / ATOMIC WRITES
+# -----------------------------------
+@contextmanager
+def users_file_lock():
+    """Hold an exclusive advisory lock so concurrent sessions don't interleave writes."""
+    with open(USER_LOCK_FILE, "a+") as lock_file:
+        fd = lock_file.fileno()
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        elif WINDOWS is True:
+            lock_file.seek(0)
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            elif WINDOWS is True:
+                lock_file.seek(0)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+def atomic_write_rows(path, rows):
+    """Write CSV rows to a temp file, fsync it and rename it over the target."""
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerows(rows)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    # Persist the rename itself (not supported on Windows)
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
 # -----------------------------------
 # LOAD / SAVE USERS
 # -----------------------------------
-def load_users():
-    users = []
-    if not os.path.exists(USER_DATA_FILE):
-        return users
-    try:
+# Records as last read from / written to disk, used to work out
+# which users changed so save_users() only journals those.
+_saved_records = {}
+
+def user_to_row(u):
+    return [
+        u.get("username", ""),
+        u.get("password_hash", ""),
+        u.get("failed_attempts", 0),
+        u.get("is_locked", "0"),
+        u.get("role", "user"),
+        u.get("email", ""),
+        u.get("recovery_code", ""),
+    ]
+
+def row_to_user(row):
+    failed_attempts = int(row[2]) if len(row) > 2 and str(row[2]).isdigit() else 0
+    is_locked = row[3] if len(row) > 3 and row[3] in ("0", "1") else "0"
+    return {
+        "username": row[0],
+        "password_hash": row[1],
+        "failed_attempts": failed_attempts,
+        "is_locked": is_locked,
+        "role": row[4] if len(row) > 4 else "user",
+        "email": (row[5] if len(row) > 5 else "").lower(),
+        "recovery_code": row[6] if len(row) > 6 else "",
+    }
+
+def read_user_records():
+    """Read the base user file and replay the journal on top of it."""
+    records = {}
+    if os.path.exists(USER_DATA_FILE):
         with open(USER_DATA_FILE, "r", encoding="utf-8") as f:
-            reader = csv.reader(f)
-            for row in reader:
+            for row in csv.reader(f):
                 if len(row) < 2:
                     continue
+                records[row[0]] = row_to_user(row)
+
+    if os.path.exists(USER_JOURNAL_FILE):
+        with open(USER_JOURNAL_FILE, "r", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                # "U" upserts a full record, "D" deletes one. A line torn by a
+                # crash is missing its end marker and is ignored.
+                if not row or row[-1] != JOURNAL_END_MARKER:
+                    continue
+                if row[0] == "U" and len(row) == 9:
+                    records[row[1]] = row_to_user(row[1:-1])
+                elif row[0] == "D" and len(row) == 3:
+                    records.pop(row[1], None)
+    return records
+
+def journal_length():
+    if not os.path.exists(USER_JOURNAL_FILE):
+        return 0
+    with open(USER_JOURNAL_FILE, "r", encoding="utf-8") as f:
+        return sum(1 for _ in f)
+
+def journal_is_torn():
+    if not os.path.exists(USER_JOURNAL_FILE) or os.path.getsize(USER_JOURNAL_FILE) == 0:
+        return False
+    with open(USER_JOURNAL_FILE, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
 
-                username = row[0]
-                password_hash = row[1]
-                failed_attempts = int(row[2]) if len(row) > 2 and row[2].isdigit() else 0
-                is_locked = row[3] if len(row) > 3 and row[3] in ("0", "1") else "0"
-                role = row[4] if len(row) > 4 else "user"
-                email = row[5] if len(row) > 5 else ""
-                recovery_code = row[6] if len(row) > 6 else ""
-
-                users.append({
-                    "username": username,
-                    "password_hash": password_hash,
-                    "failed_attempts": failed_attempts,
-                    "is_locked": is_locked,
-                    "role": role,
-                    "email": email.lower(),
-                    "recovery_code": recovery_code,
-                })
+def compact_users(records):
+    """Rewrite the full user file atomically and clear the journal."""
+    atomic_write_rows(USER_DATA_FILE, [user_to_row(u) for u in records.values()])
+    if os.path.exists(USER_JOURNAL_FILE):
+        os.remove(USER_JOURNAL_FILE)
+
+def load_users():
+    global _saved_records
+    users = []
+    try:
+        with users_file_lock():
+            records = read_user_records()
+        _saved_records = {name: tuple(user_to_row(u)) for name, u in records.items()}
+        users = list(records.values())
     except Exception as e:
         print(f"{RED}Error loading users: {e}{RESET}")
-        write_log(f"Error loading users: {e}")
+        write_log(f"Error loading users: {e}", event="error")
     return users
 
 def save_users(users):
+    """
+    Persist only the records that changed since the last load/save as journal
+    entries, compacting into users.txt once the journal grows large.
+    Records changed by other sessions in the meantime are kept.
+    """
+    global _saved_records
     try:
-        with open(USER_DATA_FILE, "w", encoding="utf-8", newline="") as f:
-            writer = csv.writer(f)
-            for u in users:
-                writer.writerow([
-                    u.get("username", ""),
-                    u.get("password_hash", ""),
-                    u.get("failed_attempts", 0),
-                    u.get("is_locked", "0"),
-                    u.get("role", "user"),
-                    u.get("email", ""),
-                    u.get("recovery_code", ""),
-                ])
+        current = {u.get("username", ""): tuple(user_to_row(u)) for u in users}
+        entries = [
+            ["U", *row, JOURNAL_END_MARKER]
+            for name, row in current.items()
+            if _saved_records.get(name) != row
+        ]
+        entries += [["D", name, JOURNAL_END_MARKER] for name in _saved_records if name not in current]
+
+        if not entries:
+            return
+
+        with users_file_lock():
+            torn = journal_is_torn()
+            with open(USER_JOURNAL_FILE, "a", encoding="utf-8", newline="") as f:
+                # Start on a fresh line if a previous write was cut short
+                if torn:
+                    f.write("\r\n")
+                csv.writer(f).writerows(entries)
+                f.flush()
+                os.fsync(f.fileno())
+
+            if journal_length() >= JOURNAL_COMPACT_THRESHOLD:
+                compact_users(read_user_records())
+
+        _saved_records = current
     except Exception as e:
         print(f"{RED}Error saving users: {e}{RESET}")
-        write_log(f"Error saving users: {e}")
+        write_log(f"Error saving users: {e}", event="error")
 
 def find_user(users, username):
     for u in users:
@@ -266,7 +400,7 @@ def register_user(username, password, email):
     users.append(user)
     save_users(users)
 
-    write_log(f"User '{username}' registered (role={role})")
+    write_log(f"User '{username}' registered (role={role})", event="register", user=username)
     print(f"{GREEN}Success: User '{username}' registered!{RESET}")
     print(f"{YELLOW}Your recovery code (please make a note): {recovery_code}{RESET}")
     return True
@@ -291,6 +425,7 @@ def login_user_once(username, password):
         return True, "ok"
 
     user["failed_attempts"] += 1
+    write_log(f"Failed login for '{username}' (attempt {user['failed_attempts']})", event="login_failed", user=username)
     if user["failed_attempts"] >= 3:
         user["is_locked"] = "1"
         save_users(users)
@@ -316,7 +451,7 @@ def delete_user_self(username):
         return False
 
     loading_bar("[DELETING ACCOUNT]")
-    write_log(f"User '{username}' deleted themselves")
+    write_log(f"User '{username}' deleted themselves", event="account_deleted", user=username)
 
     users = [u for u in users if u["username"] != username]
     save_users(users)
@@ -369,7 +504,7 @@ def change_password(username):
     save_users(users)
 
     print(f"{GREEN}Password updated successfully.{RESET}")
-    write_log(f"User '{username}' changed password")
+    write_log(f"User '{username}' changed password", event="password_change", user=username)
     return True
 
 # -----------------------------------
@@ -384,7 +519,7 @@ def forgot_username_flow():
     for u in users:
         if u["email"].lower() == email.lower() and u["recovery_code"].upper() == recovery:
             print(f"{GREEN}Your username is: {u['username']}{RESET}")
-            write_log(f"Username recovery for email '{email}'")
+            write_log(f"Username recovery for email '{email}'", event="username_recovery", user=u["username"])
             return
 
     print(f"{RED}No match found.{RESET}")
@@ -447,7 +582,7 @@ def forgot_password_flow(username_from_login=None):
     user["is_locked"] = "0"
     save_users(users)
 
-    write_log(f"User '{username}' reset password via recovery")
+    write_log(f"User '{username}' reset password via recovery", event="password_reset", user=username)
     print(f"{GREEN}Password reset successfully.{RESET}")
 
 # -----------------------------------
@@ -478,7 +613,7 @@ def admin_unlock_user():
     user["is_locked"] = "0"
     save_users(users)
 
-    write_log(f"Admin unlocked '{target}'")
+    write_log(f"Admin unlocked '{target}'", event="unlock", user=target)
     print(f"{GREEN}User unlocked.{RESET}")
 
 def admin_reset_password(admin_username):
@@ -525,7 +660,7 @@ def admin_reset_password(admin_username):
     user["is_locked"] = "0"
     save_users(users)
 
-    write_log(f"Admin reset password for '{target}'")
+    write_log(f"Admin reset password for '{target}'", event="password_reset", user=target, admin=admin_username)
     print(f"{GREEN}Password reset successful.{RESET}")
 
 def admin_delete_user(admin_username):
@@ -551,9 +686,23 @@ def admin_delete_user(admin_username):
     users = [u for u in users if u["username"] != target]
     save_users(users)
 
-    write_log(f"Admin deleted '{target}'")
+    write_log(f"Admin deleted '{target}'", event="account_deleted", user=target, admin=admin_username)
     print(f"{GREEN}User deleted.{RESET}")
 
+def admin_view_log():
+    print("\n--- AUDIT LOG ---")
+    user = input("Username (blank = all): ").strip() or None
+    event = input("Event type, e.g. login_failed (blank = all): ").strip() or None
+    since = input("Since YYYY-MM-DD (blank = all): ").strip()
+    since = f"{since}T00:00:00" if since else None
+
+    events = read_log(user=user, event=event, since=since)
+    print("---------------------------------------------------------------------")
+    for e in events[-20:]:
+        print(f"{e['ts']:<21}{e['event']:<20}{e['message']}")
+    print("---------------------------------------------------------------------")
+    print(f"{len(events)} matching event(s), showing the last {min(len(events), 20)}.")
+
 # -----------------------------------
 # PANELS
 # -----------------------------------
@@ -575,7 +724,7 @@ def user_panel(username):
         elif choice == "3":
             loading_bar("[LOGGING OUT]")
             print(f"{GREEN}Logout successful.{RESET}")
-            write_log(f"User '{username}' logged out")
+            write_log(f"User '{username}' logged out", event="logout", user=username)
             break
         else:
             print(f"{RED}Invalid option.{RESET}")
@@ -589,9 +738,10 @@ def admin_panel(username):
 3. Reset user password
 4. Delete user account
 5. Change my password
-6. Logout
+6. View audit log
+7. Logout
 """)
-        choice = input("Select (1-6): ").strip()
+        choice = input("Select (1-7): ").strip()
 
         if choice == "1":
             admin_list_users()
@@ -604,9 +754,11 @@ def admin_panel(username):
         elif choice == "5":
             change_password(username)
         elif choice == "6":
+            admin_view_log()
+        elif choice == "7":
             loading_bar("[LOGGING OUT]")
             print(f"{GREEN}Admin logged out.{RESET}")
-            write_log(f"Admin '{username}' logged out")
+            write_log(f"Admin '{username}' logged out", event="logout", user=username)
             break
         else:
             print(f"{RED}Invalid option.{RESET}")
@@ -702,7 +854,7 @@ def main():
                 if ok:
                     loading_bar("[LOGGING IN]")
                     print(f"{GREEN}Welcome {username}!{RESET}")
-                    write_log(f"User '{username}' logged in")
+                    write_log(f"User '{username}' logged in", event="login", user=username)
 
                     if user["role"] == "admin":
                         admin_panel(username)
@@ -732,7 +884,7 @@ def main():
 
                 if status == "locked":
                     print(f"{RED}Your account is LOCKED.{RESET}")
-                    write_log(f"User '{username}' locked themselves out")
+                    write_log(f"User '{username}' locked themselves out", event="lockout", user=username)
                     break
 
         # EXIT
@@ -754,4 +906,4 @@ if __name__ == "__main__":
         print(f"\n{RED}Interrupted by user.{RESET}")
     except Exception as e:
         print(f"\n{RED}Unexpected error: {e}{RESET}")
-        write_log(f"Unexpected error: {e}")
\ No newline at end of file
+        write_log(f"Unexpected error: {e}", event="error")
\ No newline at end of file
@@ -0,0 +1,326 @@
+"""
+Load test for the JSON API (app/api/server.py).
+
+Starts the API server in a subprocess on a synthetic database (or targets a
+running one with --url), then drives it with concurrent clients, each
+holding one keep-alive HTTP connection. Operations are picked from a
+weighted mix of paginated lists (first pages with filters, deep keyset
+pages), reads by id, creates and updates. The report gives requests/sec and
+p50/p95/p99 latency per operation, plus errors by status.
+
+Usage (from the repository root):
+    python -m benchmarks.api_load_test --generate small --clients 16 --duration 20
+    python -m benchmarks.api_load_test --workers 4 --mix get=5,list=2
+    python -m benchmarks.api_load_test --url http://127.0.0.1:8600 --user admin:Secret!123
+"""
+import argparse
+import base64
+import http.client
+import json
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from collections import defaultdict
+
+from benchmarks.load_test import percentile
+
+DEFAULT_MIX = {
+    "list": 20,
+    "list_deep": 10,
+    "get": 50,
+    "create": 10,
+    "update": 10,
+}
+
+
+class Client:
+    """One keep-alive connection to the API."""
+
+    def __init__(self, url, credentials):
+        parts = urllib.parse.urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        token = base64.b64encode(f"{credentials[0]}:{credentials[1]}".encode()).decode()
+        self.headers = {"Authorization": f"Basic {token}", "Content-Type": "application/json"}
+        self.conn = None
+
+    def request(self, method, path, body=None):
+        if self.conn is None:
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        try:
+            self.conn.request(method, path, body=json.dumps(body) if body is not None else None,
+                              headers=self.headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = None
+            raise
+        if response.status >= 400:
+            raise RuntimeError(f"HTTP {response.status}")
+        return json.loads(data) if data else None
+
+
+class Context:
+    """What clients need to know about the data behind the API."""
+
+    def __init__(self, max_incident, max_ticket):
+        self.max_incident = max(max_incident, 1)
+        self.max_ticket = max(max_ticket, 1)
+        self._next_id = max(max_incident, max_ticket) + 1_000_000
+        self._lock = threading.Lock()
+
+    def new_id(self):
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+
+def op_list(rng, client, ctx):
+    if rng.random() < 0.5:
+        status = rng.choice(["Open", "In Progress", "Resolved", "Closed"])
+        client.request("GET", f"/api/incidents?status={urllib.parse.quote(status)}&limit=50")
+    else:
+        priority = rng.choice(["Low", "Medium", "High", "Critical"])
+        client.request("GET", f"/api/tickets?priority={priority}&sort=-created&limit=50")
+
+
+def op_list_deep(rng, client, ctx):
+    # Keyset pages from a random point of the table
+    if rng.random() < 0.5:
+        client.request("GET", f"/api/incidents?after={rng.randint(1, ctx.max_incident)}&limit=100")
+    else:
+        client.request("GET", f"/api/tickets?after={rng.randint(1, ctx.max_ticket)}&limit=100")
+
+
+def op_get(rng, client, ctx):
+    try:
+        if rng.random() < 0.5:
+            client.request("GET", f"/api/incidents/{rng.randint(1, ctx.max_incident)}")
+        else:
+            client.request("GET", f"/api/tickets/{rng.randint(1, ctx.max_ticket)}")
+    except RuntimeError as e:
+        if str(e) != "HTTP 404":  # ids may have gaps
+            raise
+
+
+def op_create(rng, client, ctx):
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    if rng.random() < 0.5:
+        client.request("POST", "/api/incidents", {
+            "incident_id": ctx.new_id(), "timestamp": now, "severity": rng.choice(["Low", "High"]),
+            "category": "Phishing", "status": "Open", "description": "api load test",
+        })
+    else:
+        client.request("POST", "/api/tickets", {
+            "ticket_id": ctx.new_id(), "created": now, "priority": rng.choice(["Low", "High"]),
+            "issue_type": "Software Issue", "assigned_to": "IT_Support_01", "status": "Open",
+            "description": "api load test",
+        })
+
+
+def op_update(rng, client, ctx):
+    status = rng.choice(["In Progress", "Resolved", "Closed"])
+    try:
+        if rng.random() < 0.5:
+            client.request("PUT", f"/api/incidents/{rng.randint(1, ctx.max_incident)}", {"status": status})
+        else:
+            client.request("PUT", f"/api/tickets/{rng.randint(1, ctx.max_ticket)}", {"status": status})
+    except RuntimeError as e:
+        if str(e) != "HTTP 404":
+            raise
+
+
+OPERATIONS = {
+    "list": op_list,
+    "list_deep": op_list_deep,
+    "get": op_get,
+    "create": op_create,
+    "update": op_update,
+}
+
+
+def simulated_client(index, url, credentials, ctx, mix, deadline, seed, results, lock):
+    rng = random.Random(seed + index)
+    client = Client(url, credentials)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies = defaultdict(list)
+    errors = defaultdict(lambda: defaultdict(int))
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights=weights)[0]
+        start = time.perf_counter()
+        try:
+            OPERATIONS[name](rng, client, ctx)
+            latencies[name].append((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            errors[name][f"{type(e).__name__}: {str(e)[:60]}"] += 1
+    with lock:
+        for name, values in latencies.items():
+            results["latencies"][name].extend(values)
+        for name, counts in errors.items():
+            for message, count in counts.items():
+                results["errors"][name][message] += count
+
+
+def run(url, credentials, ctx, clients, duration, mix, seed=0):
+    """
+    Drive the API with concurrent clients.
+
+    Returns:
+        dict: Overall and per-operation counts, requests/sec and percentiles
+    """
+    results = {"latencies": defaultdict(list), "errors": defaultdict(lambda: defaultdict(int))}
+    lock = threading.Lock()
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=simulated_client,
+                         args=(i, url, credentials, ctx, mix, start + duration, seed, results, lock))
+        for i in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    operations = {}
+    for name in mix:
+        values = sorted(results["latencies"].get(name, []))
+        errors = dict(results["errors"].get(name, {}))
+        operations[name] = {
+            "ok": len(values),
+            "errors": sum(errors.values()),
+            "error_types": errors,
+            "per_second": len(values) / elapsed,
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+            "max_ms": values[-1] if values else 0.0,
+        }
+    total_ok = sum(op["ok"] for op in operations.values())
+    return {
+        "users": clients,
+        "seconds": elapsed,
+        "requests": total_ok + sum(op["errors"] for op in operations.values()),
+        "per_second": total_ok / elapsed,
+        "operations": operations,
+    }
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(url, process, timeout=30):
+    parts = urllib.parse.urlsplit(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API server exited with status {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=1)
+            conn.request("GET", "/api/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("API server did not start")
+
+
+def _local_context(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        max_incident = conn.execute("SELECT COALESCE(MAX(incident_id), 0) FROM cyber_incidents;").fetchone()[0]
+        max_ticket = conn.execute("SELECT COALESCE(MAX(ticket_id), 0) FROM it_tickets;").fetchone()[0]
+        admin = conn.execute(
+            "SELECT id, username FROM users WHERE is_admin = 1 AND disabled = 0 AND username LIKE 'user%' LIMIT 1;"
+        ).fetchone()
+    finally:
+        conn.close()
+    return Context(max_incident, max_ticket), admin
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r} (choose from {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main(argv=None):
+    from benchmarks.load_test import print_report
+    from benchmarks.synthetic_data import PRESETS
+
+    parser = argparse.ArgumentParser(description="Load test the JSON API.")
+    parser.add_argument("--url", help="running API to test (default: start one on a synthetic database)")
+    parser.add_argument("--user", help="username:password for --url (an admin, for the write operations)")
+    parser.add_argument("--generate", choices=sorted(PRESETS), default="small", help="synthetic preset")
+    parser.add_argument("--workers", type=int, default=8, help="database threads of the started server")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=20, help="seconds to run")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. get=5,list=2,create=1")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args(argv)
+    log = (lambda *a: None) if args.json else print
+
+    if args.url:
+        if not args.user:
+            parser.error("--url needs --user")
+        credentials = tuple(args.user.split(":", 1))
+        client = Client(args.url, credentials)
+        first_incident = client.request("GET", "/api/incidents?sort=-incident_id&limit=1")["rows"]
+        first_ticket = client.request("GET", "/api/tickets?sort=-ticket_id&limit=1")["rows"]
+        ctx = Context(first_incident[0]["incident_id"] if first_incident else 0,
+                      first_ticket[0]["ticket_id"] if first_ticket else 0)
+        report = run(args.url, credentials, ctx, args.clients, args.duration, args.mix, args.seed)
+    else:
+        from app.data import db, snapshots
+        from benchmarks.synthetic_data import generate
+
+        with tempfile.TemporaryDirectory() as tmp:
+            db.DB_PATH = os.path.join(tmp, "api.db")
+            snapshots.SNAPSHOT_DIR = os.path.join(tmp, "snapshots")
+            log(f"Generating '{args.generate}' data set in {db.DB_PATH} ...")
+            passwords = generate(**PRESETS[args.generate])["passwords"]
+            ctx, admin = _local_context(db.DB_PATH)
+            if admin is None:
+                raise SystemExit("The synthetic data set has no enabled admin; use a larger preset")
+            credentials = (admin[1], passwords[admin[0] % len(passwords)])
+
+            port = _free_port()
+            url = f"http://127.0.0.1:{port}"
+            server = subprocess.Popen(
+                [sys.executable, "-m", "app.api.server", "--db", db.DB_PATH, "--port", str(port),
+                 "--workers", str(args.workers)],
+                cwd=tmp, stdout=subprocess.DEVNULL, env={**os.environ, "PYTHONPATH": os.getcwd()},
+            )
+            try:
+                _wait_for(url, server)
+                log(f"API server on {url} ({args.workers} database threads), {args.clients} clients ...")
+                report = run(url, credentials, ctx, args.clients, args.duration, args.mix, args.seed)
+            finally:
+                server.terminate()
+                server.wait(timeout=10)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Dashboard data load: sequential vs concurrent aggregations.
+
+Times the four chart aggregations of the incidents and tickets pages (counts
+by level, by status, top categories, level x status), run one after another
+(analytics.read_dashboard_summary) and concurrently on the async_api
+database threads, both from an event loop (dashboard_summary) and from
+synchronous code (run_concurrently). Results are checked to be identical.
+
+Usage (from the repository root):
+    python -m benchmarks.async_page_load --generate medium --rounds 5
+    python -m benchmarks.async_page_load --generate production --workers 4 --json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from app.data import analytics, async_api, db, snapshots
+
+TABLES = ("cyber_incidents", "it_tickets")
+
+
+def _timed(fn, rounds):
+    fn()  # warm-up: page cache, imports
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": statistics.median(timings), "min_ms": min(timings)}
+
+
+def _same(a, b):
+    return all(a[name].equals(b[name]) for name in a)
+
+
+def _concurrent_calls(table):
+    level_col, category_col = analytics.DASHBOARD_COLUMNS[table]
+    return [
+        (analytics.read_value_counts, (table, level_col)),
+        (analytics.read_value_counts, (table, "status")),
+        (analytics.read_value_counts, (table, category_col), {"top_n": 10}),
+        (analytics.read_crosstab, (table, level_col, "status")),
+    ]
+
+
+def run(rounds=5):
+    """
+    Benchmark every dashboard and both dashboards together.
+
+    Returns:
+        dict: {case: {"sequential": timing, "asyncio": timing, "threads": timing, "speedup": float}}
+    """
+    results = {}
+    for table in TABLES:
+        sequential = analytics.read_dashboard_summary(table)
+        concurrent = asyncio.run(async_api.dashboard_summary(table))
+        if not _same(sequential, concurrent):
+            raise AssertionError(f"{table}: concurrent results differ from sequential ones")
+
+        calls = _concurrent_calls(table)
+        results[table] = {
+            "sequential": _timed(lambda: analytics.read_dashboard_summary(table), rounds),
+            "asyncio": _timed(lambda: asyncio.run(async_api.dashboard_summary(table)), rounds),
+            "threads": _timed(lambda: async_api.run_concurrently(calls), rounds),
+        }
+
+    async def both():
+        return await asyncio.gather(*(async_api.dashboard_summary(t) for t in TABLES))
+
+    all_calls = [call for table in TABLES for call in _concurrent_calls(table)]
+    results["both_pages"] = {
+        "sequential": _timed(lambda: [analytics.read_dashboard_summary(t) for t in TABLES], rounds),
+        "asyncio": _timed(lambda: asyncio.run(both()), rounds),
+        "threads": _timed(lambda: async_api.run_concurrently(all_calls), rounds),
+    }
+    for case in results.values():
+        case["speedup"] = case["sequential"]["median_ms"] / case["asyncio"]["median_ms"]
+    return results
+
+
+def main(argv=None):
+    from benchmarks.synthetic_data import PRESETS, generate
+
+    parser = argparse.ArgumentParser(description="Compare sequential and concurrent dashboard data loads.")
+    parser.add_argument("--db", help="database to use (default: a temporary one, see --generate)")
+    parser.add_argument("--generate", choices=sorted(PRESETS), default="medium", help="synthetic preset")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=async_api.ASYNC_WORKERS, help="database threads")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args(argv)
+
+    async_api.configure(args.workers)
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = args.db or os.path.join(tmp, "async.db")
+        snapshots.SNAPSHOT_DIR = os.path.join(tmp, "snapshots")
+        if not args.db:
+            if not args.json:
+                print(f"Generating '{args.generate}' data set in {db.DB_PATH} ...")
+            generate(**PRESETS[args.generate])
+        results = run(args.rounds)
+    async_api.shutdown()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"\n{'case':<18}{'sequential':>12}{'asyncio':>12}{'threads':>12}{'speedup':>9}")
+    for case, r in results.items():
+        print(f"{case:<18}{r['sequential']['median_ms']:>10.1f}ms{r['asyncio']['median_ms']:>10.1f}ms"
+              f"{r['threads']['median_ms']:>10.1f}ms{r['speedup']:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+"""
+Benchmark suite for the app/data hot paths, with a regression check.
+
+Every case runs against a throwaway database filled by synthetic_data at
+each requested scale: read_all_* and the SQL aggregates, CRUD round trips,
+the CSV migrations, password hashing/verification, authenticate_user and
+the ticket issue-type classifier. Results are written as JSON; --compare
+checks each case's fastest round against a stored baseline and exits with
+status 1 when a case got slower than the allowed threshold. The
+create/update/delete round trips commit per write and are dominated by
+fsync, so they are listed but only fail the check with --all.
+
+BASELINE is the committed small-scale baseline; --compare without a file
+checks against it. Timings depend on the machine, so it is regenerated
+(--save-baseline) on the reference machine whenever a change makes the
+data layer intentionally faster or slower, and committed with that change.
+
+Usage (from the repository root):
+    python -m benchmarks.data_suite --compare
+    python -m benchmarks.data_suite --save-baseline
+    python -m benchmarks.data_suite --scales small,medium --save before.json
+    python -m benchmarks.data_suite --scales small,medium --compare before.json
+    python -m benchmarks.data_suite --scales small --only read_all,crud --json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from app.data import db, snapshots
+from benchmarks.synthetic_data import generate
+
+SCALES = {
+    "small": {"users": 100, "incidents": 2000, "tickets": 1000, "datasets": 200},
+    "medium": {"users": 1000, "incidents": 50000, "tickets": 25000, "datasets": 5000},
+    "large": {"users": 5000, "incidents": 500000, "tickets": 250000, "datasets": 50000},
+}
+
+# Regression = fastest round slower than baseline by more than THRESHOLD and
+# by more than the noise floor: NOISE_FLOOR_MS, or SPREAD_FACTOR standard
+# deviations of either run when that is wider (very fast cases jitter by
+# more than 20%, and the min is the timing least affected by other load)
+THRESHOLD = 0.20
+NOISE_FLOOR_MS = 0.5
+SPREAD_FACTOR = 2
+
+# The case list runs this many times over and each case's rounds are pooled,
+# so its min is taken from samples spread over the whole run rather than a
+# few seconds the machine may have spent busy elsewhere
+PASSES = 3
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+CASES = []
+
+
+def case(group, rounds=5, gated=True):
+    """
+    Register a benchmark: fn(env) -> callable to time (or None to skip).
+
+    gated=False keeps a case out of the default --compare verdict; it is
+    still timed and listed. Used for cases that commit once per write and
+    so mostly time the disk's fsync, which varies run to run.
+    """
+    def register(fn):
+        CASES.append((group, fn.__name__, rounds, gated, fn))
+        return fn
+    return register
+
+
+class Env:
+    """A scale's database and the facts cases need about it."""
+
+    def __init__(self, scale, directory, passwords):
+        self.scale = scale
+        self.directory = directory
+        self.passwords = passwords
+        self.rng = random.Random(0)
+        self.counts = SCALES[scale]
+
+
+# --- reads ------------------------------------------------------------------
+
+@case("read_all")
+def read_all_cyber_incidents(env):
+    from app.data.cyber_incidents import read_all_cyber_incidents
+    return read_all_cyber_incidents
+
+
+@case("read_all")
+def read_all_tickets(env):
+    from app.data.it_tickets import read_all_tickets
+    return read_all_tickets
+
+
+@case("read_all")
+def read_all_datasets(env):
+    from app.data.datasets import read_all_datasets
+    return read_all_datasets
+
+
+@case("read_all")
+def read_table_snapshot(env):
+    snapshots.read_table("cyber_incidents")  # make sure the snapshot exists
+    return lambda: snapshots.read_table("cyber_incidents")
+
+
+@case("aggregate")
+def read_level_status_bubbles(env):
+    from app.data.analytics import read_level_status_bubbles
+    return lambda: read_level_status_bubbles("it_tickets", "priority", "status", "issue_type")
+
+
+@case("aggregate")
+def read_category_level_profile(env):
+    from app.data.analytics import read_category_level_profile
+    return lambda: read_category_level_profile("cyber_incidents", "category", "severity")
+
+
+# --- CRUD -------------------------------------------------------------------
+
+@case("crud", rounds=50)
+def get_incident_by_id(env):
+    from app.data.cyber_incidents import get_incident_by_id
+    return lambda: get_incident_by_id(env.rng.randint(1, env.counts["incidents"]))
+
+
+@case("crud", rounds=50)
+def get_ticket_by_id(env):
+    from app.data.it_tickets import get_ticket_by_id
+    return lambda: get_ticket_by_id(env.rng.randint(1, env.counts["tickets"]))
+
+
+@case("crud", rounds=20, gated=False)
+def incident_create_update_delete(env):
+    from app.data.cyber_incidents import create_incident, delete_incident, update_incident
+
+    def run():
+        incident_id = 10 ** 9 + env.rng.randrange(10 ** 6)
+        create_incident(incident_id, "2024-01-01 00:00:00", "Low", "Phishing", "Open", "bench")
+        update_incident(incident_id, "2024-01-01 00:00:00", "High", "Phishing", "Closed", "bench")
+        delete_incident(incident_id)
+    return run
+
+
+@case("crud", rounds=20, gated=False)
+def ticket_create_update_delete(env):
+    from app.data.it_tickets import create_ticket, delete_ticket, update_ticket
+
+    def run():
+        ticket_id = 10 ** 9 + env.rng.randrange(10 ** 6)
+        create_ticket(ticket_id, "2024-01-01 00:00:00", "Low", "Other", "IT_Support_01", "Open", "bench")
+        update_ticket(ticket_id, "2024-01-01 00:00:00", "High", "Other", "IT_Support_01", "Closed", "bench")
+        delete_ticket(ticket_id)
+    return run
+
+
+@case("crud", rounds=50)
+def get_user_by_username(env):
+    from app.data.users import get_user_by_username
+    return lambda: get_user_by_username(f"user{env.rng.randint(1, env.counts['users']):06d}")
+
+
+# --- migrations ---------------------------------------------------------------
+
+def _migration(env, csv_name, read_all, migrate):
+    """Time a CSV migration into a fresh database, from a CSV of this scale's rows."""
+    data_dir = os.path.join(env.directory, "DATA")
+    os.makedirs(data_dir, exist_ok=True)
+    read_all(optimize=False).to_csv(os.path.join(data_dir, csv_name), index=False)
+    source_db = db.DB_PATH
+
+    def run():
+        from app.data.schema import create_tables
+
+        cwd = os.getcwd()
+        db.DB_PATH = os.path.join(env.directory, "migration.db")
+        try:
+            if os.path.exists(db.DB_PATH):
+                os.remove(db.DB_PATH)
+            create_tables()
+            os.chdir(env.directory)  # migrations read DATA/<name>.csv
+            migrate()
+        finally:
+            os.chdir(cwd)
+            db.DB_PATH = source_db
+    return run
+
+
+@case("migration", rounds=3)
+def migrate_cyber_incidents(env):
+    from app.data.cyber_incidents import migrate_cyber_incidents, read_all_cyber_incidents
+    return _migration(env, "cyber_incidents.csv", read_all_cyber_incidents, migrate_cyber_incidents)
+
+
+@case("migration", rounds=3)
+def migrate_tickets(env):
+    from app.data.it_tickets import migrate_tickets, read_all_tickets
+    return _migration(env, "it_tickets.csv", read_all_tickets, migrate_tickets)
+
+
+# --- security -----------------------------------------------------------------
+
+@case("security", rounds=5)
+def hash_password(env):
+    from app.data.security import hash_password
+    return lambda: hash_password("Benchmark!123")
+
+
+@case("security", rounds=5)
+def verify_password(env):
+    from app.data.security import hash_password, verify_password
+    hashed = hash_password("Benchmark!123")
+    return lambda: verify_password("Benchmark!123", hashed)
+
+
+@case("security", rounds=50)
+def validate_password_strength(env):
+    from app.data.security import validate_password_strength
+    return lambda: validate_password_strength("Benchmark!123")
+
+
+@case("security", rounds=5)
+def authenticate_user(env):
+    from app.data.security import authenticate_user
+    if not env.passwords:
+        return None
+    # users are generated with ids 1..n; user i has passwords[i % pool]
+    user_id = env.rng.randint(1, env.counts["users"])
+    username = f"user{user_id:06d}"
+    return lambda: authenticate_user(username, env.passwords[user_id % len(env.passwords)])
+
+
+# --- classifier -----------------------------------------------------------------
+
+@case("classifier")
+def infer_issue_type_10k(env):
+    from app.data.it_tickets import infer_issue_type
+    descriptions = ["cannot login", "printer jammed", "no internet connection", "blue screen error"] * 2500
+    return lambda: [infer_issue_type(d) for d in descriptions]
+
+
+@case("classifier")
+def fill_missing_issue_types(env):
+    import pandas as pd
+    from app.data.it_tickets import _fill_missing_issue_types
+    frame = pd.DataFrame({
+        "issue_type": [None] * env.counts["tickets"],
+        "description": ["email not syncing", "laptop does not power on"] * (env.counts["tickets"] // 2)
+                       + ["x"] * (env.counts["tickets"] % 2),
+    })
+    return lambda: _fill_missing_issue_types(frame.copy())
+
+
+# --- runner -------------------------------------------------------------------
+
+def time_rounds(fn, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings):
+    return {
+        "rounds": len(timings),
+        "min_ms": min(timings),
+        "median_ms": statistics.median(timings),
+        "mean_ms": statistics.fmean(timings),
+        "stdev_ms": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+
+def run(scales, groups=None, log=print, passes=PASSES):
+    """
+    Run the suite.
+
+    Args:
+        scales: Names from SCALES
+        groups: Only run cases from these groups (default: all)
+        log: Callable for progress lines
+        passes: Times to run the case list; rounds are pooled per case
+
+    Returns:
+        dict: {"meta": {...}, "results": {"<scale>/<case>": timing dict}}
+    """
+    results = {}
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            db.DB_PATH = os.path.join(tmp, "bench.db")
+            snapshots.SNAPSHOT_DIR = os.path.join(tmp, "snapshots")
+            log(f"[{scale}] generating data ...")
+            passwords = generate(hash_pool=5, **SCALES[scale])["passwords"]
+            env = Env(scale, tmp, passwords)
+            # Some data functions print debug output; keep the report readable
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                selected = []
+                for group, name, rounds, gated, factory in CASES:
+                    if groups and group not in groups:
+                        continue
+                    fn = factory(env)
+                    if fn is None:
+                        continue
+                    fn()  # warm-up: imports, caches, first-touch of pages
+                    selected.append((group, name, rounds, gated, fn, []))
+                for i in range(passes):
+                    log(f"[{scale}] pass {i + 1}/{passes} ...")
+                    for group, name, rounds, gated, fn, timings in selected:
+                        timings.extend(time_rounds(fn, rounds))
+            for group, name, rounds, gated, fn, timings in selected:
+                timing = summarize(timings)
+                timing["group"] = group
+                timing["gated"] = gated
+                results[f"{scale}/{name}"] = timing
+                log(f"[{scale}] {name:<32} min {timing['min_ms']:10.2f} ms  median {timing['median_ms']:10.2f} ms")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "scales": {scale: SCALES[scale] for scale in scales},
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=THRESHOLD, all_cases=False):
+    """
+    Compare fastest rounds with a baseline run.
+
+    Args:
+        current: Report from run()
+        baseline: Report loaded from a baseline file
+        threshold: Allowed slowdown, 0.2 = 20%
+        all_cases: Also flag cases registered with gated=False
+
+    Returns:
+        list: (case, baseline ms, current ms, ratio, regressed, gated) for
+        every case present in both runs
+    """
+    rows = []
+    for name, timing in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        gated = all_cases or timing.get("gated", True)
+        before, after = base["min_ms"], timing["min_ms"]
+        ratio = after / before if before else float("inf")
+        floor = max(NOISE_FLOOR_MS, SPREAD_FACTOR * max(base["stdev_ms"], timing["stdev_ms"]))
+        regressed = gated and ratio > 1 + threshold and after - before > floor
+        rows.append((name, before, after, ratio, regressed, gated))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the app/data hot paths.")
+    parser.add_argument("--scales", default="small", help=f"comma-separated, from {', '.join(SCALES)}")
+    parser.add_argument("--only", help="comma-separated case groups, e.g. read_all,crud")
+    parser.add_argument("--save", help="write results to this JSON file (e.g. a new baseline)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"write results to the committed baseline ({os.path.relpath(BASELINE)})")
+    parser.add_argument("--compare", nargs="?", const=BASELINE,
+                        help="baseline JSON file to check for regressions (default: the committed baseline)")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed slowdown, 0.2 = 20%%")
+    parser.add_argument("--passes", type=int, default=PASSES, help="times to run the case list")
+    parser.add_argument("--all", action="store_true",
+                        help="with --compare, also fail on the fsync-bound write cases")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f"unknown scale(s): {', '.join(unknown)}")
+    groups = set(args.only.split(",")) if args.only else None
+
+    report = run(scales, groups, log=(lambda *a: None) if args.json else print, passes=args.passes)
+    for path in filter(None, (args.save, BASELINE if args.save_baseline else None)):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold, args.all)
+        regressions = [row for row in rows if row[4]]
+        report["comparison"] = [
+            {"case": n, "baseline_ms": b, "current_ms": c, "ratio": r, "regressed": g, "gated": d}
+            for n, b, c, r, g, d in rows
+        ]
+        if not args.json:
+            print(f"\n{'case':<40}{'baseline':>12}{'current':>12}{'ratio':>8}")
+            for name, before, after, ratio, regressed, gated in rows:
+                flag = "  REGRESSION" if regressed else "" if gated else "  (not gated)"
+                print(f"{name:<40}{before:>10.2f}ms{after:>10.2f}ms{ratio:>8.2f}{flag}")
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Import-time profile of the platform entry points.
+
+Runs each target in a fresh interpreter with `python -X importtime`,
+so nothing is cached between runs, and reports wall-clock startup time,
+the slowest imports and whether any heavy library got pulled in.
+
+Usage (from the repository root):
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --repeat 10 --top 15 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What each entry point imports before it can show anything
+TARGETS = {
+    "main.py": "import main",
+    "auth.py": "import auth",
+    # pages/0_Login.py: streamlit itself plus the modules it needs to render the form
+    "login page": "import app.data.security, app.data.schema, app.utils.auth",
+}
+
+HEAVY_MODULES = ("pandas", "numpy", "plotly", "pyarrow")
+
+
+def profile_import(statement):
+    """
+    Import `statement` in a fresh interpreter with -X importtime.
+
+    Returns:
+        dict: wall_ms, per-module cumulative_us and the heavy modules loaded
+    """
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+
+    # Lines look like "import time:   self_us |   cumulative_us |   name",
+    # where extra indentation of the name means a nested import
+    modules, top_level = {}, {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, name = line.split(":", 1)[1].split("|")
+        depth = len(name) - len(name.lstrip())
+        modules[name.strip()] = int(cumulative_us)
+        if depth == 1:
+            top_level[name.strip()] = int(cumulative_us)
+
+    heavy = sorted({name.split(".")[0] for name in modules if name.split(".")[0] in HEAVY_MODULES})
+    return {"wall_ms": wall_ms, "modules": modules, "top_level": top_level, "heavy": heavy}
+
+
+def run(repeat=5, top=10):
+    # Modules every interpreter loads at startup (site, encodings, ...) are not
+    # the target's fault, so they are left out of the import totals
+    startup = set(profile_import("pass")["top_level"])
+
+    results = {}
+    for label, statement in TARGETS.items():
+        runs = [profile_import(statement) for _ in range(repeat)]
+        last = runs[-1]
+        top_level = {name: us for name, us in last["top_level"].items() if name not in startup}
+        slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:top]
+        results[label] = {
+            "statement": statement,
+            "wall_ms_median": statistics.median(r["wall_ms"] for r in runs),
+            "wall_ms_min": min(r["wall_ms"] for r in runs),
+            "import_ms": sum(top_level.values()) / 1000,
+            "heavy_modules": last["heavy"],
+            "slowest_imports_ms": [(name, us / 1000) for name, us in slowest],
+        }
+    return results
+
+
+def print_report(results):
+    for label, r in results.items():
+        print(f"\n{label}  ({r['statement']})")
+        print(f"  startup wall time: median {r['wall_ms_median']:.1f} ms, min {r['wall_ms_min']:.1f} ms")
+        print(f"  total import time: {r['import_ms']:.1f} ms")
+        print(f"  heavy modules loaded: {', '.join(r['heavy_modules']) or 'none'}")
+        for name, ms in r["slowest_imports_ms"]:
+            print(f"    {ms:9.1f} ms  {name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile import time of the platform entry points.")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per target")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args(argv)
+
+    results = run(repeat=args.repeat, top=args.top)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
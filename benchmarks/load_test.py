@@ -0,0 +1,294 @@
+"""
+Load test: concurrent simulated users calling the app/data functions.
+
+Each simulated user is a thread that repeatedly picks an operation from a
+weighted mix (dashboard reads, lookups by id, aggregates, creates, updates,
+logins), runs it against the database and records its latency. The report
+gives throughput and p50/p95/p99 latency per operation, plus error counts
+(e.g. "database is locked" under write contention).
+
+Usage (from the repository root):
+    python -m benchmarks.load_test --generate small --users 16 --duration 30
+    python -m benchmarks.load_test --db DATA/inteligence_platform.db --mix lookup=5,dashboard=1
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from app.data import db, snapshots
+
+# Default mix: mostly reads, some writes, a few logins
+DEFAULT_MIX = {
+    "dashboard": 5,
+    "aggregate": 5,
+    "lookup": 50,
+    "create": 10,
+    "update": 15,
+    "login": 5,
+}
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list (p in 0..100)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+class Context:
+    """What the simulated users need to know about the database."""
+
+    def __init__(self, passwords=None, login=None):
+        conn = db.get_connection()
+        try:
+            curr = conn.cursor()
+            curr.execute("SELECT COALESCE(MAX(incident_id), 0) FROM cyber_incidents;")
+            self.max_incident = curr.fetchone()[0]
+            curr.execute("SELECT COALESCE(MAX(ticket_id), 0) FROM it_tickets;")
+            self.max_ticket = curr.fetchone()[0]
+            curr.execute("SELECT id, username FROM users WHERE username LIKE 'user%' AND disabled = 0;")
+            self.synthetic_users = curr.fetchall()
+        finally:
+            conn.close()
+        self.passwords = passwords or []
+        self.login = login
+        self._next_id = max(self.max_incident, self.max_ticket) + 1_000_000
+        self._lock = threading.Lock()
+
+    def new_id(self):
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def credentials(self, rng):
+        if self.login:
+            return self.login
+        if self.passwords and self.synthetic_users:
+            user_id, username = rng.choice(self.synthetic_users)
+            return username, self.passwords[user_id % len(self.passwords)]
+        return None
+
+
+# Operations: (rng, ctx) -> None
+
+def op_dashboard(rng, ctx):
+    snapshots.read_table(rng.choice(["cyber_incidents", "it_tickets"]))
+
+
+def op_aggregate(rng, ctx):
+    from app.data.analytics import read_category_level_profile, read_level_status_bubbles
+
+    if rng.random() < 0.5:
+        read_level_status_bubbles("it_tickets", "priority", "status", "issue_type")
+    else:
+        read_category_level_profile("cyber_incidents", "category", "severity")
+
+
+def op_lookup(rng, ctx):
+    from app.data.cyber_incidents import get_incident_by_id
+    from app.data.it_tickets import get_ticket_by_id
+
+    if rng.random() < 0.5:
+        get_incident_by_id(rng.randint(1, max(ctx.max_incident, 1)))
+    else:
+        get_ticket_by_id(rng.randint(1, max(ctx.max_ticket, 1)))
+
+
+def op_create(rng, ctx):
+    from app.data.cyber_incidents import create_incident
+    from app.data.it_tickets import create_ticket
+
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    if rng.random() < 0.5:
+        create_incident(ctx.new_id(), now, rng.choice(["Low", "Medium", "High", "Critical"]),
+                        "Phishing", "Open", "load test incident")
+    else:
+        create_ticket(ctx.new_id(), now, rng.choice(["Low", "Medium", "High", "Critical"]),
+                      "Software Issue", "IT_Support_01", "Open", "load test ticket")
+
+
+def op_update(rng, ctx):
+    from app.data.cyber_incidents import update_incident
+    from app.data.it_tickets import update_ticket
+
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    status = rng.choice(["In Progress", "Resolved", "Closed"])
+    if rng.random() < 0.5:
+        update_incident(rng.randint(1, max(ctx.max_incident, 1)), now, "High", "Malware", status, "updated")
+    else:
+        update_ticket(rng.randint(1, max(ctx.max_ticket, 1)), now, "High", "Hardware Issue",
+                      "IT_Support_02", status, "updated")
+
+
+def op_login(rng, ctx):
+    from app.data.security import authenticate_user
+
+    credentials = ctx.credentials(rng)
+    if credentials is None:
+        raise RuntimeError("no login credentials (use --generate or --login)")
+    success, _, message = authenticate_user(*credentials)
+    if not success:
+        raise RuntimeError(message)
+
+
+OPERATIONS = {
+    "dashboard": op_dashboard,
+    "aggregate": op_aggregate,
+    "lookup": op_lookup,
+    "create": op_create,
+    "update": op_update,
+    "login": op_login,
+}
+
+
+def simulated_user(user_index, ctx, mix, deadline, max_requests, think_ms, seed, results, lock):
+    rng = random.Random(seed + user_index)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies = defaultdict(list)
+    errors = defaultdict(lambda: defaultdict(int))
+    done = 0
+    while time.perf_counter() < deadline and (max_requests is None or done < max_requests):
+        name = rng.choices(names, weights=weights)[0]
+        start = time.perf_counter()
+        try:
+            OPERATIONS[name](rng, ctx)
+            latencies[name].append((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            errors[name][f"{type(e).__name__}: {str(e)[:60]}"] += 1
+        done += 1
+        if think_ms:
+            time.sleep(rng.expovariate(1 / think_ms) / 1000)
+    with lock:
+        for name, values in latencies.items():
+            results["latencies"][name].extend(values)
+        for name, counts in errors.items():
+            for message, count in counts.items():
+                results["errors"][name][message] += count
+
+
+def run(users, duration, mix, max_requests=None, think_ms=0, seed=0, ctx=None):
+    """
+    Run the load test and summarise it.
+
+    Args:
+        users: Number of concurrent simulated users (threads)
+        duration: Seconds to run for
+        mix: {operation: weight}
+        max_requests: Optional per-user request limit
+        think_ms: Mean pause between a user's requests (exponential)
+        seed: Random seed
+        ctx: Context (built from the database if not given)
+
+    Returns:
+        dict: Overall and per-operation counts, throughput and percentiles
+    """
+    ctx = ctx or Context()
+    results = {"latencies": defaultdict(list), "errors": defaultdict(lambda: defaultdict(int))}
+    lock = threading.Lock()
+    start = time.perf_counter()
+    deadline = start + duration
+    threads = [
+        threading.Thread(target=simulated_user,
+                         args=(i, ctx, mix, deadline, max_requests, think_ms, seed, results, lock))
+        for i in range(users)
+    ]
+    # The data layer prints debug output on some calls; keep the report readable
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - start
+
+    operations = {}
+    for name in mix:
+        values = sorted(results["latencies"].get(name, []))
+        errors = dict(results["errors"].get(name, {}))
+        operations[name] = {
+            "ok": len(values),
+            "errors": sum(errors.values()),
+            "error_types": errors,
+            "per_second": len(values) / elapsed,
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+            "max_ms": values[-1] if values else 0.0,
+        }
+    total_ok = sum(op["ok"] for op in operations.values())
+    return {
+        "users": users,
+        "seconds": elapsed,
+        "requests": total_ok + sum(op["errors"] for op in operations.values()),
+        "per_second": total_ok / elapsed,
+        "operations": operations,
+    }
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r} (choose from {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def print_report(report):
+    print(f"\n{report['users']} users, {report['seconds']:.1f} s, {report['requests']} requests, "
+          f"{report['per_second']:.1f} ok/s")
+    print(f"{'operation':<11}{'ok':>8}{'err':>6}{'ops/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for name, op in report["operations"].items():
+        print(f"{name:<11}{op['ok']:>8}{op['errors']:>6}{op['per_second']:>9.1f}"
+              f"{op['p50_ms']:>9.1f}{op['p95_ms']:>9.1f}{op['p99_ms']:>9.1f}{op['max_ms']:>9.1f}")
+        for message, count in op["error_types"].items():
+            print(f"{'':<11}{count:>8} x {message}")
+
+
+def main(argv=None):
+    from benchmarks.synthetic_data import PRESETS, generate
+
+    parser = argparse.ArgumentParser(description="Drive the data layer with concurrent simulated users.")
+    parser.add_argument("--db", help="database to test (default: a temporary one, see --generate)")
+    parser.add_argument("--generate", choices=sorted(PRESETS), help="fill the database with a synthetic preset first")
+    parser.add_argument("--users", type=int, default=8, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=20, help="seconds to run")
+    parser.add_argument("--requests", type=int, help="stop each user after this many requests")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between requests of one user")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. lookup=5,update=1,login=1")
+    parser.add_argument("--login", help="username:password used by the login operation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = args.db or os.path.join(tmp, "load.db")
+        snapshots.SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(db.DB_PATH)), "snapshots")
+        if args.db is None and args.generate is None:
+            args.generate = "small"
+        passwords = []
+        if args.generate:
+            if not args.json:
+                print(f"Generating '{args.generate}' data set in {db.DB_PATH} ...")
+            passwords = generate(**PRESETS[args.generate])["passwords"]
+        login = tuple(args.login.split(":", 1)) if args.login else None
+        ctx = Context(passwords, login)
+        report = run(args.users, args.duration, args.mix, args.requests, args.think_ms, args.seed, ctx)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Memory used by read_all_cyber_incidents() / read_all_tickets() with and
+without the compact dtypes from app/data/dtypes.py.
+
+Usage (from the repository root):
+    python -m benchmarks.memory_report                 # synthetic data
+    python -m benchmarks.memory_report --rows 500000
+    python -m benchmarks.memory_report --use-app-db    # DATA/inteligence_platform.db
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from app.data import db
+from app.data.cyber_incidents import read_all_cyber_incidents
+from app.data.it_tickets import read_all_tickets
+from app.data.dtypes import memory_report, optimize_incidents, optimize_tickets
+from benchmarks.synthetic_data import generate
+
+READERS = {
+    "cyber_incidents": (read_all_cyber_incidents, optimize_incidents),
+    "it_tickets": (read_all_tickets, optimize_tickets),
+}
+
+
+def run():
+    results = {}
+    for name, (reader, optimize) in READERS.items():
+        raw = reader(optimize=False)
+        results[name] = memory_report(raw, optimize(raw.copy()))
+    return results
+
+
+def print_report(results):
+    for name, r in results.items():
+        print(f"\n{name}: {r['rows']} rows")
+        print(f"  {'column':<14}{'before':>12}{'after':>12}  dtype")
+        for col, c in r["columns"].items():
+            print(f"  {col:<14}{c['before']:>12,}{c['after']:>12,}  {c['dtype_before']} -> {c['dtype_after']}")
+        saved = 1 - r["total_after"] / max(r["total_before"], 1)
+        print(f"  {'total':<14}{r['total_before']:>12,}{r['total_after']:>12,}  ({saved:.0%} smaller)")
+        print(f"  bytes/row: {r['bytes_per_row_before']:.1f} -> {r['bytes_per_row_after']:.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare DataFrame memory before/after dtype optimization.")
+    parser.add_argument("--rows", type=int, default=100000, help="synthetic rows per table")
+    parser.add_argument("--use-app-db", action="store_true", help="measure the real database instead")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args(argv)
+
+    if args.use_app_db:
+        results = run()
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            db.DB_PATH = os.path.join(tmp, "bench.db")
+            generate(incidents=args.rows, tickets=args.rows)
+            results = run()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
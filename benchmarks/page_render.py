@@ -0,0 +1,101 @@
+"""
+Full-page render time of the dashboard pages, with and without the figure cache.
+
+Each page is run headless through streamlit's AppTest against a throwaway
+database filled with synthetic rows. "cold" clears the figure cache before
+every run; "warm" renders in a fresh session after the cache was filled by
+another one, which is what every visitor after the first one sees.
+
+--workers runs the pages with each size of the database thread pool the
+charts are prepared on (1 = one chart after another).
+
+Usage (from the repository root):
+    python -m benchmarks.page_render --rows 50000 --repeat 3
+    python -m benchmarks.page_render --rows 500000 --workers 1,8
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from app.data import async_api, db, snapshots
+from benchmarks.synthetic_data import generate
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = {
+    "cyber_incidents": "pages/2_Cyber_Incidents.py",
+    "it_tickets": "pages/4_IT_Tickets.py",
+}
+
+
+def render_once(page_path):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(REPO_ROOT, page_path), default_timeout=600)
+    at.session_state["authenticated"] = True
+    at.session_state["user"] = {"id": 1, "username": "bench", "role": "admin", "is_admin": True}
+    start = time.perf_counter()
+    at.run()
+    elapsed = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return elapsed
+
+
+def run(rows, repeat, workers=None):
+    """
+    Returns:
+        dict: {"<page> (<n> threads)": timings} for every page and pool size
+    """
+    from app.utils.figure_cache import clear_figure_cache, figure_cache_stats
+
+    results = {}
+    for threads in workers or [async_api.ASYNC_WORKERS]:
+        async_api.configure(threads)
+        for name, page in PAGES.items():
+            cold, warm = [], []
+            for _ in range(repeat):
+                clear_figure_cache()
+                cold.append(render_once(page))
+                warm.append(render_once(page))
+            results[f"{name} ({threads} threads)"] = {
+                "rows": rows,
+                "workers": threads,
+                "cold_ms_median": statistics.median(cold),
+                "warm_ms_median": statistics.median(warm),
+                "speedup": statistics.median(cold) / statistics.median(warm),
+                "cache": figure_cache_stats(),
+            }
+    async_api.shutdown()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dashboard page render time.")
+    parser.add_argument("--rows", type=int, default=20000, help="synthetic rows per table")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=lambda text: [int(n) for n in text.split(",")],
+                        help="comma-separated chart thread pool sizes to compare, e.g. 1,8")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "bench.db")
+        # Keep the pages' Arrow snapshots away from the real ones in DATA/
+        snapshots.SNAPSHOT_DIR = os.path.join(tmp, "snapshots")
+        generate(incidents=args.rows, tickets=args.rows)
+        results = run(args.rows, args.repeat, args.workers)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for name, r in results.items():
+        print(f"{name:<30} rows={r['rows']:<8} cold {r['cold_ms_median']:8.1f} ms   "
+              f"warm {r['warm_ms_median']:8.1f} ms   x{r['speedup']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+Synthetic data generator for production-sized databases.
+
+Appends users, cyber incidents, IT tickets and dataset records with skewed,
+roughly realistic distributions: most incidents are Low/Medium, older
+records are mostly Resolved/Closed, work happens in business hours and a
+few agents get most tickets. Rows are written in large batches straight
+into the base tables, with the per-row generation/change-log triggers
+dropped for the duration of the load and recreated afterwards; the load
+is then recorded as one generation bump and one change_log reload entry
+per table.
+
+Usage (from the repository root):
+    python -m benchmarks.synthetic_data --incidents 200000 --tickets 100000
+    python -m benchmarks.synthetic_data --preset production --db /tmp/big.db
+"""
+import argparse
+import json
+import math
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.data import db
+from app.data.change_log import record_table_reload
+from app.data.lookups import NORMALIZED_TABLES
+from app.data.schema import create_tables
+
+PRESETS = {
+    "small": {"users": 200, "incidents": 20000, "tickets": 10000, "datasets": 1000},
+    "medium": {"users": 2000, "incidents": 500000, "tickets": 200000, "datasets": 10000},
+    "production": {"users": 10000, "incidents": 5000000, "tickets": 2000000, "datasets": 100000},
+}
+
+BATCH_SIZE = 50000
+
+LEVELS = ['Low', 'Medium', 'High', 'Critical']
+SEVERITY_WEIGHTS = [40, 33, 20, 7]
+PRIORITY_WEIGHTS = [35, 40, 18, 7]
+STATUSES = ['Open', 'In Progress', 'Resolved', 'Closed']
+RECENT_STATUS_WEIGHTS = [40, 30, 20, 10]  # created in the last 30 days
+OLD_STATUS_WEIGHTS = [4, 6, 30, 60]
+
+INCIDENT_CATEGORIES = {
+    'Phishing': 30, 'Malware': 20, 'Unauthorized Access': 15, 'DDoS': 10,
+    'Data Leak': 8, 'Insider Threat': 5, 'Ransomware': 4, 'Other': 8,
+}
+ISSUE_TYPES = {
+    'Account Access': 20, 'Software Issue': 18, 'Hardware Issue': 14, 'Network Problem': 12,
+    'Email Problem': 10, 'Password Reset': 9, 'Printer Issue': 7, 'Performance Issue': 5,
+    'System Error': 3, 'Other': 2,
+}
+MISSING_ISSUE_TYPE_RATE = 0.02  # exercised by the issue-type filling in read_all_tickets()
+AGENT_COUNT = 40
+
+INCIDENT_TEXT = {
+    'Phishing': "Suspicious email reported by user",
+    'Malware': "Endpoint protection flagged a malicious file",
+    'Unauthorized Access': "Login from unexpected location",
+    'DDoS': "Traffic spike on public endpoint",
+    'Data Leak': "Sensitive file shared externally",
+    'Insider Threat': "Unusual bulk download by employee",
+    'Ransomware': "Files encrypted on shared drive",
+    'Other': "Security event under review",
+}
+TICKET_TEXT = {
+    'Account Access': "cannot login to account",
+    'Software Issue': "application crashes on start",
+    'Hardware Issue': "laptop does not power on",
+    'Network Problem': "no internet connection",
+    'Email Problem': "email not syncing",
+    'Password Reset': "password expired",
+    'Printer Issue': "printer jammed",
+    'Performance Issue': "computer very slow",
+    'System Error': "blue screen error",
+    'Other': "general request",
+}
+
+# Incidents and tickets cluster in business hours on weekdays
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 2, 3, 6, 10, 12, 12, 11, 9, 11, 12, 11, 9, 6, 4, 3, 2, 2, 1, 1]
+
+
+def _timestamps(rng, count, days, end):
+    day_offsets = rng.choices(range(days), k=count)
+    hours = rng.choices(range(24), weights=HOUR_WEIGHTS, k=count)
+    stamps = []
+    for offset, hour in zip(day_offsets, hours):
+        moment = end - timedelta(days=offset)
+        if moment.weekday() >= 5 and rng.random() < 0.7:
+            moment -= timedelta(days=moment.weekday() - 4)  # mostly moved to Friday
+        stamps.append((moment.replace(hour=hour, minute=rng.randrange(60), second=rng.randrange(60)),
+                       offset))
+    return stamps
+
+
+def _statuses(rng, ages):
+    recent = rng.choices(STATUSES, weights=RECENT_STATUS_WEIGHTS, k=len(ages))
+    old = rng.choices(STATUSES, weights=OLD_STATUS_WEIGHTS, k=len(ages))
+    return [r if age <= 30 else o for r, o, age in zip(recent, old, ages)]
+
+
+def _lookup_ids(curr, lookup, names):
+    """Map names to ids in a lookup table, adding missing names after the existing ones."""
+    for name in names:
+        curr.execute(
+            f"INSERT OR IGNORE INTO {lookup} (name, sort_order) "
+            f"SELECT ?, (SELECT COALESCE(MAX(sort_order), 0) + 1 FROM {lookup});",
+            (name,),
+        )
+    curr.execute(f"SELECT name, id FROM {lookup};")
+    return dict(curr.fetchall())
+
+
+def _next_id(curr, table, column):
+    curr.execute(f"SELECT COALESCE(MAX({column}), 0) + 1 FROM {table};")
+    return curr.fetchone()[0]
+
+
+def _insert_normalized(curr, view, rows):
+    """Insert view-shaped tuples into the view's base table, encoding lookup columns."""
+    spec = NORMALIZED_TABLES[view]
+    columns = [col for col, _ in spec["columns"]]
+    encoders = {}
+    for col, lookup in spec["lookups"].items():
+        i = columns.index(col)
+        encoders[i] = _lookup_ids(curr, lookup, sorted({row[i] for row in rows if row[i] is not None}))
+    base_columns = [f"{col}_id" if col in spec["lookups"] else col for col in columns]
+    placeholders = ", ".join("?" * len(columns))
+
+    def encode(row):
+        return tuple(encoders[i].get(v) if i in encoders else v for i, v in enumerate(row))
+
+    curr.executemany(
+        f"INSERT INTO {spec['base']} ({', '.join(base_columns)}) VALUES ({placeholders});",
+        (encode(row) for row in rows),
+    )
+
+
+def _incident_batches(rng, curr, count, days, end):
+    start_id = _next_id(curr, "cyber_incidents_data", "incident_id")
+    categories, weights = zip(*INCIDENT_CATEGORIES.items())
+    for first in range(0, count, BATCH_SIZE):
+        n = min(BATCH_SIZE, count - first)
+        stamps = _timestamps(rng, n, days, end)
+        severities = rng.choices(LEVELS, weights=SEVERITY_WEIGHTS, k=n)
+        cats = rng.choices(categories, weights=weights, k=n)
+        statuses = _statuses(rng, [age for _, age in stamps])
+        yield [
+            (start_id + first + i, stamp.strftime("%Y-%m-%d %H:%M:%S"), severities[i], cats[i],
+             statuses[i], INCIDENT_TEXT[cats[i]])
+            for i, (stamp, _) in enumerate(stamps)
+        ]
+
+
+def _ticket_batches(rng, curr, count, days, end):
+    start_id = _next_id(curr, "it_tickets_data", "ticket_id")
+    issue_types, weights = zip(*ISSUE_TYPES.items())
+    agents = [f"IT_Support_{i:02d}" for i in range(1, AGENT_COUNT + 1)]
+    agent_weights = [1 / rank for rank in range(1, AGENT_COUNT + 1)]  # Zipf-like workload
+    for first in range(0, count, BATCH_SIZE):
+        n = min(BATCH_SIZE, count - first)
+        stamps = _timestamps(rng, n, days, end)
+        priorities = rng.choices(LEVELS, weights=PRIORITY_WEIGHTS, k=n)
+        types = rng.choices(issue_types, weights=weights, k=n)
+        assigned = rng.choices(agents, weights=agent_weights, k=n)
+        statuses = _statuses(rng, [age for _, age in stamps])
+        yield [
+            (start_id + first + i, stamp.strftime("%Y-%m-%d %H:%M:%S"), priorities[i],
+             None if rng.random() < MISSING_ISSUE_TYPE_RATE else types[i],
+             assigned[i], statuses[i], TICKET_TEXT[types[i]])
+            for i, (stamp, _) in enumerate(stamps)
+        ]
+
+
+def _password_hashes(pool_size, seed):
+    """A small pool of real bcrypt hashes, so logins cost what they cost in production."""
+    from app.data.security import hash_password
+
+    rng = random.Random(seed)
+    passwords = [f"Synthetic!{rng.randrange(10 ** 6):06d}" for _ in range(pool_size)]
+    return [(password, hash_password(password)) for password in passwords]
+
+
+def _user_rows(rng, curr, count, hashes):
+    # AUTOINCREMENT never reuses ids, so continue after the highest one ever used
+    curr.execute("SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'users'), 0), "
+                 "COALESCE((SELECT MAX(id) FROM users), 0)) + 1;")
+    start = curr.fetchone()[0]
+    for i in range(start, start + count):
+        _, password_hash = hashes[i % len(hashes)]
+        is_admin = 1 if rng.random() < 0.02 else 0
+        yield (i, f"user{i:06d}", password_hash, is_admin, 1 if rng.random() < 0.03 else 0,
+               "admin" if is_admin else "user", f"user{i:06d}@example.com", None, 0, None)
+
+
+def _dataset_rows(rng, curr, count, usernames, days, end):
+    start = _next_id(curr, "datasets_metadata", "dataset_id")
+    for i in range(start, start + count):
+        rows = int(math.exp(rng.gauss(9, 2)))  # median ~8k rows, long tail
+        upload = end - timedelta(days=rng.randrange(days))
+        yield (i, f"dataset_{i:06d}.csv", max(rows, 1), rng.randint(3, 60),
+               rng.choice(usernames) if usernames else None, upload.strftime("%Y-%m-%d"))
+
+
+def _drop_write_triggers(curr, table):
+    for op in ("insert", "update", "delete"):
+        curr.execute(f"DROP TRIGGER IF EXISTS trg_{table}_{op}_generation;")
+        curr.execute(f"DROP TRIGGER IF EXISTS trg_{table}_{op}_change_log;")
+
+
+def generate(users=0, incidents=0, tickets=0, datasets=0, days=365, seed=42, hash_pool=20, progress=None):
+    """
+    Append synthetic rows to the database at db.DB_PATH.
+
+    Args:
+        users, incidents, tickets, datasets: Number of rows to add per table
+        days: Records are spread over this many days up to now
+        seed: Random seed (same seed and counts give the same data)
+        hash_pool: Number of distinct bcrypt password hashes shared by users
+        progress: Optional callable(table, rows_done, rows_total)
+
+    Returns:
+        dict: {table: {"rows": n, "seconds": t}} plus "passwords", the
+        plaintext passwords of the hash pool (user with id i has passwords[i % pool])
+    """
+    rng = random.Random(seed)
+    end = datetime.now().replace(microsecond=0)
+    create_tables()
+    hashes = _password_hashes(hash_pool, seed) if users else []
+    report = {}
+
+    conn = db.get_connection()
+    curr = conn.cursor()
+    physical = {
+        "users": "users",
+        "datasets_metadata": "datasets_metadata",
+        **{view: spec["base"] for view, spec in NORMALIZED_TABLES.items()},
+    }
+    try:
+        curr.execute("BEGIN;")
+        for table in physical.values():
+            _drop_write_triggers(curr, table)
+
+        def load(table, total, batches, insert):
+            start = time.perf_counter()
+            done = 0
+            for batch in batches:
+                insert(batch)
+                done += len(batch)
+                if progress:
+                    progress(table, done, total)
+            if total:
+                record_table_reload(curr, table)
+                curr.execute(
+                    "UPDATE data_generations SET generation = generation + 1 WHERE table_name = ?;",
+                    (table,),
+                )
+            report[table] = {"rows": done, "seconds": round(time.perf_counter() - start, 2)}
+
+        user_rows = list(_user_rows(rng, curr, users, hashes)) if users else []
+        load("users", users, [user_rows] if user_rows else [], lambda batch: curr.executemany(
+            "INSERT INTO users (id, username, password_hash, is_admin, disabled, role, email, license_key, "
+            "failed_attempts, recovery_code) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);", batch))
+
+        load("cyber_incidents", incidents, _incident_batches(rng, curr, incidents, days, end),
+             lambda batch: _insert_normalized(curr, "cyber_incidents", batch))
+        load("it_tickets", tickets, _ticket_batches(rng, curr, tickets, days, end),
+             lambda batch: _insert_normalized(curr, "it_tickets", batch))
+
+        curr.execute("SELECT username FROM users;")
+        usernames = [row[0] for row in curr.fetchall()]
+        dataset_rows = list(_dataset_rows(rng, curr, datasets, usernames, days, end)) if datasets else []
+        load("datasets_metadata", datasets, [dataset_rows] if dataset_rows else [], lambda batch: curr.executemany(
+            "INSERT INTO datasets_metadata (dataset_id, name, rows, columns, uploaded_by, upload_date) "
+            "VALUES (?, ?, ?, ?, ?, ?);", batch))
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    # Bring the dropped triggers back
+    create_tables()
+    report["passwords"] = [password for password, _ in hashes]
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill the database with synthetic data.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), help="row counts to use (overridden by the flags below)")
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--incidents", type=int)
+    parser.add_argument("--tickets", type=int)
+    parser.add_argument("--datasets", type=int)
+    parser.add_argument("--days", type=int, default=365, help="spread records over this many days")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help=f"database file (default: {db.DB_PATH})")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args(argv)
+
+    counts = dict(PRESETS[args.preset or "small"])
+    for table in counts:
+        if getattr(args, table) is not None:
+            counts[table] = getattr(args, table)
+    if args.db:
+        db.DB_PATH = args.db
+
+    def progress(table, done, total):
+        if not args.json:
+            print(f"\r  {table:<18} {done:>10,} / {total:,}", end="" if done < total else "\n", flush=True)
+
+    report = generate(days=args.days, seed=args.seed, progress=progress, **counts)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for table, r in report.items():
+        if table != "passwords":
+            print(f"{table:<18} {r['rows']:>10,} rows in {r['seconds']:.1f} s")
+    print(f"Synthetic user passwords: {', '.join(report['passwords']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
-from app.data.schema import create_tables
+import sys
+import time
+
+from app.data.init_state import initialize
+from app.data.metrics import write_metrics_file
 
 from app.data.users import (
-    add_test_users,
-    load_users_from_file,
     get_all_users,
     create_user,
     get_user_by_id,
@@ -10,7 +12,6 @@ from app.data.users import (
 )
 
 from app.data.cyber_incidents import (
-    migrate_cyber_incidents,
     read_all_cyber_incidents,
     create_incident,
     get_incident_by_id,
@@ -19,16 +20,15 @@ from app.data.cyber_incidents import (
 )
 
 from app.data.datasets import (
-    migrate_datasets,
     read_all_datasets,
     create_dataset,
     get_dataset_by_id,
     get_all_datasets,
     delete_dataset,
 )
+from app.data.dataset_profiles import profile_and_register
 
 from app.data.it_tickets import (
-    migrate_tickets,
     read_all_tickets,
     create_ticket,
     get_ticket_by_id,
@@ -276,6 +276,7 @@ def menu_datasets():
         print("3 - Create demo dataset")
         print("4 - Get dataset by ID")
         print("5 - Delete dataset by ID")
+        print("6 - Profile a data file and add it")
         print("0 - Back to main menu")
 
         choice = input("\nSelect an option: ").strip()
@@ -361,6 +362,21 @@ def menu_datasets():
                 print_info("Delete cancelled.")
             pause()
 
+        elif choice == "6":
+            path = input("Data file (CSV, TSV, JSON lines or Parquet): ").strip()
+            uploaded_by = input("Uploaded by (default cli_user): ").strip() or "cli_user"
+            try:
+                dataset_id, profile = profile_and_register(path, uploaded_by=uploaded_by)
+                print_ok(
+                    f"Dataset {dataset_id} added: {profile['rows']} rows x {profile['columns']} columns "
+                    f"({profile['seconds']:.1f}s)"
+                )
+                for column in profile["column_stats"]:
+                    print(f"  {column['name']:<24}{column['dtype']:<10}{column['nulls']:>10} nulls")
+            except Exception as e:
+                print_error(f"Could not profile {path}: {e}")
+            pause()
+
         elif choice == "0":
             break
         else:
@@ -486,26 +502,24 @@ def menu_snapshots():
 # =========================
 # MAIN
 # =========================
-def initialize_system():
+def initialize_system(force=False):
     print_header("MULTI-DOMAIN INTELLIGENCE PLATFORM - INITIALIZATION")
-    print_info("Creating tables...")
-    create_tables()
-    print_ok("Tables ready.")
-
-    print_info("Loading users from file and adding test users...")
-    add_test_users()
-    load_users_from_file()
-    print_ok(f"Users in DB: {len(get_all_users())}")
-
-    print_info("Migrating CSV data...")
-    migrate_cyber_incidents()
-    migrate_datasets()
-    migrate_tickets()
-    print_ok("CSV migration completed.")
+    start = time.perf_counter()
+    # Steps recorded as done in the database (tables, seeded users,
+    # unchanged CSV files) are skipped unless forced
+    for step in initialize(force=force):
+        line = f"{step['step']:<14} {step['seconds'] * 1000:8.1f} ms  {step['detail']}"
+        if step["status"] == "done":
+            print_ok(line)
+        elif step["status"] == "failed":
+            print_error(line)
+        else:
+            print_info(f"{line} ({step['status']})")
+    print_ok(f"Startup finished in {time.perf_counter() - start:.2f} s")
 
 
-def main():
-    initialize_system()
+def main(force=False):
+    initialize_system(force)
 
     while True:
         print_header("MANAGEMENT CONSOLE - MAIN MENU")
@@ -529,6 +543,7 @@ def main():
         elif choice == "5":
             menu_snapshots()
         elif choice == "0":
+            print_ok(f"Metrics of this session written to {write_metrics_file()}")
             print_ok("Exiting. Goodbye.")
             break
         else:
@@ -537,4 +552,9 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    # --force reruns every initialization step before the console opens;
+    # other arguments run one batch operation with JSON output (see app/cli.py)
+    if sys.argv[1:] and sys.argv[1:] != ["--force"]:
+        from app.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+    main(force="--force" in sys.argv)
@@ -28,9 +28,13 @@ if st.session_state.authenticated and st.session_state.user:
 # Import after title is displayed
 try:
     from app.data.security import authenticate_user
-    # Ensure database schema is up to date
-    from app.data.schema import create_tables
-    create_tables()
+    # Ensure database schema is up to date (once per session, not on every rerun)
+    if not st.session_state.get("schema_ready"):
+        from app.data.schema import create_tables
+        create_tables()
+        st.session_state.schema_ready = True
+    from app.utils.auth import start_metrics
+    start_metrics()
 except Exception as e:
     st.error(f"Error loading authentication module: {e}")
     st.code(str(e))
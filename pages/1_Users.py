@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 
 st.set_page_config(layout="wide")
 
@@ -11,11 +10,19 @@ from app.data.users import (
     unlock_user_account,
     reset_password_with_recovery,
 )
+from app.data.audit import AUDIT_COLUMNS, get_audit_events, get_audit_event_counts
 from app.utils.auth import require_login, require_admin
 # Import security functions inside functions to avoid circular import
 
 # Check if user is logged in and is admin
 user = require_admin()
+admin_username = user["username"]
+
+# Heavy libraries are imported only once the user is allowed to see the page
+import pandas as pd
+from app.utils.profiling import start_page_profile
+
+page_profile = start_page_profile("users")
 
 st.title("👤 Users Management")
 
@@ -30,11 +37,12 @@ with col2:
         st.rerun()
 
 # Tabs
-tab_view, tab_add, tab_delete, tab_manage = st.tabs(["View Users", "Add User", "Delete User", "Manage Accounts"])
+tab_view, tab_add, tab_delete, tab_manage, tab_audit = st.tabs(["View Users", "Add User", "Delete User", "Manage Accounts", "Audit Log"])
 
 # =======================
 # VIEW USERS
 # =======================
+page_profile.section("view_users")
 with tab_view:
     st.subheader("All Users")
     # Show message if user was just added
@@ -67,6 +75,7 @@ with tab_view:
 # =======================
 # ADD USER (IMPROVED)
 # =======================
+page_profile.section("add_user")
 with tab_add:
     st.subheader("Add New User")
     
@@ -101,6 +110,7 @@ with tab_add:
                 disabled,
                 role,
                 email,
+                actor=admin_username,
             )
             
             if success:
@@ -131,6 +141,7 @@ with tab_add:
 # =======================
 # DELETE USER
 # =======================
+page_profile.section("delete_user")
 with tab_delete:
     st.subheader("Delete User by ID")
     user_id = st.number_input("User ID", min_value=1, step=1)
@@ -139,7 +150,7 @@ with tab_delete:
         if not user:
             st.error("User not found.")
         else:
-            success, message = delete_user(int(user_id))
+            success, message = delete_user(int(user_id), actor=admin_username)
             if success:
                 st.success(message)
                 st.rerun()  # Automatically refresh to update table
@@ -149,6 +160,7 @@ with tab_delete:
 # =======================
 # MANAGE ACCOUNTS (ADMIN)
 # =======================
+page_profile.section("manage_accounts")
 with tab_manage:
     st.subheader("🔧 Account Management")
     
@@ -162,7 +174,7 @@ with tab_manage:
             if not unlock_user:
                 st.error("User not found.")
             else:
-                success, message = unlock_user_account(int(unlock_user_id))
+                success, message = unlock_user_account(int(unlock_user_id), actor=admin_username)
                 if success:
                     st.success(message)
                     st.rerun()
@@ -208,7 +220,8 @@ with tab_manage:
                             disabled=0,  # Also unlock if locked
                             role=role,
                             email=email,
-                            license_key=license_key
+                            license_key=license_key,
+                            actor=admin_username
                         )
                         if success:
                             st.success(f"Password reset successfully for user '{username}'. Account unlocked.")
@@ -216,3 +229,39 @@ with tab_manage:
                         else:
                             st.error(message)
 
+# =======================
+# AUDIT LOG (ADMIN)
+# =======================
+page_profile.section("audit_log")
+with tab_audit:
+    st.subheader("📜 Audit Log")
+
+    counts = get_audit_event_counts()
+    if counts:
+        count_cols = st.columns(min(len(counts), 6))
+        for col, (event_type, count) in zip(count_cols, counts):
+            col.metric(event_type, count)
+
+    audit_col1, audit_col2, audit_col3 = st.columns(3)
+    with audit_col1:
+        audit_event_type = st.selectbox("Event type", ["All"] + [c[0] for c in counts], key="audit_event_type")
+    with audit_col2:
+        audit_username = st.text_input("Affected username", key="audit_username")
+    with audit_col3:
+        audit_actor = st.text_input("Performed by", key="audit_actor")
+
+    audit_page_size = 100
+    audit_page = st.number_input("Page", min_value=1, step=1, key="audit_page")
+    events = get_audit_events(
+        event_type=None if audit_event_type == "All" else audit_event_type,
+        username=audit_username.strip() or None,
+        actor=audit_actor.strip() or None,
+        limit=audit_page_size,
+        offset=(int(audit_page) - 1) * audit_page_size,
+    )
+    if events:
+        st.dataframe(pd.DataFrame(events, columns=AUDIT_COLUMNS), use_container_width=True)
+    else:
+        st.info("No audit events match these filters.")
+
+page_profile.finish()
@@ -1,17 +1,30 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 
 st.set_page_config(layout="wide")
 
-from app.data.cyber_incidents import read_all_cyber_incidents
+from app.data.analytics import category_level_profile, level_status_bubbles
 from app.utils.auth import require_login
 
 # Check if user is logged in
 user = require_login()
 
+# Heavy libraries are imported only once the user is allowed to see the page
+import pandas as pd
+from app.utils.charts import (
+    LEVEL_ORDER,
+    STATUS_ORDER,
+    pie_chart,
+    count_bar_chart,
+    grouped_bar_chart,
+    bubble_scatter,
+    radar_chart,
+)
+from app.utils.figure_cache import prefetch_figures
+from app.utils.live_refresh import load_table, auto_refresh
+from app.utils.profiling import start_page_profile
+
+page_profile = start_page_profile("cyber_incidents")
+
 st.title("🛡️ Cyber Incidents")
 
 # Display current user info
@@ -24,15 +37,75 @@ with col2:
         st.session_state.user = None
         st.rerun()
 
+# Chart builders (run only on a figure-cache miss)
+SEVERITY_COLORS = {
+    'Critical': '#FF0000',
+    'High': '#FF6B00',
+    'Medium': '#FFA500',
+    'Low': '#00FF00'
+}
+
+
+def build_scatter(df):
+    scatter_agg = level_status_bubbles(
+        df, 'severity', 'status', 'category' if 'category' in df.columns else 'severity',
+        mode_name='most_common_category', x_order=LEVEL_ORDER, y_order=STATUS_ORDER
+    )
+    return bubble_scatter(
+        scatter_agg, 'severity_num', 'status_num', LEVEL_ORDER, STATUS_ORDER,
+        title="Incidents: Severity vs Status Distribution (Size = Count)",
+        x_label='Severity', y_label='Status', count_label='Number of Incidents',
+        hover_col='most_common_category', color_scale='Reds'
+    )
+
+
+def build_radar(df):
+    profile = category_level_profile(df, 'category', 'severity', top_n=5)
+    if profile.empty:
+        return None
+    return radar_chart(profile, "Severity Distribution by Category (Radar Chart)")
+
+
 # Load and display data
 try:
-    df = read_all_cyber_incidents()
+    page_profile.section("load")
+    # Charts are cached per generation; the frame is reused by this
+    # session until the table changes
+    generation, df = load_table("cyber_incidents")
+    auto_refresh(["cyber_incidents"])
     
     if df.empty:
         st.info("No cyber incidents found in the database.")
     else:
         st.subheader(f"Total Incidents: {len(df)}")
         
+        page_profile.section("prepare")
+        # The charts only read df, so their data preparation runs side by
+        # side on the database thread pool while the page lays out
+        charts = {}
+        if 'severity' in df.columns:
+            charts["incidents.severity_pie"] = ({}, lambda: pie_chart(
+                df['severity'].value_counts(), "Incidents by Severity", SEVERITY_COLORS
+            ))
+        if 'category' in df.columns:
+            charts["incidents.category_bar"] = ({"top": 10}, lambda: count_bar_chart(
+                df['category'].value_counts().head(10), 'Category', 'Count',
+                "Top 10 Incident Categories", 'Reds', tick_angle=45
+            ))
+        if 'status' in df.columns:
+            charts["incidents.status_bar"] = ({}, lambda: count_bar_chart(
+                df['status'].value_counts(), 'Status', 'Count', "Incidents by Status", 'Blues'
+            ))
+        if 'severity' in df.columns and 'status' in df.columns:
+            charts["incidents.severity_status"] = ({}, lambda: grouped_bar_chart(
+                pd.crosstab(df['severity'], df['status']), "Severity vs Status", "Severity"
+            ))
+            charts["incidents.scatter"] = ({}, lambda: build_scatter(df))
+        if 'category' in df.columns and 'severity' in df.columns:
+            charts["incidents.radar"] = ({"top": 5}, lambda: build_radar(df))
+        figures = prefetch_figures(generation, charts)
+
+        page_profile.section("charts")
         # =======================
         # CHARTS SECTION
         # =======================
@@ -44,171 +117,43 @@ try:
         
         with chart_col1:
             # Chart 1: Pie chart - Severity distribution
-            if 'severity' in df.columns:
-                severity_counts = df['severity'].value_counts()
-                fig_severity = px.pie(
-                    values=severity_counts.values,
-                    names=severity_counts.index,
-                    title="Incidents by Severity",
-                    color_discrete_map={
-                        'Critical': '#FF0000',
-                        'High': '#FF6B00',
-                        'Medium': '#FFA500',
-                        'Low': '#00FF00'
-                    }
-                )
-                fig_severity.update_traces(textposition='inside', textinfo='percent+label')
-                st.plotly_chart(fig_severity, use_container_width=True)
+            if "incidents.severity_pie" in figures:
+                st.plotly_chart(figures["incidents.severity_pie"].result(), use_container_width=True)
         
         with chart_col2:
             # Chart 2: Bar chart - Incidents by Category
-            if 'category' in df.columns:
-                category_counts = df['category'].value_counts().head(10)
-                category_df = pd.DataFrame({
-                    'Category': category_counts.index,
-                    'Count': category_counts.values
-                })
-                fig_category = px.bar(
-                    category_df,
-                    x='Category',
-                    y='Count',
-                    title="Top 10 Incident Categories",
-                    color='Count',
-                    color_continuous_scale='Reds'
-                )
-                fig_category.update_layout(showlegend=False)
-                fig_category.update_xaxes(tickangle=45)
-                st.plotly_chart(fig_category, use_container_width=True)
+            if "incidents.category_bar" in figures:
+                st.plotly_chart(figures["incidents.category_bar"].result(), use_container_width=True)
         
         # Second row of charts
         chart_col3, chart_col4 = st.columns(2)
         
         with chart_col3:
             # Chart 3: Bar chart - Status distribution
-            if 'status' in df.columns:
-                status_counts = df['status'].value_counts()
-                status_df = pd.DataFrame({
-                    'Status': status_counts.index,
-                    'Count': status_counts.values
-                })
-                fig_status = px.bar(
-                    status_df,
-                    x='Status',
-                    y='Count',
-                    title="Incidents by Status",
-                    color='Count',
-                    color_continuous_scale='Blues'
-                )
-                fig_status.update_layout(showlegend=False)
-                st.plotly_chart(fig_status, use_container_width=True)
+            if "incidents.status_bar" in figures:
+                st.plotly_chart(figures["incidents.status_bar"].result(), use_container_width=True)
         
         with chart_col4:
             # Chart 4: Grouped bar chart - Severity vs Status
-            if 'severity' in df.columns and 'status' in df.columns:
-                severity_status = pd.crosstab(df['severity'], df['status'])
-                fig_grouped = go.Figure()
-                
-                for status in severity_status.columns:
-                    fig_grouped.add_trace(go.Bar(
-                        name=status,
-                        x=severity_status.index,
-                        y=severity_status[status]
-                    ))
-                
-                fig_grouped.update_layout(
-                    title="Severity vs Status",
-                    xaxis_title="Severity",
-                    yaxis_title="Count",
-                    barmode='group'
-                )
-                st.plotly_chart(fig_grouped, use_container_width=True)
+            if "incidents.severity_status" in figures:
+                st.plotly_chart(figures["incidents.severity_status"].result(), use_container_width=True)
         
         # Chart 5: Scatter plot - Severity vs Status (with aggregation)
-        if 'severity' in df.columns and 'status' in df.columns:
-            # Create numeric mapping for scatter plot
-            severity_order = ['Low', 'Medium', 'High', 'Critical']
-            status_order = ['Open', 'In Progress', 'Resolved', 'Closed']
-            
-            # Aggregate data to show count at each intersection
-            df_scatter = df.copy()
-            df_scatter['severity_num'] = df_scatter['severity'].map({s: i for i, s in enumerate(severity_order)})
-            df_scatter['status_num'] = df_scatter['status'].map({s: i for i, s in enumerate(status_order)})
-            
-            # Group by severity and status to get counts and most common category
-            scatter_agg = df_scatter.groupby(['severity_num', 'status_num']).agg({
-                'incident_id': 'count',
-                'category' if 'category' in df.columns else 'severity': lambda x: x.mode()[0] if len(x.mode()) > 0 else 'Unknown'
-            }).reset_index()
-            scatter_agg.columns = ['severity_num', 'status_num', 'count', 'most_common_category']
-            
-            # Add jitter for better visibility
-            scatter_agg['severity_jitter'] = scatter_agg['severity_num'] + np.random.uniform(-0.15, 0.15, len(scatter_agg))
-            scatter_agg['status_jitter'] = scatter_agg['status_num'] + np.random.uniform(-0.15, 0.15, len(scatter_agg))
-            
-            fig_scatter = px.scatter(
-                scatter_agg,
-                x='severity_jitter',
-                y='status_jitter',
-                size='count',
-                color='count',
-                title="Incidents: Severity vs Status Distribution (Size = Count)",
-                labels={'severity_jitter': 'Severity', 'status_jitter': 'Status', 'count': 'Number of Incidents'},
-                hover_data=['most_common_category', 'count'],
-                size_max=30,
-                color_continuous_scale='Reds'
-            )
-            fig_scatter.update_xaxes(tickvals=list(range(len(severity_order))), ticktext=severity_order)
-            fig_scatter.update_yaxes(tickvals=list(range(len(status_order))), ticktext=status_order)
-            st.plotly_chart(fig_scatter, use_container_width=True)
+        if "incidents.scatter" in figures:
+            st.plotly_chart(figures["incidents.scatter"].result(), use_container_width=True)
         
         # Chart 6: Radar chart - Category profile
-        if 'category' in df.columns and 'severity' in df.columns:
+        if "incidents.radar" in figures:
             try:
-                # Get top categories
-                top_categories = df['category'].value_counts().head(5).index
-                
-                # Create radar chart data
-                radar_data = []
-                for cat in top_categories:
-                    cat_df = df[df['category'] == cat]
-                    severity_dist = cat_df['severity'].value_counts(normalize=True) * 100
-                    
-                    radar_data.append({
-                        'Category': cat,
-                        'Low': severity_dist.get('Low', 0),
-                        'Medium': severity_dist.get('Medium', 0),
-                        'High': severity_dist.get('High', 0),
-                        'Critical': severity_dist.get('Critical', 0)
-                    })
-                
-                if radar_data:
-                    radar_df = pd.DataFrame(radar_data)
-                    
-                    fig_radar = go.Figure()
-                    
-                    for idx, row in radar_df.iterrows():
-                        fig_radar.add_trace(go.Scatterpolar(
-                            r=[row['Low'], row['Medium'], row['High'], row['Critical']],
-                            theta=['Low', 'Medium', 'High', 'Critical'],
-                            fill='toself',
-                            name=row['Category']
-                        ))
-                    
-                    fig_radar.update_layout(
-                        polar=dict(
-                            radialaxis=dict(
-                                visible=True,
-                                range=[0, 100]
-                            )),
-                        showlegend=True,
-                        title="Severity Distribution by Category (Radar Chart)"
-                    )
+                fig_radar = figures["incidents.radar"].result()
+                if fig_radar is not None:
                     st.plotly_chart(fig_radar, use_container_width=True)
             except Exception as e:
                 st.warning(f"Could not create radar chart: {e}")
         
         st.markdown("---")
         
+        page_profile.section("filters")
         # Display statistics
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -271,6 +216,7 @@ try:
         
         st.subheader(f"Filtered Results: {len(filtered_df)} incidents")
         
+        page_profile.section("table")
         # Display table
         st.dataframe(
             filtered_df,
@@ -291,3 +237,4 @@ except Exception as e:
     st.error(f"Error loading cyber incidents: {e}")
     st.exception(e)
 
+page_profile.finish()
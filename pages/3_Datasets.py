@@ -1,7 +1,4 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 
 st.set_page_config(layout="wide")
 
@@ -11,6 +8,16 @@ from app.utils.auth import require_login
 # Check if user is logged in
 user = require_login()
 
+# Heavy libraries are imported only once the user is allowed to see the page
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from app.data.dataset_profiles import get_dataset_columns, save_upload
+from app.data.jobs import ensure_workers, submit_job
+from app.utils.profiling import start_page_profile
+
+page_profile = start_page_profile("datasets")
+
 st.title("📊 Datasets Metadata")
 
 # Display current user info
@@ -23,8 +30,30 @@ with col2:
         st.session_state.user = None
         st.rerun()
 
+page_profile.section("upload")
+# Uploaded files are profiled in one streaming pass: the catalog gets their
+# real size and per-column statistics instead of typed-in numbers. The
+# profiling runs as a background job, so large files don't block the page.
+with st.expander("📤 Upload and profile a dataset"):
+    uploaded = st.file_uploader(
+        "Dataset file", type=["csv", "tsv", "jsonl", "ndjson", "parquet"], key="dataset_upload"
+    )
+    if uploaded is not None and st.button("Profile and add to catalog"):
+        try:
+            path = save_upload(uploaded, uploaded.name)
+            job_id = submit_job(
+                "profile",
+                {"path": path, "name": uploaded.name, "uploaded_by": user['username'], "remove_file": True},
+                submitted_by=user['username'],
+            )
+            ensure_workers()
+            st.success(f"Profiling {uploaded.name} as job {job_id}; follow it on the Jobs page.")
+        except Exception as e:
+            st.error(f"Could not queue {uploaded.name}: {e}")
+
 # Load and display data
 try:
+    page_profile.section("load")
     df = read_all_datasets()
     
     if df.empty:
@@ -32,6 +61,7 @@ try:
     else:
         st.subheader(f"Total Datasets: {len(df)}")
         
+        page_profile.section("charts")
         # =======================
         # CHARTS SECTION
         # =======================
@@ -173,6 +203,7 @@ try:
         
         st.markdown("---")
         
+        page_profile.section("table")
         # Display statistics
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -194,6 +225,16 @@ try:
             height=600
         )
         
+        # Column statistics of uploaded (profiled) datasets
+        if 'profiled_at' in df.columns and df['profiled_at'].notna().any():
+            st.subheader("Column Profiles")
+            profiled = df[df['profiled_at'].notna()].set_index('dataset_id')
+            profile_id = st.selectbox(
+                "Dataset", profiled.index,
+                format_func=lambda i: f"{i} - {profiled.loc[i, 'name']} (profiled {profiled.loc[i, 'profiled_at']})"
+            )
+            st.dataframe(get_dataset_columns(int(profile_id)), use_container_width=True)
+        
         # Download button
         csv = df.to_csv(index=False)
         st.download_button(
@@ -207,3 +248,4 @@ except Exception as e:
     st.error(f"Error loading datasets: {e}")
     st.exception(e)
 
+page_profile.finish()
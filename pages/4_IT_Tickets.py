@@ -1,17 +1,30 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 
 st.set_page_config(layout="wide")
 
-from app.data.it_tickets import read_all_tickets
+from app.data.analytics import category_level_profile, level_status_bubbles
 from app.utils.auth import require_login
 
 # Check if user is logged in
 user = require_login()
 
+# Heavy libraries are imported only once the user is allowed to see the page
+import pandas as pd
+from app.utils.charts import (
+    LEVEL_ORDER,
+    STATUS_ORDER,
+    pie_chart,
+    count_bar_chart,
+    grouped_bar_chart,
+    bubble_scatter,
+    radar_chart,
+)
+from app.utils.figure_cache import prefetch_figures
+from app.utils.live_refresh import load_table, auto_refresh
+from app.utils.profiling import start_page_profile
+
+page_profile = start_page_profile("it_tickets")
+
 st.title("🎫 IT Tickets")
 
 # Display current user info
@@ -24,9 +37,42 @@ with col2:
         st.session_state.user = None
         st.rerun()
 
+# Chart builders (run only on a figure-cache miss)
+PRIORITY_COLORS = {
+    'Critical': '#8B0000',
+    'High': '#FF4500',
+    'Medium': '#FFA500',
+    'Low': '#32CD32'
+}
+
+
+def build_scatter(df, issue_type_col):
+    scatter_agg = level_status_bubbles(
+        df, 'priority', 'status', issue_type_col if issue_type_col else 'priority',
+        mode_name='most_common_type', x_order=LEVEL_ORDER, y_order=STATUS_ORDER
+    )
+    return bubble_scatter(
+        scatter_agg, 'priority_num', 'status_num', LEVEL_ORDER, STATUS_ORDER,
+        title="Tickets: Priority vs Status Distribution (Size = Count)",
+        x_label='Priority', y_label='Status', count_label='Number of Tickets',
+        hover_col='most_common_type', color_scale='Viridis'
+    )
+
+
+def build_radar(df, issue_type_col):
+    profile = category_level_profile(df, issue_type_col, 'priority', top_n=5)
+    if profile.empty:
+        return None
+    return radar_chart(profile, "Priority Distribution by Issue Type (Radar Chart)")
+
+
 # Load and display data
 try:
-    df = read_all_tickets()
+    page_profile.section("load")
+    # Charts are cached per generation; the frame is reused by this
+    # session until the table changes
+    generation, df = load_table("it_tickets")
+    auto_refresh(["it_tickets"])
     
     if df.empty:
         st.info("No IT tickets found in the database.")
@@ -34,6 +80,7 @@ try:
         # Debug: Show available columns
         st.subheader(f"Total Tickets: {len(df)}")
         
+        page_profile.section("transform")
         # Auto-detect column names (case-insensitive)
         available_columns_lower = {col.lower(): col for col in df.columns}
         
@@ -54,6 +101,46 @@ try:
         elif 'assigned to' in available_columns_lower:
             assigned_to_col = available_columns_lower['assigned to']
         
+        page_profile.section("prepare")
+        # The charts only read df, so their data preparation runs side by
+        # side on the database thread pool while the page lays out
+        def build_issue_bar():
+            # Remove None, NaN, and empty string values
+            df_issue_clean = df[issue_type_col].dropna()
+            df_issue_clean = df_issue_clean[(df_issue_clean != 'None') & (df_issue_clean != '')]
+            issue_type_counts = df_issue_clean.value_counts().head(10)
+            if len(issue_type_counts) == 0:
+                return None
+            return count_bar_chart(
+                issue_type_counts, 'Issue Type', 'Count', "Top 10 Issue Types", 'Oranges', tick_angle=45
+            )
+
+        charts = {}
+        if 'priority' in df.columns:
+            charts["tickets.priority_pie"] = ({}, lambda: pie_chart(
+                df['priority'].value_counts(), "Tickets by Priority", PRIORITY_COLORS
+            ))
+        if issue_type_col:
+            charts["tickets.issue_type_bar"] = ({"col": issue_type_col, "top": 10}, build_issue_bar)
+        if 'status' in df.columns and not df['status'].isna().all():
+            charts["tickets.status_bar"] = ({}, lambda: count_bar_chart(
+                df['status'].value_counts(), 'Status', 'Count', "Tickets by Status", 'Greens'
+            ))
+        if assigned_to_col and not df[assigned_to_col].isna().all():
+            charts["tickets.assigned_bar"] = ({"col": assigned_to_col, "top": 10}, lambda: count_bar_chart(
+                df[assigned_to_col].value_counts().head(10), 'User', 'Ticket Count',
+                "Top 10 Assigned Users", 'Purples', tick_angle=45
+            ))
+        if 'priority' in df.columns and 'status' in df.columns:
+            charts["tickets.priority_status"] = ({}, lambda: grouped_bar_chart(
+                pd.crosstab(df['priority'], df['status']), "Priority vs Status", "Priority"
+            ))
+            charts["tickets.scatter"] = ({"col": issue_type_col}, lambda: build_scatter(df, issue_type_col))
+        if issue_type_col and 'priority' in df.columns:
+            charts["tickets.radar"] = ({"col": issue_type_col, "top": 5}, lambda: build_radar(df, issue_type_col))
+        figures = prefetch_figures(generation, charts)
+
+        page_profile.section("charts")
         # =======================
         # CHARTS SECTION
         # =======================
@@ -65,50 +152,15 @@ try:
         
         with chart_col1:
             # Chart 1: Pie chart - Priority distribution
-            if 'priority' in df.columns:
-                priority_counts = df['priority'].value_counts()
-                fig_priority = px.pie(
-                    values=priority_counts.values,
-                    names=priority_counts.index,
-                    title="Tickets by Priority",
-                    color_discrete_map={
-                        'Critical': '#8B0000',
-                        'High': '#FF4500',
-                        'Medium': '#FFA500',
-                        'Low': '#32CD32'
-                    }
-                )
-                fig_priority.update_traces(textposition='inside', textinfo='percent+label')
-                st.plotly_chart(fig_priority, use_container_width=True)
+            if "tickets.priority_pie" in figures:
+                st.plotly_chart(figures["tickets.priority_pie"].result(), use_container_width=True)
         
         with chart_col2:
             # Chart 2: Bar chart - Tickets by Issue Type
-            if issue_type_col:
-                # Remove None, NaN, and empty string values
-                df_issue_clean = df[issue_type_col].dropna()
-                df_issue_clean = df_issue_clean[df_issue_clean != 'None']
-                df_issue_clean = df_issue_clean[df_issue_clean != '']
-                
-                if len(df_issue_clean) > 0:
-                    issue_type_counts = df_issue_clean.value_counts().head(10)
-                    if len(issue_type_counts) > 0:
-                        issue_df = pd.DataFrame({
-                            'Issue Type': issue_type_counts.index,
-                            'Count': issue_type_counts.values
-                        })
-                        fig_issue = px.bar(
-                            issue_df,
-                            x='Issue Type',
-                            y='Count',
-                            title="Top 10 Issue Types",
-                            color='Count',
-                            color_continuous_scale='Oranges'
-                        )
-                        fig_issue.update_layout(showlegend=False)
-                        fig_issue.update_xaxes(tickangle=45)
-                        st.plotly_chart(fig_issue, use_container_width=True)
-                    else:
-                        st.info("⚠️ Issue Type column exists but all values are empty/None")
+            if "tickets.issue_type_bar" in figures:
+                fig_issue = figures["tickets.issue_type_bar"].result()
+                if fig_issue is not None:
+                    st.plotly_chart(fig_issue, use_container_width=True)
                 else:
                     st.info("⚠️ Issue Type column exists but all values are empty/None")
             else:
@@ -119,160 +171,39 @@ try:
         
         with chart_col3:
             # Chart 3: Bar chart - Status distribution
-            if 'status' in df.columns and not df['status'].isna().all():
-                status_counts = df['status'].value_counts()
-                if len(status_counts) > 0:
-                    status_df = pd.DataFrame({
-                        'Status': status_counts.index,
-                        'Count': status_counts.values
-                    })
-                    fig_status = px.bar(
-                        status_df,
-                        x='Status',
-                        y='Count',
-                        title="Tickets by Status",
-                        color='Count',
-                        color_continuous_scale='Greens'
-                    )
-                    fig_status.update_layout(showlegend=False)
-                    st.plotly_chart(fig_status, use_container_width=True)
-                else:
-                    st.info("No status data available")
+            if "tickets.status_bar" in figures:
+                st.plotly_chart(figures["tickets.status_bar"].result(), use_container_width=True)
             else:
                 st.info("Status column not available in data")
         
         with chart_col4:
             # Chart 4: Bar chart - Tickets assigned to users
-            if assigned_to_col and not df[assigned_to_col].isna().all():
-                assigned_counts = df[assigned_to_col].value_counts().head(10)
-                if len(assigned_counts) > 0:
-                    assigned_df = pd.DataFrame({
-                        'User': assigned_counts.index,
-                        'Ticket Count': assigned_counts.values
-                    })
-                    fig_assigned = px.bar(
-                        assigned_df,
-                        x='User',
-                        y='Ticket Count',
-                        title="Top 10 Assigned Users",
-                        color='Ticket Count',
-                        color_continuous_scale='Purples'
-                    )
-                    fig_assigned.update_layout(showlegend=False)
-                    fig_assigned.update_xaxes(tickangle=45)
-                    st.plotly_chart(fig_assigned, use_container_width=True)
-                else:
-                    st.info("No assigned users data available")
+            if "tickets.assigned_bar" in figures:
+                st.plotly_chart(figures["tickets.assigned_bar"].result(), use_container_width=True)
             else:
                 st.info(f"Assigned To column not found. Available columns: {', '.join(df.columns)}")
         
         # Third row - Grouped chart
         # Chart 5: Grouped bar chart - Priority vs Status
-        if 'priority' in df.columns and 'status' in df.columns:
-            priority_status = pd.crosstab(df['priority'], df['status'])
-            fig_grouped = go.Figure()
-            
-            for status in priority_status.columns:
-                fig_grouped.add_trace(go.Bar(
-                    name=status,
-                    x=priority_status.index,
-                    y=priority_status[status]
-                ))
-            
-            fig_grouped.update_layout(
-                title="Priority vs Status",
-                xaxis_title="Priority",
-                yaxis_title="Count",
-                barmode='group'
-            )
-            st.plotly_chart(fig_grouped, use_container_width=True)
+        if "tickets.priority_status" in figures:
+            st.plotly_chart(figures["tickets.priority_status"].result(), use_container_width=True)
         
         # Chart 6: Scatter plot - Priority vs Status (with aggregation)
-        if 'priority' in df.columns and 'status' in df.columns:
-            # Create numeric mapping for scatter plot
-            priority_order = ['Low', 'Medium', 'High', 'Critical']
-            status_order = ['Open', 'In Progress', 'Resolved', 'Closed']
-            
-            # Aggregate data to show count at each intersection
-            df_scatter = df.copy()
-            df_scatter['priority_num'] = df_scatter['priority'].map({p: i for i, p in enumerate(priority_order)})
-            df_scatter['status_num'] = df_scatter['status'].map({s: i for i, s in enumerate(status_order)})
-            
-            # Group by priority and status to get counts and most common issue_type
-            scatter_agg = df_scatter.groupby(['priority_num', 'status_num']).agg({
-                'ticket_id': 'count',
-                issue_type_col if issue_type_col else 'priority': lambda x: x.mode()[0] if len(x.mode()) > 0 else 'Unknown'
-            }).reset_index()
-            scatter_agg.columns = ['priority_num', 'status_num', 'count', 'most_common_type']
-            
-            # Add jitter for better visibility
-            scatter_agg['priority_jitter'] = scatter_agg['priority_num'] + np.random.uniform(-0.15, 0.15, len(scatter_agg))
-            scatter_agg['status_jitter'] = scatter_agg['status_num'] + np.random.uniform(-0.15, 0.15, len(scatter_agg))
-            
-            fig_scatter = px.scatter(
-                scatter_agg,
-                x='priority_jitter',
-                y='status_jitter',
-                size='count',
-                color='count',
-                title="Tickets: Priority vs Status Distribution (Size = Count)",
-                labels={'priority_jitter': 'Priority', 'status_jitter': 'Status', 'count': 'Number of Tickets'},
-                hover_data=['most_common_type', 'count'],
-                size_max=30,
-                color_continuous_scale='Viridis'
-            )
-            fig_scatter.update_xaxes(tickvals=list(range(len(priority_order))), ticktext=priority_order)
-            fig_scatter.update_yaxes(tickvals=list(range(len(status_order))), ticktext=status_order)
-            st.plotly_chart(fig_scatter, use_container_width=True)
+        if "tickets.scatter" in figures:
+            st.plotly_chart(figures["tickets.scatter"].result(), use_container_width=True)
         
         # Chart 7: Radar chart - Issue Type profile by Priority
-        if issue_type_col and 'priority' in df.columns:
+        if "tickets.radar" in figures:
             try:
-                # Get top issue types
-                top_issue_types = df[issue_type_col].value_counts().head(5).index
-                
-                # Create radar chart data
-                radar_data = []
-                for issue_type in top_issue_types:
-                    issue_df = df[df[issue_type_col] == issue_type]
-                    priority_dist = issue_df['priority'].value_counts(normalize=True) * 100
-                    
-                    radar_data.append({
-                        'Issue Type': issue_type,
-                        'Low': priority_dist.get('Low', 0),
-                        'Medium': priority_dist.get('Medium', 0),
-                        'High': priority_dist.get('High', 0),
-                        'Critical': priority_dist.get('Critical', 0)
-                    })
-                
-                if radar_data:
-                    radar_df = pd.DataFrame(radar_data)
-                    
-                    fig_radar = go.Figure()
-                    
-                    for idx, row in radar_df.iterrows():
-                        fig_radar.add_trace(go.Scatterpolar(
-                            r=[row['Low'], row['Medium'], row['High'], row['Critical']],
-                            theta=['Low', 'Medium', 'High', 'Critical'],
-                            fill='toself',
-                            name=row['Issue Type']
-                        ))
-                    
-                    fig_radar.update_layout(
-                        polar=dict(
-                            radialaxis=dict(
-                                visible=True,
-                                range=[0, 100]
-                            )),
-                        showlegend=True,
-                        title="Priority Distribution by Issue Type (Radar Chart)"
-                    )
+                fig_radar = figures["tickets.radar"].result()
+                if fig_radar is not None:
                     st.plotly_chart(fig_radar, use_container_width=True)
             except Exception as e:
                 st.warning(f"Could not create radar chart: {e}")
         
         st.markdown("---")
         
+        page_profile.section("filters")
         # Display statistics
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -335,6 +266,7 @@ try:
         
         st.subheader(f"Filtered Results: {len(filtered_df)} tickets")
         
+        page_profile.section("table")
         # Display table
         st.dataframe(
             filtered_df,
@@ -355,3 +287,4 @@ except Exception as e:
     st.error(f"Error loading IT tickets: {e}")
     st.exception(e)
 
+page_profile.finish()
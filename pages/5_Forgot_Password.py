@@ -8,6 +8,9 @@ st.set_page_config(
 
 from app.data.users import get_user_by_username_for_recovery, reset_password_with_recovery, generate_recovery_code_for_user
 # Import security functions inside functions to avoid circular import
+from app.utils.profiling import start_page_profile
+
+page_profile = start_page_profile("forgot_password")
 
 st.title("🔑 Password Recovery")
 st.markdown("---")
@@ -15,6 +18,7 @@ st.markdown("---")
 # Tabs for different recovery methods
 tab1, tab2 = st.tabs(["Reset Password", "Forgot Username"])
 
+page_profile.section("reset_password")
 with tab1:
     st.subheader("Reset Your Password")
     st.info("You need your username, email, and either recovery code or license key.")
@@ -52,6 +56,7 @@ with tab1:
                     else:
                         st.error(message)
 
+page_profile.section("recover_username")
 with tab2:
     st.subheader("Recover Your Username")
     st.info("Enter your email and recovery code to retrieve your username.")
@@ -97,3 +102,4 @@ st.markdown("---")
 if st.button("← Back to Login"):
     st.switch_page("pages/0_Login.py")
 
+page_profile.finish()
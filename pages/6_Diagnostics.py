@@ -0,0 +1,120 @@
+import streamlit as st
+
+st.set_page_config(layout="wide")
+
+from app.data import query_stats
+from app.utils.auth import require_admin
+
+# Check if user is logged in and is admin
+user = require_admin()
+
+# Heavy libraries are imported only once the user is allowed to see the page
+import pandas as pd
+import plotly.express as px
+
+st.title("🩺 Diagnostics")
+
+# Display current user info
+col1, col2 = st.columns([3, 1])
+with col1:
+    st.caption(f"Logged in as: **{user['username']}** ({user['role']})")
+with col2:
+    if st.button("Logout"):
+        st.session_state.authenticated = False
+        st.session_state.user = None
+        st.rerun()
+
+st.caption("Query statistics of this server process, since it started or was last reset.")
+
+# =======================
+# SUMMARY AND SETTINGS
+# =======================
+summary = query_stats.get_summary()
+col1, col2, col3, col4, col5 = st.columns(5)
+col1.metric("Statements", summary["statements"])
+col2.metric("Distinct SQL", summary["distinct"])
+col3.metric("Errors", summary["errors"])
+col4.metric("Total time", f"{summary['total_ms'] / 1000:.2f} s")
+col5.metric("Slow queries", summary["slow"])
+
+set_col1, set_col2 = st.columns([3, 1])
+with set_col1:
+    threshold = st.number_input(
+        "Slow-query threshold (ms)",
+        min_value=1.0,
+        value=float(query_stats.SLOW_QUERY_MS),
+        step=10.0,
+    )
+    if threshold != query_stats.SLOW_QUERY_MS:
+        query_stats.set_slow_query_threshold(threshold)
+with set_col2:
+    st.write("")
+    if st.button("Reset statistics"):
+        query_stats.reset_query_stats()
+        st.rerun()
+
+tab_statements, tab_histogram, tab_slow = st.tabs(["Statements", "Latency Histogram", "Slow Queries"])
+
+# =======================
+# STATEMENTS
+# =======================
+with tab_statements:
+    sort_by = st.selectbox(
+        "Sort by",
+        ["total_ms", "count", "mean_ms", "max_ms", "rows", "errors"],
+        key="diagnostics_sort_by",
+    )
+    stats = query_stats.get_query_stats(sort_by=sort_by)
+    if not stats:
+        st.info("No statements recorded yet.")
+    else:
+        df = pd.DataFrame([
+            {
+                "sql": s["sql"],
+                "count": s["count"],
+                "mean_ms": round(s["mean_ms"], 3),
+                "max_ms": round(s["max_ms"], 3),
+                "total_ms": round(s["total_ms"], 1),
+                "rows": s["rows"],
+                "errors": s["errors"],
+                "top call site": s["sites"][0][0] if s["sites"] else "",
+                "call sites": len(s["sites"]),
+            }
+            for s in stats
+        ])
+        st.dataframe(df, use_container_width=True, height=500)
+
+# =======================
+# LATENCY HISTOGRAM
+# =======================
+with tab_histogram:
+    histogram = query_stats.get_latency_histogram()
+    labels = [f"≤ {bound:g} ms" if bound != float("inf") else f"> {histogram[-2][0]:g} ms"
+              for bound, _ in histogram]
+    fig = px.bar(
+        x=labels,
+        y=[count for _, count in histogram],
+        labels={"x": "Latency", "y": "Statements"},
+        title="Statement Latency (all statements)",
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+# =======================
+# SLOW QUERIES
+# =======================
+with tab_slow:
+    slow = query_stats.get_slow_queries()
+    st.caption(f"Statements slower than {query_stats.SLOW_QUERY_MS:g} ms "
+               f"(last {query_stats.MAX_SLOW_QUERIES}, also appended to {query_stats.SLOW_QUERY_LOG}).")
+    if not slow:
+        st.info("No slow queries recorded.")
+    for entry in slow:
+        with st.expander(f"{entry['at']} · {entry['ms']:.1f} ms · {entry['rows']} rows · {entry['site']}"):
+            st.code(entry["sql"], language="sql")
+            if entry["params"]:
+                st.caption(f"Parameter types: {entry['params']}")
+            if entry["error"]:
+                st.error(entry["error"])
+            if entry["plan"]:
+                st.markdown("**Query plan**")
+                st.code("\n".join(entry["plan"]))
@@ -0,0 +1,139 @@
+import streamlit as st
+
+st.set_page_config(layout="wide")
+
+from app.data import jobs
+from app.utils.auth import require_login
+
+# Check if user is logged in
+user = require_login()
+is_admin = user.get("is_admin", False)
+
+# Heavy libraries are imported only once the user is allowed to see the page
+import pandas as pd
+from app.utils.profiling import start_page_profile
+
+page_profile = start_page_profile("jobs")
+
+st.title("⚙️ Background Jobs")
+
+# Display current user info
+col1, col2 = st.columns([3, 1])
+with col1:
+    st.caption(f"Logged in as: **{user['username']}** ({user['role']})")
+with col2:
+    if st.button("Logout"):
+        st.session_state.authenticated = False
+        st.session_state.user = None
+        st.rerun()
+
+st.caption(
+    "Imports, migrations and dataset profiling run here, in worker processes, instead of in the page. "
+    + ("All jobs are shown." if is_admin else "Only your jobs are shown.")
+)
+
+# =======================
+# SUBMIT (admins)
+# =======================
+page_profile.section("submit")
+if is_admin:
+    with st.expander("➕ Submit a job"):
+        kind = st.selectbox(
+            "Job",
+            ["profile", "import", "import_users", "init"],
+            format_func={
+                "profile": "Profile a data file into the datasets catalog",
+                "import": "Import rows from a CSV / JSON lines file",
+                "import_users": "Import a users file",
+                "init": "Run the startup initialization (migrations)",
+            }.get,
+        )
+        params = {}
+        if kind == "init":
+            params["force"] = st.checkbox("Rerun steps already done")
+        else:
+            params["path"] = st.text_input("File path on the server")
+        if kind == "import":
+            params["table"] = st.selectbox("Table", ["cyber_incidents", "it_tickets", "datasets_metadata"])
+        elif kind == "import_users":
+            params["actor"] = user["username"]
+        elif kind == "profile":
+            params["uploaded_by"] = user["username"]
+        if st.button("Submit job"):
+            if kind != "init" and not params["path"]:
+                st.error("Enter the path of the file.")
+            else:
+                job_id = jobs.submit_job(kind, params, submitted_by=user["username"])
+                jobs.ensure_workers()
+                st.success(f"Job {job_id} queued.")
+
+# =======================
+# JOBS
+# =======================
+page_profile.section("jobs")
+submitted_by = None if is_admin else user["username"]
+
+
+def has_active(counts):
+    return any(counts[status] for status in jobs.ACTIVE_STATUSES)
+
+
+active = has_active(jobs.get_job_counts(submitted_by=submitted_by))
+
+
+# Only this part reruns: every two seconds while jobs are queued or running,
+# otherwise every ten, to pick up jobs submitted elsewhere. The interval is
+# fixed when the page runs, so a change of state reruns the whole page.
+@st.fragment(run_every=2 if active else 10)
+def job_list():
+    counts = jobs.get_job_counts(submitted_by=submitted_by)
+    if has_active(counts) != active:
+        st.rerun()
+    workers = jobs.get_workers()
+    cols = st.columns(6)
+    for col, status in zip(cols, jobs.STATUSES):
+        col.metric(status.capitalize(), counts[status])
+    cols[5].metric("Workers", len(workers))
+    if counts["queued"] and not workers:
+        st.warning("Jobs are queued but no worker is running.")
+        if st.button("Start workers"):
+            jobs.ensure_workers()
+            st.rerun()
+
+    status = st.selectbox("Status", ["all"] + list(jobs.STATUSES), key="jobs_status_filter")
+    job_rows = jobs.list_jobs(status=None if status == "all" else status, submitted_by=submitted_by)
+    if not job_rows:
+        st.info("No jobs yet.")
+        return
+    df = pd.DataFrame(job_rows)[[
+        "job_id", "kind", "status", "progress", "message", "attempts", "max_attempts",
+        "submitted_by", "created_at", "started_at", "finished_at", "error",
+    ]]
+    st.dataframe(
+        df,
+        use_container_width=True,
+        hide_index=True,
+        column_config={"progress": st.column_config.ProgressColumn("progress", min_value=0.0, max_value=1.0)},
+    )
+
+    # Details, cancel and retry
+    job_id = st.selectbox("Job details", df["job_id"], key="jobs_selected")
+    job = jobs.get_job(int(job_id))
+    if job is None:
+        return
+    detail_col, action_col = st.columns([3, 1])
+    with detail_col:
+        st.json({"params": job["params"], "result": job["result"], "error": job["error"]}, expanded=False)
+    with action_col:
+        if job["status"] in jobs.ACTIVE_STATUSES and st.button("Cancel job"):
+            jobs.cancel_job(job["job_id"])
+            st.rerun()
+        if job["status"] in ("failed", "cancelled") and st.button("Retry job"):
+            if jobs.retry_job(job["job_id"]):
+                jobs.ensure_workers()
+                st.rerun()
+            st.error("This job's uploaded file was removed; upload the file again.")
+
+
+job_list()
+page_profile.finish()